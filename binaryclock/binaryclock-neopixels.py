@@ -1,18 +1,33 @@
 from machine import Pin, RTC
 from neopixel import NeoPixel
 from libs.localconfig import WIFI_SSID, WIFI_PW
-import time, sys, network, urequests
+from libs.ticker import SecondTicker
+from libs.timesource import SNTPSource, WorldTimeAPISource
+from libs.timesync import TimeSync, day_secs, crossed
+from libs.tzrules import TimeZone
+import time, sys, network
+
+# Timezone of the time shown (see `ZONES` in tzrules.py) - the RTC is kept in UTC, and
+# clock changes for daylight savings are worked out on the Pico
+TIMEZONE = "Europe/London"
 
 # World Time Clock API to synchronise Pico's RTC - set this to your own timezone
 TIME_API_URI = "http://worldtimeapi.org/api/timezone/Europe/London"
 # Alternatively use IP address if it is the same as your timezone
 #TIME_API_URI = "http://worldtimeapi.org/api/ip"
 
-# Synchronisation time checks (applies to UK timezone, where we have summer daylight savings)
-SYNC_TIMES = {
-    'default': '01:00:01', # Most of the year (clocks go forward to BST at 01:00 last Sun in Mar)
-    'october': '02:00:01', # October only (clocks go back to GMT at 02:00 last Sun in Oct)
-}
+# Or use an NTP server - one small UDP packet, corrected for network delay
+NTP_HOST = "pool.ntp.org"
+
+TIME_SOURCE = "worldtimeapi" # where to get the time: "worldtimeapi" or "sntp"
+
+# Daily synchronisation time (UTC), only needed to correct the RTC's drift
+SYNC_TIME = "03:00:00"
+
+WIFI_TIMEOUT_MS = 15000 # give up connecting to WiFi after 15 seconds
+HTTP_TIMEOUT_S = 10 # give up waiting for the World Time Clock after 10 seconds
+NTP_TIMEOUT_S = 2 # give up waiting for an NTP reply after 2 seconds
+SYNC_RETRIES = 3 # attempts at each scheduled sync (the sync on boot keeps trying)
 
 # Set each NeoPixel strip ('npx') and associate an RGB colour
 STRIP_H = {'npx': NeoPixel(Pin(27), 5), 'rgb': (255,0,0)} # Hours (24-hr format) / Red
@@ -21,60 +36,45 @@ STRIP_S = {'npx': NeoPixel(Pin(17), 6), 'rgb': (0,0,255)} # Seconds / Blue
 
 LED_OFF = (0,0,0) # Black = off/unlit
 
+STRIPS = (STRIP_H, STRIP_M, STRIP_S)
 
-def connect_wifi():
-    """
-    Connect to WiFi network
+
+def strip_patterns(strip: dict) -> list:
     """
+    Pixel data for every value a strip can show (e.g. 64 for a 6 LED strip)
 
-    print("Connecting to WiFi", end="")
-    wlan.active(True)
-    wlan.connect(WIFI_SSID, WIFI_PW) # SSID/PW from file not committed to Git repo
-    while not wlan.isconnected():
-        print(".", end="")
-        time.sleep(0.1)
-    print(" Connected!")
+    Built with the NeoPixel driver itself, so the bytes are in the strip's colour order (GRB).
+
+    Parameters
+    ----------
+    strip : dict
+        Strip ('npx') and colour ('rgb'), first LED = most significant bit
+    """
+    npx = strip['npx']
+    patterns = []
+    for value in range(1 << npx.n):
+        for led in range(npx.n):
+            npx[led] = strip['rgb'] if value & (1 << (npx.n - 1 - led)) else LED_OFF
+        patterns.append(bytes(npx.buf))
+    return patterns
 
 
-def sync_rtc(rtc, blocking = True):
+def show_value(strip: dict, value: int):
     """
-    Use WiFi to synchronise Pico RTC with World Time Clock
+    Show a value on a strip, data is only sent to the strip if the value changed
 
     Parameters
     ----------
-    rtc : RTC
-        Real Time Clock object
-    blocking : bool
-        When true (default), wait for a response (used on first connection), when false, close connection until next sync cycle
+    strip : dict
+        Strip to update
+    value : int
+        Value to show in binary
     """
-
-    # Make WiFi connection
-    connect_wifi()
-
-    response = None
-    while True:
-        try:
-            response = urequests.get(TIME_API_URI)
-            break
-        except:
-            if blocking:
-                response.close()
-                continue
-            else:
-                response.close()
-                return
-
-    json = response.json()
-    current_time = json["datetime"]
-    the_date, the_time = current_time.split("T")
-    year, month, mday = [int(x) for x in the_date.split("-")]
-    the_time = the_time.split(".")[0]
-    hours, minutes, seconds = [int(x) for x in the_time.split(":")]
-    week_day = json["day_of_week"]
-
-    response.close()
-    wlan.disconnect()
-    rtc.datetime((year, month, mday, week_day, hours, minutes, seconds, 0))
+    if value == strip['value']:
+        return
+    strip['buf'][:] = strip['patterns'][value] # copy prebuilt pixel data straight in
+    strip['npx'].write()
+    strip['value'] = value
 
 
 def toggle_leds(hrs: int, mins: int, secs: int):
@@ -91,81 +91,84 @@ def toggle_leds(hrs: int, mins: int, secs: int):
         Seconds
     """
 
-    bin_hrs = "{0:0{len}b}".format(hrs, len=STRIP_H['npx'].n) # hours in binary
-    bin_mins = "{0:0{len}b}".format(mins, len=STRIP_M['npx'].n) # minutes in binary
-    bin_secs = "{0:0{len}b}".format(secs, len=STRIP_S['npx'].n) # seconds in binary
-
-    print(f"{hrs:0>2}:{mins:0>2}:{secs:0>2} - {bin_hrs} : {bin_mins} : {bin_secs}")
-
-    # Set hours
-    for led in range(STRIP_H['npx'].n):
-        if (int(bin_hrs[led]) == 1):
-            STRIP_H['npx'][led] = STRIP_H['rgb']
-        else:
-            STRIP_H['npx'][led] = LED_OFF
-    STRIP_H['npx'].write()
-
-    # Set minutes
-    for led in range(STRIP_M['npx'].n):
-        if (int(bin_mins[led]) == 1):
-            STRIP_M['npx'][led] = STRIP_M['rgb']
-        else:
-            STRIP_M['npx'][led] = LED_OFF
-    STRIP_M['npx'].write()
-
-    # Set seconds
-    for led in range(STRIP_S['npx'].n):
-        if (int(bin_secs[led]) == 1):
-            STRIP_S['npx'][led] = STRIP_S['rgb']
-        else:
-            STRIP_S['npx'][led] = LED_OFF
-    STRIP_S['npx'].write()
+    print(f"{hrs:0>2}:{mins:0>2}:{secs:0>2} - {hrs:0{STRIP_H['npx'].n}b} : {mins:0{STRIP_M['npx'].n}b} : {secs:0{STRIP_S['npx'].n}b}")
+
+    show_value(STRIP_H, hrs) # changes once an hour
+    show_value(STRIP_M, mins) # changes once a minute
+    show_value(STRIP_S, secs)
+
 
 def clear_leds():
     """
     Turn all the LEDs off
     """
-    for led in range(STRIP_H['npx'].n):
-        STRIP_H['npx'][led] = LED_OFF
-    STRIP_H['npx'].write()
-
-    for led in range(STRIP_M['npx'].n):
-        STRIP_M['npx'][led] = LED_OFF
-    STRIP_M['npx'].write()
-
-    for led in range(STRIP_S['npx'].n):
-        STRIP_S['npx'][led] = LED_OFF
-    STRIP_S['npx'].write()
+    for strip in STRIPS:
+        show_value(strip, 0)
 
 
 ################################################################################
 # Run Program
 
+syncer = None # set up once WiFi is initialised
+ticker = None # set up once the RTC is synchronised
+
 try:
+    # Prebuild pixel data for every value of each strip
+    for strip in STRIPS:
+        strip['patterns'] = strip_patterns(strip)
+        strip['buf'] = memoryview(strip['npx'].buf)
+        strip['value'] = -1 # unknown, so the first update is always sent
+
     # Init WLAN
     wlan = network.WLAN(network.STA_IF)
 
+    # Where the time comes from
+    if TIME_SOURCE == "sntp":
+        time_source = SNTPSource(NTP_HOST, NTP_TIMEOUT_S)
+    else:
+        time_source = WorldTimeAPISource(TIME_API_URI, HTTP_TIMEOUT_S, utc = True)
+    syncer = TimeSync(wlan, time_source, WIFI_SSID, WIFI_PW, WIFI_TIMEOUT_MS, SYNC_RETRIES) # SSID/PW from file not committed to Git repo
+
     # Init the Real Time Clock
     rtc = RTC()
 
-    # Synchronise the RTC with the World Clock
-    sync_rtc(rtc)
+    # Synchronise the RTC with the time source
+    syncer.sync_rtc(rtc)
+
+    # Local time from the RTC's UTC (works out when the clocks change for the next 2 years)
+    tz = TimeZone(TIMEZONE)
+
+    # Later synchronisations run in the background on core 1
+    syncer.start()
 
     # Make sure all LEDS are off
     clear_leds()
     
-    while True:
-        Y, M, D, W, HH, MM, SS, MS = rtc.datetime() # Get current timestamp
-        toggle_leds(HH, MM, SS) # Toggle LEDs on/off according to time
-
-        now_time = f"{HH:0>2}:{MM:0>2}:{SS:0>2}" # Current RTC time (HH:MM:SS)
-        sync_time = SYNC_TIMES['october' if (M == 10) else 'default'] # 01:00:01/02:00:01
-        # Synchronise the RTC if sync time is reached
-        if (now_time == sync_time):
-            sync_rtc(rtc, blocking=False)
+    # Ticks in step with the RTC's seconds (rather than sleeping 1 second after the work)
+    ticker = SecondTicker(rtc)
+    prev_secs = -1 # time of previous tick (seconds since midnight), -1 = none
+    sync_secs = day_secs(SYNC_TIME)
 
-        time.sleep(1) # Wait 1 second
+    while True:
+        Y, M, D, W, HH, MM, SS, MS = ticker.wait() # Wait for next second, get current timestamp (UTC)
+        local = tz.localtime(time.mktime((Y, M, D, HH, MM, SS, 0, 0))) # Apply timezone/daylight savings
+        toggle_leds(local[3], local[4], local[5]) # Toggle LEDs on/off according to local time
+
+        now_secs = HH * 3600 + MM * 60 + SS # Current RTC time (seconds since midnight, UTC)
+        # Synchronise the RTC if sync time is reached (fetched in the background)
+        if prev_secs >= 0 and crossed(prev_secs, now_secs, sync_secs):
+            syncer.request()
+        prev_secs = now_secs
+
+        # Set the RTC once core 1 has fetched the time
+        if syncer.apply(rtc):
+            ticker.relock() # the RTC's seconds now roll over at a different moment, lock on at the next tick
+            prev_secs = -1 # time may have gone back past the sync time, don't sync again
     
 except KeyboardInterrupt:
+    if syncer is not None:
+        syncer.stop() # stop core 1
+    if ticker is not None:
+        print("Ticks:", ticker.stats())
     clear_leds()
     sys.exit(0)
\ No newline at end of file
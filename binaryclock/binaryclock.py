@@ -1,17 +1,32 @@
-from machine import Pin, RTC
+from machine import Pin, RTC, mem32
 from libs.localconfig import WIFI_SSID, WIFI_PW
-import time, sys, network, urequests
+from libs.ticker import SecondTicker
+from libs.timesource import SNTPSource, WorldTimeAPISource
+from libs.timesync import TimeSync, day_secs, crossed
+from libs.tzrules import TimeZone
+import time, sys, network
+
+# Timezone of the time shown (see `ZONES` in tzrules.py) - the RTC is kept in UTC, and
+# clock changes for daylight savings are worked out on the Pico
+TIMEZONE = "Europe/London"
 
 # World Time Clock API to synchronise Pico's RTC - set this to your own timezone
 TIME_API_URI = "http://worldtimeapi.org/api/timezone/Europe/London"
 # Alternatively use IP address if it is the same as your timezone
 #TIME_API_URI = "http://worldtimeapi.org/api/ip"
 
-# Synchronisation time checks (applies to UK timezone, where we have summer daylight savings)
-SYNC_TIMES = {
-    'default': '01:00:01', # Most of the year (clocks go forward to BST at 01:00 last Sun in Mar)
-    'october': '02:00:01', # October only (clocks go back to GMT at 02:00 last Sun in Oct)
-}
+# Or use an NTP server - one small UDP packet, corrected for network delay
+NTP_HOST = "pool.ntp.org"
+
+TIME_SOURCE = "worldtimeapi" # where to get the time: "worldtimeapi" or "sntp"
+
+# Daily synchronisation time (UTC), only needed to correct the RTC's drift
+SYNC_TIME = "03:00:00"
+
+WIFI_TIMEOUT_MS = 15000 # give up connecting to WiFi after 15 seconds
+HTTP_TIMEOUT_S = 10 # give up waiting for the World Time Clock after 10 seconds
+NTP_TIMEOUT_S = 2 # give up waiting for an NTP reply after 2 seconds
+SYNC_RETRIES = 3 # attempts at each scheduled sync (the sync on boot keeps trying)
 
 # Hour LED pins
 GPIO_LED_H = [
@@ -47,60 +62,38 @@ NUM_LEDS_H = len(GPIO_LED_H)
 NUM_LEDS_M = len(GPIO_LED_M)
 NUM_LEDS_S = len(GPIO_LED_S)
 
+# RP2040 SIO registers - writing a bit mask here clears/flips all those pins at once
+SIO_BASE = 0xd0000000
+GPIO_OUT_CLR = SIO_BASE + 0x018
+GPIO_OUT_XOR = SIO_BASE + 0x01c
 
-def connect_wifi():
-    """
-    Connect to WiFi network
-    """
 
-    print("Connecting to WiFi", end="")
-    wlan.active(True)
-    wlan.connect(WIFI_SSID, WIFI_PW) # SSID/PW from file not committed to Git repo
-    while not wlan.isconnected():
-        print(".", end="")
-        time.sleep(0.1)
-    print(" Connected!")
-
-
-def sync_rtc(rtc, blocking = True):
+def pin_masks(leds: list) -> list:
     """
-    Use WiFi to synchronise Pico RTC with World Time Clock
+    GPIO bit mask of the LEDs to turn on for every value the LEDs can show
 
     Parameters
     ----------
-    rtc : RTC
-        Real Time Clock object
-    blocking : bool
-        When true (default), wait for a response (used on first connection), when false, close connection until next sync cycle
+    leds : list
+        LED pins, most significant bit first
     """
+    masks = []
+    for value in range(1 << len(leds)):
+        mask = 0
+        for led in range(len(leds)):
+            if value & (1 << (len(leds) - 1 - led)):
+                mask |= 1 << leds[led]['pin']
+        masks.append(mask)
+    return masks
 
-    # Make WiFi connection
-    connect_wifi()
 
-    response = None
-    while True:
-        try:
-            response = urequests.get(TIME_API_URI)
-            break
-        except:
-            if blocking:
-                response.close()
-                continue
-            else:
-                response.close()
-                return
-
-    json = response.json()
-    current_time = json["datetime"]
-    the_date, the_time = current_time.split("T")
-    year, month, mday = [int(x) for x in the_date.split("-")]
-    the_time = the_time.split(".")[0]
-    hours, minutes, seconds = [int(x) for x in the_time.split(":")]
-    week_day = json["day_of_week"]
-
-    response.close()
-    wlan.disconnect()
-    rtc.datetime((year, month, mday, week_day, hours, minutes, seconds, 0))
+# Bit masks for every hour (32), minute and second (64) value, worked out once
+MASKS_H = pin_masks(GPIO_LED_H)
+MASKS_M = pin_masks(GPIO_LED_M)
+MASKS_S = pin_masks(GPIO_LED_S)
+LED_MASK = MASKS_H[-1] | MASKS_M[-1] | MASKS_S[-1] # every LED
+
+leds_out = 0 # GPIO bits of LEDs currently on
 
 
 def toggle_leds(hrs: int, mins: int, secs: int):
@@ -117,40 +110,42 @@ def toggle_leds(hrs: int, mins: int, secs: int):
         Seconds
     """
 
-    bin_hrs = "{0:0{len}b}".format(hrs, len=NUM_LEDS_H) # hours in binary
-    bin_mins = "{0:0{len}b}".format(mins, len=NUM_LEDS_M) # minutes in binary
-    bin_secs = "{0:0{len}b}".format(secs, len=NUM_LEDS_S) # seconds in binary
+    print(f"{hrs:0>2}:{mins:0>2}:{secs:0>2} - {hrs:0{NUM_LEDS_H}b} : {mins:0{NUM_LEDS_M}b} : {secs:0{NUM_LEDS_S}b}")
 
-    print(f"{hrs:0>2}:{mins:0>2}:{secs:0>2} - {bin_hrs} : {bin_mins} : {bin_secs}")
+    set_leds(MASKS_H[hrs] | MASKS_M[mins] | MASKS_S[secs])
 
-    # Set hours
-    for led in range(NUM_LEDS_H):
-        GPIO_LED_H[led]['led'].value(int(bin_hrs[led]))
 
-    # Set minutes
-    for led in range(NUM_LEDS_M):
-        GPIO_LED_M[led]['led'].value(int(bin_mins[led]))
+def set_leds(out: int):
+    """
+    Switch all the LEDs at once, only flipping the ones that change
 
-    # Set Seconds
-    for led in range(NUM_LEDS_S):
-        GPIO_LED_S[led]['led'].value(int(bin_secs[led]))
+    Parameters
+    ----------
+    out : int
+        GPIO bits of the LEDs to turn on (from the MASKS_H/M/S tables)
+    """
+    global leds_out
+    changed = out ^ leds_out
+    if changed:
+        mem32[GPIO_OUT_XOR] = changed # one register write updates every LED together
+        leds_out = out
 
 
 def clear_leds():
     """
     Turn all the LEDs off
     """
-    for led in range(NUM_LEDS_H):
-        GPIO_LED_H[led]['led'].value(0)
-    for led in range(NUM_LEDS_M):
-        GPIO_LED_M[led]['led'].value(0)
-    for led in range(NUM_LEDS_S):
-        GPIO_LED_S[led]['led'].value(0)
+    global leds_out
+    mem32[GPIO_OUT_CLR] = LED_MASK
+    leds_out = 0
 
 
 ################################################################################
 # Run Program
 
+syncer = None # set up once WiFi is initialised
+ticker = None # set up once the RTC is synchronised
+
 try:
     # Make LED pin connections
     for i in range(NUM_LEDS_H):
@@ -165,27 +160,53 @@ try:
     # Init WLAN
     wlan = network.WLAN(network.STA_IF)
 
+    # Where the time comes from
+    if TIME_SOURCE == "sntp":
+        time_source = SNTPSource(NTP_HOST, NTP_TIMEOUT_S)
+    else:
+        time_source = WorldTimeAPISource(TIME_API_URI, HTTP_TIMEOUT_S, utc = True)
+    syncer = TimeSync(wlan, time_source, WIFI_SSID, WIFI_PW, WIFI_TIMEOUT_MS, SYNC_RETRIES) # SSID/PW from file not committed to Git repo
+
     # Init the Real Time Clock
     rtc = RTC()
 
-    # Synchronise the RTC with the World Clock
-    sync_rtc(rtc)
+    # Synchronise the RTC with the time source
+    syncer.sync_rtc(rtc)
+
+    # Local time from the RTC's UTC (works out when the clocks change for the next 2 years)
+    tz = TimeZone(TIMEZONE)
+
+    # Later synchronisations run in the background on core 1
+    syncer.start()
 
     # Make sure all LEDS are off
     clear_leds()
     
-    while True:
-        Y, M, D, W, HH, MM, SS, MS = rtc.datetime() # Get current timestamp
-        toggle_leds(HH, MM, SS) # Toggle LEDs on/off according to time
+    # Ticks in step with the RTC's seconds (rather than sleeping 1 second after the work)
+    ticker = SecondTicker(rtc)
+    prev_secs = -1 # time of previous tick (seconds since midnight), -1 = none
+    sync_secs = day_secs(SYNC_TIME)
 
-        now_time = f"{HH:0>2}:{MM:0>2}:{SS:0>2}" # Current RTC time (HH:MM:SS)
-        sync_time = SYNC_TIMES['october' if (M == 10) else 'default'] # 01:00:01/02:00:01
-        # Synchronise the RTC if sync time is reached
-        if (now_time == sync_time):
-            sync_rtc(rtc, blocking=False)
-
-        time.sleep(1) # Wait 1 second
+    while True:
+        Y, M, D, W, HH, MM, SS, MS = ticker.wait() # Wait for next second, get current timestamp (UTC)
+        local = tz.localtime(time.mktime((Y, M, D, HH, MM, SS, 0, 0))) # Apply timezone/daylight savings
+        toggle_leds(local[3], local[4], local[5]) # Toggle LEDs on/off according to local time
+
+        now_secs = HH * 3600 + MM * 60 + SS # Current RTC time (seconds since midnight, UTC)
+        # Synchronise the RTC if sync time is reached (fetched in the background)
+        if prev_secs >= 0 and crossed(prev_secs, now_secs, sync_secs):
+            syncer.request()
+        prev_secs = now_secs
+
+        # Set the RTC once core 1 has fetched the time
+        if syncer.apply(rtc):
+            ticker.relock() # the RTC's seconds now roll over at a different moment, lock on at the next tick
+            prev_secs = -1 # time may have gone back past the sync time, don't sync again
     
 except KeyboardInterrupt:
+    if syncer is not None:
+        syncer.stop() # stop core 1
+    if ticker is not None:
+        print("Ticks:", ticker.stats())
     clear_leds()
     sys.exit(0)
\ No newline at end of file
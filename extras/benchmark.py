@@ -0,0 +1,309 @@
+"""
+Extras Micro-Benchmarks
+
+Benchmarks for the collision and movement modules. Reports calls/sec and bytes allocated
+per call for each function across a range of object counts (1 object = one call), and
+can save the results as JSON to compare against a previous run.
+
+Usage:
+
+    python extras/benchmark.py                      # print results
+    python extras/benchmark.py --json new.json      # also save results
+    python extras/benchmark.py --compare old.json   # show speed-up against earlier run
+    python extras/benchmark.py box_collision move   # only run some benchmarks
+
+Runs on CPython or the MicroPython unix port (`micropython extras/benchmark.py`).
+Timings on a PC are not Pico timings, but relative differences (dict vs Rect, pairwise vs
+spatial hash etc) carry over.
+
+Allocations are only measured on MicroPython (heap usage with the GC disabled, over a run
+of n calls, less an empty loop over the same n objects, divided by n). CPython recycles
+dicts/tuples without going through the allocator, so temporary objects can't be seen
+there: allocations are shown as n/a and left out of the JSON.
+"""
+
+import gc, json, random, sys, time
+from array import array
+
+sys.path.insert(0, __file__.rsplit('/', 1)[0] if '/' in __file__ else '.')
+
+from collisions import get_bounds, edge_collision, box_collision
+from movement import move, move_obj, rotate
+from rect import Rect
+from spatialhash import SpatialHash
+from entities import EntityStore
+
+MICROPYTHON = sys.implementation.name == 'micropython'
+
+if MICROPYTHON:
+    def perf_counter():
+        return time.ticks_us() / 1000000 # ticks_us wraps, so keep each timing run short
+else:
+    perf_counter = time.perf_counter
+
+SCREEN = {'x': 0, 'y': 0, 'w': 128, 'h': 64} # 128x64 OLED display
+OBJECT_COUNTS = (1, 16, 64)
+
+BENCHMARKS = [] # (name, setup function)
+
+
+def benchmark(name: str):
+    """ Register a benchmark, setup(n) returns a function doing one op over n objects """
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def random_objects(n: int, seed: int = 1) -> list:
+    """ Get n random 4-12 px sprites scattered over the screen """
+    random.seed(seed)
+    return [
+        {'x': random.randrange(0, 120), 'y': random.randrange(0, 56), 'w': random.randrange(4, 12), 'h': random.randrange(4, 12)}
+        for _ in range(n)
+    ]
+
+
+@benchmark('get_bounds')
+def bench_get_bounds(n):
+    objs = random_objects(n)
+    def op():
+        for o in objs:
+            get_bounds(o)
+    return op
+
+
+@benchmark('get_bounds[rect]')
+def bench_get_bounds_rect(n):
+    objs = [Rect.from_dict(o) for o in random_objects(n)]
+    def op():
+        for o in objs:
+            get_bounds(o)
+    return op
+
+
+@benchmark('edge_collision')
+def bench_edge_collision(n):
+    objs = random_objects(n)
+    def op():
+        for o in objs:
+            edge_collision(o, SCREEN)
+    return op
+
+
+@benchmark('edge_collision[rect]')
+def bench_edge_collision_rect(n):
+    objs = [Rect.from_dict(o) for o in random_objects(n)]
+    screen = Rect.from_dict(SCREEN)
+    def op():
+        for o in objs:
+            edge_collision(o, screen)
+    return op
+
+
+@benchmark('box_collision')
+def bench_box_collision(n):
+    player = {'x': 60, 'y': 28, 'w': 8, 'h': 8}
+    objs = random_objects(n)
+    def op():
+        for o in objs:
+            box_collision(player, o)
+    return op
+
+
+@benchmark('box_collision[rect]')
+def bench_box_collision_rect(n):
+    player = Rect(60, 28, 8, 8)
+    objs = [Rect.from_dict(o) for o in random_objects(n)]
+    def op():
+        for o in objs:
+            box_collision(player, o)
+    return op
+
+
+@benchmark('box_collision[spatialhash]')
+def bench_box_collision_hash(n):
+    player = Rect(60, 28, 8, 8)
+    index = SpatialHash(16)
+    for o in random_objects(n):
+        index.insert(Rect.from_dict(o))
+    out = []
+    def op():
+        out.clear()
+        index.query(player, out)
+    return op
+
+
+@benchmark('box_collision[entities]')
+def bench_box_collision_entities(n):
+    store = EntityStore(n)
+    for o in random_objects(n):
+        store.add(o['x'], o['y'], o['w'], o['h'])
+    out = array('h', bytes(2 * n))
+    def op():
+        store.collide(60, 28, 8, 8, out)
+    return op
+
+
+@benchmark('move')
+def bench_move(n):
+    objs = random_objects(n)
+    heading = [90] # flipped every op, so coordinates stay small
+    def op():
+        for o in objs:
+            o['x'], o['y'] = move(o['x'], o['y'], heading[0], 1)
+        heading[0] = (heading[0] + 180) % 360
+    return op
+
+
+@benchmark('move[angle]')
+def bench_move_angle(n):
+    objs = random_objects(n)
+    heading = [45] # flipped every op, so coordinates stay small
+    def op():
+        for o in objs:
+            o['x'], o['y'] = move(o['x'], o['y'], heading[0], 1)
+        heading[0] = (heading[0] + 180) % 360
+    return op
+
+
+@benchmark('move_obj[rect]')
+def bench_move_obj_rect(n):
+    objs = [Rect.from_dict(o) for o in random_objects(n)]
+    heading = [90] # flipped every op, so coordinates stay small
+    def op():
+        for o in objs:
+            move_obj(o, heading[0], 1)
+        heading[0] = (heading[0] + 180) % 360
+    return op
+
+
+@benchmark('move[entities]')
+def bench_move_entities(n):
+    store = EntityStore(n)
+    for o in random_objects(n):
+        store.add(o['x'], o['y'], o['w'], o['h'], 90, 0) # speed 0, so positions can't overflow
+    return store.move_all
+
+
+@benchmark('rotate')
+def bench_rotate(n):
+    headings = [0] * n
+    def op():
+        for i in range(n):
+            headings[i] = rotate(headings[i], 90)
+    return op
+
+
+def measure(op, n: int, min_time: float) -> dict:
+    """ Time op (n calls) until min_time has passed, then measure the bytes allocated per call """
+    op() # warm up
+    loops = 1
+    while True:
+        start = perf_counter()
+        for _ in range(loops):
+            op()
+        elapsed = perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    ops_per_sec = loops / elapsed
+    result = {
+        'ops_per_sec': round(ops_per_sec, 1),
+        'calls_per_sec': round(ops_per_sec * n, 1),
+    }
+    if MICROPYTHON:
+        baseline = allocated(empty_loop(n))
+        result['alloc_bytes'] = round(max(0, allocated(op) - baseline) / n, 1)
+    return result
+
+
+def empty_loop(n: int):
+    """ Baseline for allocation measurements, a loop over n objects doing nothing (looping allocates an iterator) """
+    objs = [None] * n
+    def op():
+        for o in objs:
+            pass
+    return op
+
+
+def allocated(op, samples: int = 20) -> int:
+    """ Get the most bytes allocated by one op, out of a number of samples (MicroPython only) """
+    peak = 0
+    for _ in range(samples):
+        gc.collect()
+        gc.disable()
+        base = gc.mem_alloc()
+        op()
+        used = gc.mem_alloc() - base
+        gc.enable()
+        if used > peak:
+            peak = used
+    return peak
+
+
+def run(names: list = None, counts: tuple = OBJECT_COUNTS, min_time: float = 0.2) -> dict:
+    """ Run benchmarks, returning a JSON-serialisable dictionary of results """
+    results = []
+    for name, setup in BENCHMARKS:
+        if names and name not in names:
+            continue
+        for n in counts:
+            result = {'name': name, 'objects': n}
+            result.update(measure(setup(n), n, min_time))
+            results.append(result)
+
+    return {
+        'python': sys.implementation.name + ' ' + '.'.join(str(v) for v in sys.implementation.version[:3]),
+        'platform': sys.platform,
+        'timestamp': int(time.time()),
+        'results': results,
+    }
+
+
+def parse_args(argv: list) -> dict:
+    """ Parse command line arguments (argparse isn't available on MicroPython) """
+    args = {'names': [], 'json': None, 'compare': None, 'min_time': 0.2, 'counts': OBJECT_COUNTS}
+    argv = list(argv)
+    while argv:
+        arg = argv.pop(0)
+        if arg in ('-h', '--help'):
+            print(__doc__)
+            sys.exit(0)
+        elif arg == '--json':
+            args['json'] = argv.pop(0)
+        elif arg == '--compare':
+            args['compare'] = argv.pop(0)
+        elif arg == '--min-time':
+            args['min_time'] = float(argv.pop(0))
+        elif arg == '--counts':
+            args['counts'] = tuple(int(n) for n in argv.pop(0).split(','))
+        else:
+            args['names'].append(arg)
+    return args
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    report = run(args['names'], args['counts'], args['min_time'])
+
+    previous = {}
+    if args['compare']:
+        with open(args['compare']) as f:
+            for r in json.load(f)['results']:
+                previous[(r['name'], r['objects'])] = r
+
+    print('{:<28}{:>8}{:>14}{:>12}{:>9}'.format('benchmark', 'objects', 'calls/sec', 'bytes/call', 'vs old'))
+    for r in report['results']:
+        old = previous.get((r['name'], r['objects']))
+        ratio = '{:.2f}x'.format(r['ops_per_sec'] / old['ops_per_sec']) if old else ''
+        print('{:<28}{:>8}{:>14.0f}{:>12}{:>9}'.format(r['name'], r['objects'], r['calls_per_sec'], r.get('alloc_bytes', 'n/a'), ratio))
+
+    if args['json']:
+        with open(args['json'], 'w') as f:
+            json.dump(report, f)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Bitmap Cache
+
+Render text (or anything else) into off-screen frame buffers once, then show it with a
+single `blit()`. Keeps the most recently used bitmaps up to a size limit, with commonly
+used ones pinned so they are never thrown away.
+"""
+
+import framebuf
+
+
+class Canvas(framebuf.FrameBuffer):
+    """
+    Off-screen 1-bit frame buffer (same format as the SSD1306 display)
+
+    Has `width`/`height` attributes like a display driver, so font writers can draw to it.
+
+    Parameters
+    ----------
+    width: int
+        Width (px)
+    height: int
+        Height (px)
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.buffer = bytearray(((height + 7) // 8) * width)
+        super().__init__(self.buffer, width, height, framebuf.MONO_VLSB)
+
+
+def canvas_size(canvas) -> int:
+    """ Bytes used by a canvas bitmap """
+    return len(canvas.buffer)
+
+
+class LRUCache:
+    """
+    Least recently used cache of values created on demand
+
+    Parameters
+    ----------
+    load: function
+        Called as `load(key)` to create the value for a key that isn't cached
+    max_items: int, default 8
+        Maximum number of (unpinned) values kept
+    max_bytes: int, default 0
+        Maximum total size of (unpinned) values kept, 0 = no limit
+    size: function, optional
+        Called as `size(value)` to get the size (bytes) of a value, default `canvas_size`
+    """
+
+    def __init__(self, load, max_items: int = 8, max_bytes: int = 0, size = canvas_size):
+        self.load = load
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0 # size of unpinned values
+        self._values = {}
+        self._sizes = {}
+        self._order = [] # unpinned keys, least recently used first (MicroPython dicts don't keep order)
+        self._pinned = {}
+
+    def __len__(self) -> int:
+        return len(self._values) + len(self._pinned)
+
+    def __contains__(self, key) -> bool:
+        return key in self._values or key in self._pinned
+
+    def get(self, key):
+        """ Get the value for a key, creating it (and making room for it) if needed """
+        value = self._pinned.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        value = self._values.get(key)
+        if value is not None:
+            self.hits += 1
+            if self._order[-1] != key:
+                self._order.remove(key)
+                self._order.append(key)
+            return value
+
+        self.misses += 1
+        value = self.load(key)
+        size = self.size(value)
+        self._values[key] = value
+        self._sizes[key] = size
+        self._order.append(key)
+        self.bytes += size
+        self._evict()
+        return value
+
+    def pin(self, key):
+        """ Create (if needed) and keep the value for a key, it won't be evicted """
+        if key in self._pinned:
+            return self._pinned[key]
+        if key in self._values:
+            value = self._values.pop(key)
+            self.bytes -= self._sizes.pop(key)
+            self._order.remove(key)
+        else:
+            value = self.load(key)
+        self._pinned[key] = value
+        return value
+
+    def preload(self, keys):
+        """ Pin values for each of the keys, e.g. at start up """
+        for key in keys:
+            self.pin(key)
+
+    def clear(self):
+        """ Remove all unpinned values """
+        self._values = {}
+        self._sizes = {}
+        self._order = []
+        self.bytes = 0
+
+    def _evict(self):
+        while self._order and (len(self._order) > self.max_items or (self.max_bytes and self.bytes > self.max_bytes)):
+            key = self._order.pop(0)
+            del self._values[key]
+            self.bytes -= self._sizes.pop(key)
@@ -0,0 +1,103 @@
+"""
+Debounced Buttons
+
+Interrupt driven button driver with a per-button debounce. The first edge of a press or
+release is acted on straight away (so there is no added delay), then further edges are
+ignored until the contacts have settled. The interrupt handlers don't allocate memory, so
+they are run as hard IRQs.
+"""
+
+from array import array
+from machine import Pin, disable_irq, enable_irq
+import time
+
+try:
+    from events import EV_PRESS, EV_RELEASE
+except ImportError:
+    from libs.events import EV_PRESS, EV_RELEASE
+
+
+class Buttons:
+    """
+    Group of debounced buttons, referred to by index
+
+    Parameters
+    ----------
+    pins: list
+        GPIO pin numbers of the buttons
+    pull: int, default Pin.PULL_DOWN
+        Pull resistor to use (`Pin.PULL_DOWN`, `Pin.PULL_UP` or None)
+    active: int, default 1
+        Pin level when a button is pressed (1 with pull down resistors, 0 with pull up)
+    debounce_ms: int, default 20
+        Time (ms) after a change before another change is accepted
+    events: EventQueue, optional
+        Queue to put `EV_PRESS`/`EV_RELEASE` events in (see `events.py`)
+    callback: function, optional
+        Called as `callback(index, pressed, ticks_us)` on each change, from the interrupt
+        handler, so it must not allocate memory
+    hard: bool, default True
+        Use hard interrupts
+    """
+
+    def __init__(self, pins: list, pull: int = Pin.PULL_DOWN, active: int = 1, debounce_ms: int = 20, events = None, callback = None, hard: bool = True):
+        self.count = len(pins)
+        self.pins = [Pin(pin, Pin.IN, pull) for pin in pins]
+        self.active = active
+        self.debounce_us = debounce_ms * 1000
+        self.events = events
+        self.callback = callback
+        self.state = bytearray(self.count) # debounced state, 1 = pressed
+        self.changed_us = array('i', [0] * self.count) # ticks_us() of last accepted change
+        self.settling = bytearray(self.count) # 1 = debounce time since the last change not over yet
+        for idx in range(self.count):
+            self.state[idx] = 1 if self.pins[idx].value() == active else 0
+            self.changed_us[idx] = time.ticks_us()
+            self.pins[idx].irq(trigger = Pin.IRQ_RISING | Pin.IRQ_FALLING, handler = self._make_handler(idx), hard = hard)
+
+    def _make_handler(self, idx: int):
+        def handler(pin):
+            self._edge(idx, pin.value(), time.ticks_us())
+        return handler
+
+    def _edge(self, idx: int, level: int, t: int):
+        """ Debounce a change of pin level (interrupt context, must not allocate) """
+        if self.settling[idx]:
+            # ticks_us() wraps around (every ~18 minutes on the Pico), so the time since the
+            # last change is only compared while settling, and a negative time counts as settled
+            if 0 <= time.ticks_diff(t, self.changed_us[idx]) < self.debounce_us:
+                return # still bouncing from the last change
+            self.settling[idx] = 0
+        pressed = 1 if level == self.active else 0
+        if pressed == self.state[idx]:
+            return # contacts bounced back before the next interrupt
+        self.state[idx] = pressed
+        self.changed_us[idx] = t
+        self.settling[idx] = 1
+        if self.events is not None:
+            self.events.put(EV_PRESS if pressed else EV_RELEASE, idx, t)
+        if self.callback is not None:
+            self.callback(idx, pressed, t)
+
+    def poll(self):
+        """
+        Catch up with changes missed while debouncing
+
+        A change that happens (and settles) during the debounce time has no further edge
+        to trigger an interrupt, call this regularly (e.g. every main loop) to pick it up.
+        """
+        for idx in range(self.count):
+            state = disable_irq()
+            self._edge(idx, self.pins[idx].value(), time.ticks_us())
+            enable_irq(state)
+
+    def pressed(self, idx: int) -> bool:
+        """ Debounced state of a button, True = pressed """
+        return self.state[idx] == 1
+
+    def any_pressed(self) -> int:
+        """ Index of the first (lowest index) button pressed, or -1 if none are """
+        for idx in range(self.count):
+            if self.state[idx]:
+                return idx
+        return -1
@@ -1,7 +1,15 @@
 """
 Collision Detection Functions
+
+Objects can be dictionaries containing x/y/w/h, or `Rect` objects (no allocations)
 """
 
+try:
+    from rect import Rect
+except ImportError:
+    from libs.rect import Rect
+
+
 def get_bounds(obj):
     """
     Get object bounding box (left/right/top/bottom edges)
@@ -9,9 +17,13 @@ def get_bounds(obj):
     Parameters
     ----------
     
-    obj: dict
+    obj: dict|Rect
         Dictionary object containing the x/y coordinates and width/height of object
+        (a Rect is returned as is, it already keeps its edges up to date)
     """
+    if isinstance(obj, Rect):
+        return obj
+
     return  {
         'l': obj['x'],
         'r': obj['x'] + obj['w'] - 1,
@@ -24,6 +36,9 @@ def edge_collision(player, target):
     """
     Detect when player collides with the outer edge of the playing area
     """
+    if isinstance(player, Rect) and isinstance(target, Rect):
+        return player.l < target.l or player.r > target.r or player.t < target.t or player.b > target.b
+
     pb = get_bounds(player)
     tb = get_bounds(target)
 
@@ -37,6 +52,9 @@ def box_collision(player, target):
     """
     Detect when player collides with another object 
     """
+    if isinstance(player, Rect) and isinstance(target, Rect):
+        return player.l <= target.r and player.r >= target.l and player.t <= target.b and player.b >= target.t
+
     pb = get_bounds(player)
     tb = get_bounds(target)
 
@@ -0,0 +1,225 @@
+"""
+Entity Store
+
+Keeps the positions/sizes of many objects (bullets, enemies etc) in packed `array('h')`
+columns rather than one dictionary per object, with batch collision and movement
+operations that loop over the columns in one call.
+"""
+
+from array import array
+try:
+    from movement import move
+except ImportError:
+    from libs.movement import move
+
+try:
+    import micropython
+except ImportError:
+    # Not running on MicroPython (e.g. CPython on a PC), emit plain bytecode instead
+    class micropython:
+        @staticmethod
+        def native(f):
+            return f
+
+
+class EntityStore:
+    """
+    Fixed capacity store of entities (struct of arrays)
+
+    Each entity is referred to by its index (0 to capacity - 1). Removed indexes are
+    reused by later `add` calls.
+
+    Parameters
+    ----------
+    capacity: int
+        Maximum number of entities
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.x = array('h', bytes(2 * capacity))
+        self.y = array('h', bytes(2 * capacity))
+        self.w = array('h', bytes(2 * capacity))
+        self.h = array('h', bytes(2 * capacity))
+        self.dx = array('h', bytes(2 * capacity)) # pixels moved per step on x axis
+        self.dy = array('h', bytes(2 * capacity)) # pixels moved per step on y axis
+        self.active = bytearray(capacity) # 1 = entity in use
+        self.count = 0 # number of active entities
+        self._top = 0 # one past the highest index ever used (limits loops)
+
+    def add(self, x: int, y: int, w: int, h: int, direction: int = 0, speed: int = 0) -> int:
+        """
+        Add an entity
+
+        Parameters
+        ----------
+        x: int
+            X coordinate in pixels
+        y: int
+            Y coordinate in pixels
+        w: int
+            Width in pixels
+        h: int
+            Height in pixels
+        direction: int, default 0
+            Direction of movement in degrees
+        speed: int, default 0
+            Speed of movement in pixels per step
+
+        Returns
+        -------
+        int
+            Index of entity, or -1 if the store is full
+        """
+        for i in range(self.capacity):
+            if not self.active[i]:
+                break
+        else:
+            return -1 # full
+
+        self.x[i] = x
+        self.y[i] = y
+        self.w[i] = w
+        self.h[i] = h
+        self.set_motion(i, direction, speed)
+        self.active[i] = 1
+        self.count += 1
+        if i >= self._top:
+            self._top = i + 1
+        return i
+
+    def remove(self, i: int):
+        """ Remove entity by index """
+        if self.active[i]:
+            self.active[i] = 0
+            self.count -= 1
+            while self._top > 0 and not self.active[self._top - 1]:
+                self._top -= 1
+
+    def clear(self):
+        """ Remove all entities """
+        for i in range(self._top):
+            self.active[i] = 0
+        self.count = 0
+        self._top = 0
+
+    def set_motion(self, i: int, direction: int, speed: int):
+        """
+        Set direction and speed of an entity
+
+        The per-step x/y offset is worked out once here (using `movement.move`), so
+        `move_all` only has to add it on.
+        """
+        self.dx[i], self.dy[i] = move(0, 0, direction, speed)
+
+    @micropython.native
+    def move_all(self):
+        """ Move every active entity one step along its direction of movement """
+        xs = self.x
+        ys = self.y
+        dxs = self.dx
+        dys = self.dy
+        active = self.active
+        for i in range(self._top):
+            if active[i]:
+                xs[i] += dxs[i]
+                ys[i] += dys[i]
+
+    @micropython.native
+    def collide(self, x: int, y: int, w: int, h: int, out) -> int:
+        """
+        Find all active entities that overlap a box
+
+        Parameters
+        ----------
+        x: int
+            X coordinate of box in pixels
+        y: int
+            Y coordinate of box in pixels
+        w: int
+            Width of box in pixels
+        h: int
+            Height of box in pixels
+        out: array|list
+            Pre-allocated buffer (at least `capacity` long) to write matching indexes to
+
+        Returns
+        -------
+        int
+            Number of indexes written to `out`
+        """
+        r = x + w - 1
+        b = y + h - 1
+        xs = self.x
+        ys = self.y
+        ws = self.w
+        hs = self.h
+        active = self.active
+        n = 0
+        for i in range(self._top):
+            if active[i]:
+                ex = xs[i]
+                ey = ys[i]
+                if ex <= r and ex + ws[i] - 1 >= x and ey <= b and ey + hs[i] - 1 >= y:
+                    out[n] = i
+                    n += 1
+        return n
+
+    @micropython.native
+    def collide_mask(self, x: int, y: int, w: int, h: int) -> int:
+        """
+        Same as `collide`, but returns a bitmask (bit n set = entity n overlaps)
+
+        Keep capacity to 30 or less on MicroPython, so the mask stays a "small int" and
+        doesn't need allocating.
+        """
+        r = x + w - 1
+        b = y + h - 1
+        xs = self.x
+        ys = self.y
+        ws = self.w
+        hs = self.h
+        active = self.active
+        mask = 0
+        for i in range(self._top):
+            if active[i]:
+                ex = xs[i]
+                ey = ys[i]
+                if ex <= r and ex + ws[i] - 1 >= x and ey <= b and ey + hs[i] - 1 >= y:
+                    mask |= 1 << i
+        return mask
+
+    def collide_obj(self, obj, out) -> int:
+        """ Same as `collide`, for a dictionary object (or Rect) containing x/y/w/h """
+        return self.collide(obj['x'], obj['y'], obj['w'], obj['h'], out)
+
+    @micropython.native
+    def remove_outside(self, x: int, y: int, w: int, h: int) -> int:
+        """
+        Remove all entities that have completely left an area (e.g. bullets off screen)
+
+        Returns
+        -------
+        int
+            Number of entities removed
+        """
+        r = x + w - 1
+        b = y + h - 1
+        xs = self.x
+        ys = self.y
+        ws = self.w
+        hs = self.h
+        active = self.active
+        n = 0
+        for i in range(self._top):
+            if active[i]:
+                ex = xs[i]
+                ey = ys[i]
+                if ex > r or ex + ws[i] - 1 < x or ey > b or ey + hs[i] - 1 < y:
+                    active[i] = 0
+                    n += 1
+        if n:
+            self.count -= n
+            while self._top > 0 and not active[self._top - 1]:
+                self._top -= 1
+        return n
@@ -0,0 +1,121 @@
+"""
+Input Event Queue
+
+Fixed size ring buffer of (kind, index, timestamp) input events. Interrupt handlers push
+events without allocating memory, the main loop waits for them in a low power idle
+instead of busy polling the inputs. With `asyncio`, give the queue a `ThreadSafeFlag` to
+wake the task waiting for events instead.
+"""
+
+from array import array
+from machine import disable_irq, enable_irq, idle
+import time
+
+EV_RELEASE = 0
+EV_PRESS = 1
+
+
+class EventQueue:
+    """
+    Queue of input events, filled from interrupt handlers
+
+    Parameters
+    ----------
+    size: int, default 16
+        Maximum number of events waiting, events pushed when full are dropped
+    flag: ThreadSafeFlag, optional
+        `asyncio.ThreadSafeFlag` set whenever an event is added, for a task to wait on
+    """
+
+    def __init__(self, size: int = 16, flag = None):
+        self.size = size
+        self.flag = flag
+        self._kind = bytearray(size)
+        self._index = bytearray(size)
+        self._time = array('i', [0] * size) # ticks_us() timestamps (30 bit on the Pico)
+        self._head = 0 # oldest event
+        self._len = 0
+        self.dropped = 0 # events lost because the queue was full
+
+    def __len__(self) -> int:
+        return self._len
+
+    def put(self, kind: int, index: int, t: int) -> bool:
+        """
+        Add an event (safe to call from a hard interrupt handler)
+
+        Parameters
+        ----------
+        kind: int
+            Event type, e.g. `EV_PRESS` or `EV_RELEASE`
+        index: int
+            Index of the input (e.g. button) the event is for (0-255)
+        t: int
+            `time.ticks_us()` when the event happened
+
+        Returns
+        -------
+        bool
+            False if the queue was full and the event was dropped
+        """
+        if self._len == self.size:
+            self.dropped += 1
+            return False
+        i = (self._head + self._len) % self.size
+        self._kind[i] = kind
+        self._index[i] = index
+        self._time[i] = t
+        self._len += 1
+        if self.flag is not None:
+            self.flag.set() # safe in a hard interrupt handler, doesn't allocate
+        return True
+
+    def get(self):
+        """
+        Take the oldest event from the queue
+
+        Returns
+        -------
+        tuple|None
+            (kind, index, ticks_us) or None if the queue is empty
+        """
+        state = disable_irq()
+        if self._len == 0:
+            enable_irq(state)
+            return None
+        i = self._head
+        kind = self._kind[i]
+        index = self._index[i]
+        t = self._time[i]
+        self._head = (i + 1) % self.size
+        self._len -= 1
+        enable_irq(state)
+        return kind, index, t
+
+    def wait(self, timeout_ms: int = -1):
+        """
+        Wait (in low power idle) for the next event and take it from the queue
+
+        Parameters
+        ----------
+        timeout_ms: int, default -1
+            Give up after this many milliseconds (-1 = wait forever)
+
+        Returns
+        -------
+        tuple|None
+            (kind, index, ticks_us) or None if it timed out
+        """
+        start = time.ticks_ms()
+        while self._len == 0:
+            if timeout_ms >= 0 and time.ticks_diff(time.ticks_ms(), start) >= timeout_ms:
+                return None
+            idle() # sleep until the next interrupt
+        return self.get()
+
+    def clear(self):
+        """ Throw away all waiting events """
+        state = disable_irq()
+        self._head = 0
+        self._len = 0
+        enable_irq(state)
@@ -0,0 +1,139 @@
+"""
+Pixel Mask Collision Detection
+
+Pixel-accurate collisions for sprites that aren't rectangular. Each sprite has a 1-bit
+mask, which can be the very same bitmap used to draw it with `framebuf` (MONO_HLSB,
+MONO_HMSB or MONO_VLSB format). Masks are only compared once `box_collision` says the
+bounding boxes overlap, and then whole rows are ANDed together at a time.
+"""
+
+try:
+    from collisions import box_collision
+except ImportError:
+    from libs.collisions import box_collision
+
+try:
+    import framebuf
+    MONO_VLSB = framebuf.MONO_VLSB
+    MONO_HLSB = framebuf.MONO_HLSB
+    MONO_HMSB = framebuf.MONO_HMSB
+except ImportError:
+    # Not running on MicroPython, use the same values as the framebuf module
+    framebuf = None
+    MONO_VLSB = 0
+    MONO_HLSB = 3
+    MONO_HMSB = 4
+
+# Bit reversed value of each byte (MONO_HLSB has the leftmost pixel in the top bit)
+_REVERSED = bytes(sum(((n >> i) & 1) << (7 - i) for i in range(8)) for n in range(256))
+
+
+class Mask:
+    """
+    1-bit collision mask
+
+    Each row of the bitmap is stored as an integer, with bit 0 the leftmost pixel, so two
+    rows can be lined up with a shift and tested with a single AND. Sprites up to 30
+    pixels wide stay within MicroPython "small ints" (no allocations when checking).
+
+    Parameters
+    ----------
+    buf: bytes|bytearray
+        Bitmap data (e.g. the buffer behind the sprite's FrameBuffer)
+    w: int
+        Width in pixels
+    h: int
+        Height in pixels
+    fmt: int, default MONO_HLSB
+        Bitmap format, one of MONO_HLSB, MONO_HMSB or MONO_VLSB
+    """
+
+    def __init__(self, buf, w: int, h: int, fmt: int = MONO_HLSB):
+        self.buf = buf
+        self.w = w
+        self.h = h
+        self.fmt = fmt
+        self.rows = self._make_rows(buf, w, h, fmt)
+
+    @staticmethod
+    def _make_rows(buf, w: int, h: int, fmt: int) -> list:
+        """ Convert bitmap into a list of row integers (bit 0 = leftmost pixel) """
+        full = (1 << w) - 1
+        rows = []
+
+        if fmt == MONO_VLSB:
+            for y in range(h):
+                offset = (y >> 3) * w
+                bit = 1 << (y & 7)
+                row = 0
+                for x in range(w):
+                    if buf[offset + x] & bit:
+                        row |= 1 << x
+                rows.append(row)
+            return rows
+
+        stride = (w + 7) >> 3
+        for y in range(h):
+            line = buf[y * stride:(y + 1) * stride]
+            if fmt == MONO_HLSB:
+                line = bytes(_REVERSED[b] for b in line)
+            elif fmt != MONO_HMSB:
+                raise ValueError('unsupported mask format')
+            rows.append(int.from_bytes(line, 'little') & full)
+        return rows
+
+    @classmethod
+    def from_rect(cls, w: int, h: int):
+        """ Create solid mask (every pixel set) """
+        stride = (w + 7) >> 3
+        return cls(b'\xff' * (stride * h), w, h, MONO_HMSB)
+
+    def framebuffer(self):
+        """ Get a FrameBuffer over the mask bitmap (for drawing the sprite with `blit`) """
+        if framebuf is None:
+            raise RuntimeError('framebuf module not available')
+        return framebuf.FrameBuffer(self.buf, self.w, self.h, self.fmt)
+
+
+def mask_collision(player, player_mask: Mask, target, target_mask: Mask) -> bool:
+    """
+    Detect when the set pixels of player overlap the set pixels of another object
+
+    Parameters
+    ----------
+    player: dict|Rect
+        Dictionary object (or Rect) containing the x/y coordinates and width/height
+    player_mask: Mask
+        Collision mask of player (same size as player)
+    target: dict|Rect
+        Dictionary object (or Rect) containing the x/y coordinates and width/height
+    target_mask: Mask
+        Collision mask of target (same size as target)
+    """
+    if not box_collision(player, target):
+        return False # Bounding boxes don't overlap, masks can't either
+
+    px = player['x']
+    py = player['y']
+    tx = target['x']
+    ty = target['y']
+    y0 = py if py > ty else ty
+    y1 = py + player_mask.h
+    if ty + target_mask.h < y1:
+        y1 = ty + target_mask.h
+
+    p_rows = player_mask.rows
+    t_rows = target_mask.rows
+    shift = px - tx
+
+    if shift >= 0:
+        for y in range(y0, y1):
+            if (p_rows[y - py] << shift) & t_rows[y - ty]:
+                return True # Collision detected
+    else:
+        shift = -shift
+        for y in range(y0, y1):
+            if p_rows[y - py] & (t_rows[y - ty] << shift):
+                return True # Collision detected
+
+    return False
@@ -2,8 +2,19 @@
 Object Movement Functions
 
 For moving objects around a screen in games etc
+
+Directions can be any whole number of degrees (0 = up, clockwise). Movement uses a sine
+lookup table in fixed-point integers (worked out once on import), so there is no float
+trig per frame - the RP2040 has no FPU.
 """
 
+from array import array
+from math import sin, radians
+try:
+    from rect import Rect
+except ImportError:
+    from libs.rect import Rect
+
 # Assign directions to angles/degrees of circle (can be assigned to 'dpad' buttons)
 DIRECTIONS = {
     'up': 0,     # north/forward
@@ -12,6 +23,48 @@ DIRECTIONS = {
     'left': 270  # west/counter-clockwise
 }
 
+# Fixed-point numbers: integer with FP_SHIFT bits of sub-pixel precision (256 = 1 pixel)
+FP_SHIFT = 8
+FP_ONE = 1 << FP_SHIFT
+FP_HALF = FP_ONE >> 1
+
+# Number of angles in a full turn, every direction is an index into the sine table
+ANGLES = 360
+
+# Sine of each whole degree, scaled by FP_ONE (cosine = sine 90 degrees on)
+SIN_TABLE = array('h', [round(sin(radians(a)) * FP_ONE) for a in range(ANGLES)])
+
+
+def to_fp(px: int) -> int:
+    """ Convert whole pixels to fixed-point """
+    return px << FP_SHIFT
+
+
+def from_fp(fp: int) -> int:
+    """ Convert fixed-point to whole pixels (rounded to nearest) """
+    return (fp + FP_HALF) >> FP_SHIFT
+
+
+def sin_fp(angle: int) -> int:
+    """ Sine of angle (degrees) in fixed-point """
+    return SIN_TABLE[angle % ANGLES]
+
+
+def cos_fp(angle: int) -> int:
+    """ Cosine of angle (degrees) in fixed-point """
+    return SIN_TABLE[(angle + 90) % ANGLES]
+
+
+def step_fp(speed: int, sine: int) -> int:
+    """
+    Distance moved along one axis: speed times a sine table entry, scaled back down by
+    FP_ONE and rounded half away from zero (so opposite directions move the same distance)
+    """
+    v = speed * sine
+    if v >= 0:
+        return (v + FP_HALF) >> FP_SHIFT
+    return -((FP_HALF - v) >> FP_SHIFT)
+
 
 def move(x: int, y: int, direction: int, speed: int) -> tuple[int, int]:
     """
@@ -37,18 +90,72 @@ def move(x: int, y: int, direction: int, speed: int) -> tuple[int, int]:
     y: int
         New y coordinate in pixels
     """
-    if direction == DIRECTIONS['up']:
-        y -= speed
-    elif direction == DIRECTIONS['down']:
-        y += speed
-    elif direction == DIRECTIONS['left']:
-        x -= speed
-    elif direction == DIRECTIONS['right']:
-        x += speed
+    direction %= ANGLES
+    x += step_fp(speed, SIN_TABLE[direction])
+    y -= step_fp(speed, SIN_TABLE[(direction + 90) % ANGLES])
 
     return x, y
 
 
+def move_fp(fx: int, fy: int, direction: int, speed: int) -> tuple[int, int]:
+    """
+    Move object using fixed-point (sub-pixel) coordinates
+
+    Keep the fixed-point position between frames and draw at `from_fp(fx)`,
+    `from_fp(fy)`, so slow or diagonal movement doesn't lose the fractions of a pixel.
+
+    Parameters
+    ----------
+    fx: int
+        Current x coordinate in fixed-point
+    fy: int
+        Current y coordinate in fixed-point
+    direction: int
+        Direction to move object in degrees
+    speed: int
+        Speed to move object in fixed-point pixels (e.g. FP_ONE + FP_HALF = 1.5 pixels)
+
+    Returns
+    -------
+    fx: int
+        New x coordinate in fixed-point
+    fy: int
+        New y coordinate in fixed-point
+    """
+    direction %= ANGLES
+    fx += step_fp(speed, SIN_TABLE[direction])
+    fy -= step_fp(speed, SIN_TABLE[(direction + 90) % ANGLES])
+
+    return fx, fy
+
+
+def move_obj(obj, direction: int, speed: int):
+    """
+    Move object in place
+
+    Same as `move`, but updates the x/y coordinates of the object itself. A Rect is moved
+    without allocating anything (and its edges are kept up to date).
+
+    Parameters
+    ----------
+    obj: dict|Rect
+        Dictionary object (or Rect) containing the x/y coordinates of object
+    direction: int
+        Direction to move object in degrees
+    speed: int
+        Speed to move object in pixels (more pixels = faster)
+    """
+    if isinstance(obj, Rect):
+        direction %= ANGLES
+        obj.move_by(
+            step_fp(speed, SIN_TABLE[direction]),
+            -step_fp(speed, SIN_TABLE[(direction + 90) % ANGLES])
+        )
+        return
+
+    obj['x'], obj['y'] = move(obj['x'], obj['y'], direction, speed)
+
+
 def flip(current_direction) -> int:
     """
     Flip direction
@@ -115,7 +222,8 @@ def rotate(current_position, rotate_by, ccw = False) -> int:
     current_position: int
         Current position in degrees
     rotate_by: int
-        Number of degrees to rotate (will wrap around 360 back to 0)
+        Number of degrees to rotate (will wrap around 360 back to 0, so the result is
+        always an index into the sine table)
     ccw: bool, default False
         Rotate counter-clockwise (default is clockwise)
 
@@ -125,6 +233,6 @@ def rotate(current_position, rotate_by, ccw = False) -> int:
         New position in degrees
     """
     if ccw:
-        return (current_position - rotate_by) % 360 # counter-clockwise
+        return (current_position - rotate_by) % ANGLES # counter-clockwise
         
-    return (current_position + rotate_by) % 360 # clockwise
+    return (current_position + rotate_by) % ANGLES # clockwise
@@ -0,0 +1,87 @@
+"""
+Compact Rectangle Type
+
+A fixed-layout (`__slots__`) rectangle that keeps its left/right/top/bottom edges up to
+date in place, so collision checks can read them without building a new bounds
+dictionary on every call (less garbage = fewer GC pauses mid-frame).
+"""
+
+
+class Rect:
+    """
+    Rectangle with x/y coordinates, width/height and pre-computed edges
+
+    Always change position/size via `set_pos`, `move_by`, `resize` (or item assignment)
+    so the edges stay in sync. Supports dictionary style access (`rect['x']`) so it can be
+    passed anywhere a dictionary object is expected.
+
+    Parameters
+    ----------
+    x: int
+        X coordinate in pixels
+    y: int
+        Y coordinate in pixels
+    w: int
+        Width in pixels
+    h: int
+        Height in pixels
+    """
+    __slots__ = ('x', 'y', 'w', 'h', 'l', 'r', 't', 'b')
+
+    def __init__(self, x: int = 0, y: int = 0, w: int = 1, h: int = 1):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.l = x
+        self.r = x + w - 1
+        self.t = y
+        self.b = y + h - 1
+
+    @classmethod
+    def from_dict(cls, obj):
+        """ Create Rect from dictionary object containing x/y/w/h """
+        return cls(obj['x'], obj['y'], obj['w'], obj['h'])
+
+    def set_pos(self, x: int, y: int):
+        """ Move to x/y coordinates """
+        self.x = x
+        self.y = y
+        self.l = x
+        self.r = x + self.w - 1
+        self.t = y
+        self.b = y + self.h - 1
+
+    def move_by(self, dx: int, dy: int):
+        """ Move by dx/dy pixels """
+        self.x += dx
+        self.y += dy
+        self.l += dx
+        self.r += dx
+        self.t += dy
+        self.b += dy
+
+    def resize(self, w: int, h: int):
+        """ Change width/height (top left corner stays put) """
+        self.w = w
+        self.h = h
+        self.r = self.x + w - 1
+        self.b = self.y + h - 1
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: int):
+        if key == 'x':
+            self.set_pos(value, self.y)
+        elif key == 'y':
+            self.set_pos(self.x, value)
+        elif key == 'w':
+            self.resize(value, self.h)
+        elif key == 'h':
+            self.resize(self.w, value)
+        else:
+            raise KeyError(key) # edges are derived, not set directly
+
+    def __repr__(self):
+        return 'Rect({}, {}, {}, {})'.format(self.x, self.y, self.w, self.h)
@@ -0,0 +1,166 @@
+"""
+Score Log
+
+High scores and game statistics, saved as an append-only log of fixed size records. Each
+save appends one small record, instead of rewriting a whole file, which is quick and
+spreads the writes over the flash. The log is only rewritten (compacted down to the
+latest record) once it is full. Every record has a sequence number, one more than the
+record before it, and at start up the record with the newest sequence number is used,
+skipping any record that was only half written or is out of sequence.
+"""
+
+import os
+import struct
+
+MAGIC = 0x5343 # 'SC', marks the start of each record
+
+
+def _checksum(data) -> int:
+    """ Fletcher-16 checksum """
+    a = 0
+    b = 0
+    for byte in data:
+        a = (a + byte) % 255
+        b = (b + a) % 255
+    return (b << 8) | a
+
+
+def _newer(seq: int, than: int) -> bool:
+    """ Check if a sequence number comes after another (allowing for roll over at 65535) """
+    return 0 < ((seq - than) & 0xffff) < 0x8000
+
+
+class ScoreLog:
+    """
+    Best scores per level and number of games played, saved to a log file
+
+    Parameters
+    ----------
+    path: str, default 'scores.log'
+        Log file
+    levels: int, default 4
+        Number of levels to keep a best score for
+    max_records: int, default 64
+        Number of records the log grows to before being compacted
+    """
+
+    def __init__(self, path: str = 'scores.log', levels: int = 4, max_records: int = 64):
+        self.path = path
+        self.levels = levels
+        self.max_records = max_records
+        self.format = '<HHH' + str(levels) + 'HH' # magic, seq, games, best per level, checksum
+        self.record_size = struct.calcsize(self.format)
+        self.seq = 0 # sequence number of latest record (rolls over at 65535)
+        self.games = 0 # games played
+        self.bests = [0] * levels # best score per level
+        self.records = 0 # records in the log file
+        self.load()
+
+    def best(self, level: int) -> int:
+        """ Best score for a level """
+        return self.bests[level]
+
+    def load(self) -> bool:
+        """
+        Read the latest record from the log (called when created)
+
+        Returns
+        -------
+        bool
+            False if there was no valid record (scores start from zero)
+        """
+        try:
+            size = os.stat(self.path)[6]
+        except OSError:
+            try:
+                os.rename(self.path + '.tmp', self.path) # power was lost while compacting
+                size = os.stat(self.path)[6]
+            except OSError:
+                self.records = 0
+                return False
+
+        self.records = size // self.record_size
+        damaged = size % self.record_size != 0 # last write didn't finish
+        latest = None
+        with open(self.path, 'rb') as f:
+            for _ in range(self.records):
+                values = self._unpack(f.read(self.record_size))
+                if values is None:
+                    damaged = True
+                elif latest is None or _newer(values[1], latest[1]):
+                    if latest is not None and values[1] != (latest[1] + 1) & 0xffff:
+                        damaged = True # records missing in between
+                    latest = values
+                else:
+                    damaged = True # older than a record before it (left over from a previous log)
+
+        if latest is None:
+            self.records = 0
+            return False
+        self.seq = latest[1]
+        self.games = latest[2]
+        self.bests = list(latest[3:3 + self.levels])
+        if damaged:
+            self.records = 0 # start a clean log on the next save
+        return True
+
+    def record_game(self, level: int, score: int) -> bool:
+        """
+        Count a game and save the score if it's the best for the level
+
+        Returns
+        -------
+        bool
+            True if it was a new best score
+        """
+        self.games = min(self.games + 1, 0xffff)
+        new_best = score > self.bests[level]
+        if new_best:
+            self.bests[level] = score
+        self.save()
+        return new_best
+
+    def save(self):
+        """ Append the current scores to the log (compacting it first if full) """
+        self.seq = (self.seq + 1) & 0xffff
+        record = self._pack()
+        if self.records == 0 or self.records >= self.max_records:
+            self._compact(record)
+            return
+        with open(self.path, 'ab') as f:
+            f.write(record)
+        self.records += 1
+
+    def reset(self):
+        """ Clear all scores and statistics """
+        self.games = 0
+        self.bests = [0] * self.levels
+        self.save()
+
+    def _compact(self, record: bytes):
+        """ Replace the log with a single record """
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(record)
+        try:
+            os.rename(tmp, self.path) # replaces the old log in one step (LittleFS)
+        except OSError:
+            try:
+                os.remove(self.path) # file systems that can't rename over a file
+            except OSError:
+                pass
+            os.rename(tmp, self.path)
+        self.records = 1
+
+    def _pack(self) -> bytes:
+        data = struct.pack(self.format[:-1], MAGIC, self.seq, self.games, *self.bests)
+        return data + struct.pack('<H', _checksum(data))
+
+    def _unpack(self, data: bytes):
+        """ Record values, or None if it isn't a valid record """
+        if len(data) != self.record_size:
+            return None
+        values = struct.unpack(self.format, data)
+        if values[0] != MAGIC or values[-1] != _checksum(data[:-2]):
+            return None
+        return values
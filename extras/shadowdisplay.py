@@ -0,0 +1,131 @@
+"""
+Shadow Display (SSD1306 page diffing)
+
+Wraps an SSD1306 display driver and keeps a copy of the last frame sent to the screen.
+`show()` then only sends the columns of each 8-pixel page that have changed, instead of
+the whole frame buffer (1 KB for 128x64, around 25 ms over 400 kHz I2C).
+"""
+
+try:
+    import micropython
+except ImportError:
+    # Not running on MicroPython (e.g. CPython on a PC), emit plain bytecode instead
+    class micropython:
+        @staticmethod
+        def native(f):
+            return f
+
+SET_COL_ADDR = 0x21
+SET_PAGE_ADDR = 0x22
+CMD_BYTES = 12 # bytes of commands to set the column/page window (6 commands, 2 bytes each)
+
+
+@micropython.native
+def _page_diff(buf, shadow, start: int, width: int, cols):
+    """ Find first/last changed column of a page, stored in cols[0]/cols[1] (-1 if none) """
+    first = -1
+    for x in range(width):
+        if buf[start + x] != shadow[start + x]:
+            first = x
+            break
+    cols[0] = first
+    if first < 0:
+        cols[1] = -1
+        return
+    last = width - 1
+    while buf[start + last] == shadow[start + last]:
+        last -= 1
+    cols[1] = last
+
+
+class ShadowDisplay:
+    """
+    SSD1306 display wrapper that only sends what changed
+
+    Everything other than `show()` is passed straight through to the wrapped driver, so
+    it can be used in place of the driver (drawing, `Writer` fonts etc).
+
+    Parameters
+    ----------
+    display: SSD1306
+        SSD1306 display driver (e.g. SSD1306_I2C)
+    """
+
+    def __init__(self, display):
+        self.display = display
+        self.width = display.width
+        self.height = display.height
+        self.pages = display.height // 8
+        self.buffer = display.buffer
+        self.shadow = bytearray(len(display.buffer)) # copy of what is on the screen
+        self.col_offset = (128 - self.width) // 2 if self.width != 128 else 0 # narrow displays
+        self.bytes_sent = 0 # bytes sent by show() (data and commands)
+        self.bytes_saved = 0 # bytes not sent compared to sending whole frames
+        self._synced = False # shadow matches the screen
+        self._first = bytearray(self.pages) # first changed column of each page
+        self._last = bytearray(self.pages) # last changed column of each page
+        self._changed = bytearray(self.pages) # 1 = page has changes
+        self._cols = [0, 0]
+        self._buf_mv = memoryview(self.buffer)
+
+    def __getattr__(self, name):
+        return getattr(self.display, name)
+
+    def show(self, full: bool = False):
+        """
+        Send changes to the screen
+
+        Parameters
+        ----------
+        full: bool, default False
+            Send the whole frame (e.g. if something else has written to the screen)
+        """
+        frame_bytes = CMD_BYTES + len(self.buffer)
+        if full or not self._synced:
+            self._show_full()
+            return
+
+        width = self.width
+        cols = self._cols
+        cost = 0
+        for page in range(self.pages):
+            _page_diff(self.buffer, self.shadow, page * width, width, cols)
+            if cols[0] < 0:
+                self._changed[page] = 0
+                continue
+            self._changed[page] = 1
+            self._first[page] = cols[0]
+            self._last[page] = cols[1]
+            cost += CMD_BYTES + cols[1] - cols[0] + 1
+
+        if cost == 0:
+            self.bytes_saved += frame_bytes
+            return
+        if cost >= frame_bytes:
+            self._show_full() # so much has changed it's cheaper to send it all
+            return
+
+        display = self.display
+        mv = self._buf_mv
+        for page in range(self.pages):
+            if not self._changed[page]:
+                continue
+            start = page * width + self._first[page]
+            end = page * width + self._last[page] + 1
+            display.write_cmd(SET_COL_ADDR)
+            display.write_cmd(self._first[page] + self.col_offset)
+            display.write_cmd(self._last[page] + self.col_offset)
+            display.write_cmd(SET_PAGE_ADDR)
+            display.write_cmd(page)
+            display.write_cmd(page)
+            display.write_data(mv[start:end])
+            self.shadow[start:end] = mv[start:end]
+
+        self.bytes_sent += cost
+        self.bytes_saved += frame_bytes - cost
+
+    def _show_full(self):
+        self.display.show()
+        self.shadow[:] = self.buffer
+        self.bytes_sent += CMD_BYTES + len(self.buffer)
+        self._synced = True
@@ -0,0 +1,183 @@
+"""
+Spatial Hash Collision Index
+
+Uniform grid "broad phase" for collision detection. Objects are filed under every grid
+cell their bounding box touches, so a query only has to run `box_collision` against the
+objects in nearby cells instead of every object in the level.
+"""
+
+try:
+    from collisions import get_bounds, box_collision
+except ImportError:
+    from libs.collisions import get_bounds, box_collision
+
+# Large enough that cell keys of on-screen (and slightly off-screen) objects never clash
+_ROW_STRIDE = 4096
+
+
+class SpatialHash:
+    """
+    Uniform grid spatial hash
+
+    Objects are any dictionary (or object) accepted by `get_bounds`, i.e. with x/y
+    coordinates and width/height. Pick a cell size around the size of a typical sprite,
+    e.g. 8 or 16 pixels for a 128x64 display.
+
+    Parameters
+    ----------
+    cell_size: int, default 16
+        Width and height of each grid cell in pixels
+    """
+
+    def __init__(self, cell_size: int = 16):
+        self.cell_size = cell_size
+        self._cells = {} # cell key -> list of object ids
+        self._items = {} # object id -> [object, cx0, cy0, cx1, cy1, query stamp]
+        self._stamp = 0 # incremented every query, used to skip objects already checked
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, obj) -> bool:
+        return id(obj) in self._items
+
+    def _cell_range(self, obj):
+        """ Get the range of cells (inclusive) covered by object bounding box """
+        b = get_bounds(obj)
+        cs = self.cell_size
+        return b['l'] // cs, b['t'] // cs, b['r'] // cs, b['b'] // cs
+
+    def _add_cells(self, oid, cx0, cy0, cx1, cy1):
+        cells = self._cells
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                key = cy * _ROW_STRIDE + cx
+                cell = cells.get(key)
+                if cell is None:
+                    cells[key] = [oid]
+                else:
+                    cell.append(oid)
+
+    def _remove_cells(self, oid, cx0, cy0, cx1, cy1):
+        cells = self._cells
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                key = cy * _ROW_STRIDE + cx
+                cell = cells[key]
+                cell.remove(oid)
+                if not cell:
+                    del cells[key] # don't keep empty cells around
+
+    def insert(self, obj):
+        """
+        Add object to the index (if already present, same as calling `update`)
+
+        Parameters
+        ----------
+        obj: dict
+            Dictionary object containing the x/y coordinates and width/height of object
+        """
+        oid = id(obj)
+        if oid in self._items:
+            self.update(obj)
+            return
+
+        cx0, cy0, cx1, cy1 = self._cell_range(obj)
+        self._items[oid] = [obj, cx0, cy0, cx1, cy1, 0]
+        self._add_cells(oid, cx0, cy0, cx1, cy1)
+
+    def remove(self, obj):
+        """ Remove object from the index (does nothing if not present) """
+        item = self._items.pop(id(obj), None)
+        if item is not None:
+            self._remove_cells(id(obj), item[1], item[2], item[3], item[4])
+
+    def update(self, obj):
+        """
+        Re-file object after it has moved or changed size
+
+        Only touches the grid when the object has crossed into a different set of cells,
+        which for small moves is most of the time not the case.
+        """
+        oid = id(obj)
+        item = self._items.get(oid)
+        if item is None:
+            self.insert(obj)
+            return
+
+        cx0, cy0, cx1, cy1 = self._cell_range(obj)
+        if cx0 == item[1] and cy0 == item[2] and cx1 == item[3] and cy1 == item[4]:
+            return # still in the same cells
+
+        self._remove_cells(oid, item[1], item[2], item[3], item[4])
+        self._add_cells(oid, cx0, cy0, cx1, cy1)
+        item[1] = cx0
+        item[2] = cy0
+        item[3] = cx1
+        item[4] = cy1
+
+    def clear(self):
+        """ Remove all objects from the index """
+        self._cells.clear()
+        self._items.clear()
+
+    def query(self, box, out: list = None) -> list:
+        """
+        Find all objects in the index that overlap the given box
+
+        Parameters
+        ----------
+        box: dict
+            Dictionary object containing the x/y coordinates and width/height of area to
+            check (typically the player). If the box itself is in the index it is skipped.
+        out: list, optional
+            List to append results to (pass a list you clear yourself to avoid allocating
+            a new one every frame)
+
+        Returns
+        -------
+        list
+            Objects that overlap the box
+        """
+        if out is None:
+            out = []
+
+        self._stamp += 1
+        stamp = self._stamp
+        box_id = id(box)
+        cells = self._cells
+        items = self._items
+        cx0, cy0, cx1, cy1 = self._cell_range(box)
+
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                cell = cells.get(cy * _ROW_STRIDE + cx)
+                if cell is None:
+                    continue
+                for oid in cell:
+                    item = items[oid]
+                    if item[5] == stamp or oid == box_id:
+                        continue # already checked in another cell, or the box itself
+                    item[5] = stamp
+                    if box_collision(box, item[0]):
+                        out.append(item[0])
+
+        return out
+
+    def any(self, box) -> bool:
+        """ Check if the given box overlaps any object in the index """
+        cells = self._cells
+        items = self._items
+        box_id = id(box)
+        cx0, cy0, cx1, cy1 = self._cell_range(box)
+
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                cell = cells.get(cy * _ROW_STRIDE + cx)
+                if cell is None:
+                    continue
+                for oid in cell:
+                    if oid != box_id and box_collision(box, items[oid][0]):
+                        return True # Collision detected
+
+        return False
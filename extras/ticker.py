@@ -0,0 +1,106 @@
+"""
+Second Ticker
+
+Runs a loop once a second, in step with the real time clock. Instead of sleeping for a
+second after the work is done (which drifts by however long the work took), each tick
+has a deadline a whole number of seconds after the moment the RTC's seconds rolled over,
+so updates happen within a few milliseconds of each new second. Late and missed ticks
+are counted.
+"""
+
+import time
+
+POLL_MS = 1 # how often the RTC is read while waiting for its seconds to roll over
+EDGE_MARGIN_MS = 2 # tick this long after the rollover, so rounding never wakes it too early
+
+
+class SecondTicker:
+    """
+    Tick once per RTC second
+
+    Parameters
+    ----------
+    rtc: RTC
+        Real time clock to follow
+    late_ms: int, default 20
+        A tick this many milliseconds (or more) after its deadline is counted as late
+    """
+
+    def __init__(self, rtc, late_ms: int = 20):
+        self.rtc = rtc
+        self.late_ms = late_ms
+        self.ticks = 0 # ticks so far
+        self.late = 0 # ticks that ran late_ms or more after the second started
+        self.missed = 0 # seconds skipped altogether
+        self.relocks = 0 # times the deadline had to be moved to match the RTC again
+        self._next = None # ticks_ms() deadline of next tick, None = not locked on yet
+        self._second = -1 # RTC seconds at last tick
+
+    def lock(self) -> tuple:
+        """
+        Wait for the RTC's seconds to roll over, and time the next ticks from then
+
+        After setting the RTC (which moves the rollover), call `relock()` instead, so the
+        loop still gets the second it locks on to.
+
+        Returns
+        -------
+        tuple
+            RTC datetime just after the rollover
+        """
+        second = self.rtc.datetime()[6]
+        while True:
+            time.sleep_ms(POLL_MS)
+            dt = self.rtc.datetime()
+            if dt[6] != second:
+                break
+        self._next = time.ticks_add(time.ticks_ms(), 1000 + EDGE_MARGIN_MS)
+        self._second = dt[6]
+        return dt
+
+    def relock(self):
+        """ Lock on again at the next `wait()` (after setting the RTC), which returns the second it locks on to """
+        self._next = None
+
+    def wait(self) -> tuple:
+        """
+        Wait for the next second
+
+        Returns
+        -------
+        tuple
+            RTC datetime of the new second
+        """
+        if self._next is None:
+            self.ticks += 1
+            return self.lock()
+
+        wait_ms = time.ticks_diff(self._next, time.ticks_ms())
+        if wait_ms > 0:
+            time.sleep_ms(wait_ms)
+
+        late_ms = time.ticks_diff(time.ticks_ms(), self._next)
+        if late_ms >= 1000:
+            self._next = time.ticks_add(self._next, (late_ms // 1000) * 1000) # catch up
+            late_ms %= 1000
+        if late_ms >= self.late_ms:
+            self.late += 1
+
+        dt = self.rtc.datetime()
+        step = (dt[6] - self._second) % 60
+        if step == 0:
+            # Woke up before the RTC rolled over (ticks_ms and RTC drifted apart), lock on again
+            self.relocks += 1
+            dt = self.lock()
+        else:
+            if step > 1:
+                self.missed += step - 1
+            self._next = time.ticks_add(self._next, 1000)
+            self._second = dt[6]
+
+        self.ticks += 1
+        return dt
+
+    def stats(self) -> dict:
+        """ Counts of ticks, late/missed ticks and relocks """
+        return {'ticks': self.ticks, 'late': self.late, 'missed': self.missed, 'relocks': self.relocks}
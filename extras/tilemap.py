@@ -0,0 +1,191 @@
+"""
+Tile Map Collision Layer
+
+Static map of solid/empty tiles (walls of a maze/level) packed into a bitmap, one bit
+per tile. Checking a box against the walls is a few bit tests per tile row it covers,
+however many walls there are.
+"""
+
+try:
+    from movement import move
+except ImportError:
+    from libs.movement import move
+
+# Mask of bits from bit n to bit 7 (inclusive) and from bit 0 to bit n (inclusive)
+_MASK_FROM = bytes((0xff << n) & 0xff for n in range(8))
+_MASK_TO = bytes((0xff >> (7 - n)) for n in range(8))
+
+
+class TileMap:
+    """
+    Bitmap of solid tiles
+
+    Tile (col, row) covers pixels `col * tile_w` to `(col + 1) * tile_w - 1` across and
+    `row * tile_h` to `(row + 1) * tile_h - 1` down. Anything outside the map counts as
+    solid, so it doubles as the edge of the playing area.
+
+    Parameters
+    ----------
+    cols: int
+        Number of tile columns
+    rows: int
+        Number of tile rows
+    tile_w: int, default 8
+        Tile width in pixels
+    tile_h: int, default 8
+        Tile height in pixels
+    """
+
+    def __init__(self, cols: int, rows: int, tile_w: int = 8, tile_h: int = 8):
+        self.cols = cols
+        self.rows = rows
+        self.tile_w = tile_w
+        self.tile_h = tile_h
+        self.stride = (cols + 7) >> 3 # bytes per row
+        self.bits = bytearray(self.stride * rows)
+
+    @classmethod
+    def from_strings(cls, rows: list, tile_w: int = 8, tile_h: int = 8, solid: str = '#'):
+        """
+        Create tile map from a list of strings, one per row (e.g. `'#...##'`)
+
+        Parameters
+        ----------
+        rows: list
+            List of strings, any `solid` character is a wall, anything else is empty
+        solid: str, default '#'
+            Character(s) that count as solid
+        """
+        tm = cls(max(len(r) for r in rows), len(rows), tile_w, tile_h)
+        for row, line in enumerate(rows):
+            for col, ch in enumerate(line):
+                if ch in solid:
+                    tm.set_solid(col, row)
+        return tm
+
+    def set_solid(self, col: int, row: int, solid: bool = True):
+        """ Make tile solid (or empty) """
+        i = row * self.stride + (col >> 3)
+        if solid:
+            self.bits[i] |= 1 << (col & 7)
+        else:
+            self.bits[i] &= ~(1 << (col & 7)) & 0xff
+
+    def is_solid(self, col: int, row: int) -> bool:
+        """ Check if tile is solid (outside the map is solid) """
+        if col < 0 or row < 0 or col >= self.cols or row >= self.rows:
+            return True
+        return bool(self.bits[row * self.stride + (col >> 3)] & (1 << (col & 7)))
+
+    def box_blocked(self, x: int, y: int, w: int, h: int) -> bool:
+        """
+        Check if any solid tile is under a box
+
+        Parameters
+        ----------
+        x: int
+            X coordinate in pixels
+        y: int
+            Y coordinate in pixels
+        w: int
+            Width in pixels
+        h: int
+            Height in pixels
+
+        Returns
+        -------
+        bool
+            True if the box overlaps a solid tile (or goes outside the map)
+        """
+        if x < 0 or y < 0:
+            return True
+        c0 = x // self.tile_w
+        c1 = (x + w - 1) // self.tile_w
+        r0 = y // self.tile_h
+        r1 = (y + h - 1) // self.tile_h
+        if c1 >= self.cols or r1 >= self.rows:
+            return True
+
+        bits = self.bits
+        b0 = c0 >> 3
+        b1 = c1 >> 3
+        first = _MASK_FROM[c0 & 7]
+        last = _MASK_TO[c1 & 7]
+        for row in range(r0 * self.stride, (r1 + 1) * self.stride, self.stride):
+            if b0 == b1:
+                if bits[row + b0] & first & last:
+                    return True
+                continue
+            if bits[row + b0] & first or bits[row + b1] & last:
+                return True
+            for i in range(row + b0 + 1, row + b1):
+                if bits[i]:
+                    return True
+
+        return False
+
+    def obj_blocked(self, obj) -> bool:
+        """ Same as `box_blocked`, for a dictionary object (or Rect) containing x/y/w/h """
+        return self.box_blocked(obj['x'], obj['y'], obj['w'], obj['h'])
+
+    def move(self, obj, direction: int, speed: int, clip: bool = True) -> bool:
+        """
+        Move object (in place) unless it would run into a wall
+
+        Moves along each axis separately, so moving diagonally into a wall slides along
+        it. Speed should not be more than a tile width/height, otherwise objects can jump
+        through thin walls.
+
+        Parameters
+        ----------
+        obj: dict|Rect
+            Dictionary object (or Rect) containing the x/y coordinates and width/height
+        direction: int
+            Direction to move object in degrees
+        speed: int
+            Speed to move object in pixels
+        clip: bool, default True
+            Move the object up against the wall (when False, the blocked part of the move
+            is rejected and the object stays where it was on that axis)
+
+        Returns
+        -------
+        bool
+            True if a wall was hit
+        """
+        x, y, w, h = obj['x'], obj['y'], obj['w'], obj['h']
+        nx, ny = move(x, y, direction, speed)
+        obj_x, obj_y = nx, ny # unclipped target position
+        hit = False
+
+        if nx != x:
+            if self.box_blocked(nx, y, w, h):
+                hit = True
+                if clip:
+                    if nx > x:
+                        nx = ((nx + w - 1) // self.tile_w) * self.tile_w - w # left of wall
+                    else:
+                        nx = (nx // self.tile_w + 1) * self.tile_w # right of wall
+                    if (nx - x) * (obj_x - x) < 0 or self.box_blocked(nx, y, w, h):
+                        nx = x # would have to move backwards, or already in a wall
+                else:
+                    nx = x
+            x = nx
+
+        if ny != y:
+            if self.box_blocked(x, ny, w, h):
+                hit = True
+                if clip:
+                    if ny > y:
+                        ny = ((ny + h - 1) // self.tile_h) * self.tile_h - h # above wall
+                    else:
+                        ny = (ny // self.tile_h + 1) * self.tile_h # below wall
+                    if (ny - y) * (obj_y - y) < 0 or self.box_blocked(x, ny, w, h):
+                        ny = y # would have to move backwards, or already in a wall
+                else:
+                    ny = y
+            y = ny
+
+        obj['x'] = x
+        obj['y'] = y
+        return hit
@@ -0,0 +1,176 @@
+"""
+Time Sources
+
+Get the current time from the network, to set the real time clock. Each source has a
+`fetch()` method returning a timestamp: (seconds since the epoch, milliseconds,
+`time.ticks_ms()` when it was taken). `datetime_now()` turns a timestamp into an
+`RTC.datetime()` tuple, allowing for the time that has passed since it was fetched (e.g.
+while it was handed over from another thread).
+
+- `SNTPSource` : one 48 byte UDP exchange with an NTP server, corrected for network delay
+- `WorldTimeAPISource` : HTTP request to the worldtimeapi.org JSON API (local time or UTC)
+"""
+
+import socket, struct, time
+
+try:
+    import urequests
+except ImportError:
+    urequests = None
+
+# Seconds from the NTP epoch (1900) to the board's epoch (1970, or 2000 on older MicroPython)
+NTP_DELTA = 2208988800 if time.gmtime(0)[0] == 1970 else 3155673600
+
+NTP_PORT = 123
+
+
+def current_time(stamp: tuple) -> tuple:
+    """
+    Time now, from a timestamp fetched earlier
+
+    Returns
+    -------
+    tuple
+        (seconds since the epoch, milliseconds)
+    """
+    secs, ms, ticks = stamp
+    ms += time.ticks_diff(time.ticks_ms(), ticks)
+    return secs + ms // 1000, ms % 1000
+
+
+def datetime_now(stamp: tuple) -> tuple:
+    """
+    Time now as an `RTC.datetime()` tuple (to the nearest second), from a timestamp fetched earlier
+    """
+    secs, ms = current_time(stamp)
+    if ms >= 500:
+        secs += 1
+    t = time.gmtime(secs)
+    return (t[0], t[1], t[2], t[6], t[3], t[4], t[5], 0)
+
+
+class SNTPSource:
+    """
+    Simple NTP (SNTP) client
+
+    Parameters
+    ----------
+    host: str, default 'pool.ntp.org'
+        NTP server
+    timeout: float, default 2
+        Seconds to wait for a reply
+    utc_offset: int, default 0
+        Seconds to add to UTC (NTP time is always UTC)
+    port: int, default 123
+        NTP server port
+    """
+
+    def __init__(self, host: str = 'pool.ntp.org', timeout: float = 2, utc_offset: int = 0, port: int = NTP_PORT):
+        self.host = host
+        self.timeout = timeout
+        self.utc_offset = utc_offset
+        self.port = port
+        self.rtt_us = 0 # network round trip of last fetch (excluding time spent in the server)
+
+    def fetch(self) -> tuple:
+        """
+        Get the time from the NTP server
+
+        Returns
+        -------
+        tuple
+            (seconds since the epoch, milliseconds, ticks_ms)
+
+        Raises
+        ------
+        OSError
+            No reply (timed out) or an invalid reply
+        """
+        addr = socket.getaddrinfo(self.host, self.port)[0][-1]
+        query = bytearray(48)
+        query[0] = 0x1B # LI = 0, version = 3, mode = 3 (client)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.settimeout(self.timeout)
+            sent_us = time.ticks_us()
+            sock.sendto(query, addr)
+            msg = sock.recv(48)
+            recv_us = time.ticks_us()
+            ticks = time.ticks_ms()
+        finally:
+            sock.close()
+
+        if len(msg) < 48 or msg[0] & 0x07 != 4 or msg[1] == 0:
+            raise OSError('invalid NTP reply') # not a server reply, or "kiss of death" (stratum 0)
+        rx_secs, rx_frac, tx_secs, tx_frac = struct.unpack('!4I', msg[32:48])
+        if tx_secs == 0:
+            raise OSError('invalid NTP reply')
+
+        # Round trip, less the time between the server receiving the query and replying
+        server_us = (tx_secs - rx_secs) * 1000000 + (((tx_frac - rx_frac) * 1000000) >> 32)
+        self.rtt_us = max(0, time.ticks_diff(recv_us, sent_us) - server_us)
+
+        # Time the reply was sent, plus the time it took to get here (half the round trip)
+        ms = ((tx_frac * 1000) >> 32) + self.rtt_us // 2000
+        secs = tx_secs - NTP_DELTA + self.utc_offset + ms // 1000
+        return secs, ms % 1000, ticks
+
+
+class WorldTimeAPISource:
+    """
+    worldtimeapi.org time API client (local time for a timezone, including daylight saving)
+
+    Parameters
+    ----------
+    uri: str, default 'http://worldtimeapi.org/api/timezone/Europe/London'
+        API URI for your timezone (or `http://worldtimeapi.org/api/ip`)
+    timeout: float, default 10
+        Seconds to wait for a reply
+    utc: bool, default False
+        Give UTC instead of local time (e.g. when local time is worked out on the board)
+    """
+
+    def __init__(self, uri: str = 'http://worldtimeapi.org/api/timezone/Europe/London', timeout: float = 10, utc: bool = False):
+        self.uri = uri
+        self.timeout = timeout
+        self.utc = utc
+
+    def fetch(self) -> tuple:
+        """
+        Get the time from the API
+
+        Returns
+        -------
+        tuple
+            (seconds since the epoch, milliseconds, ticks_ms) - local time, or UTC if `utc` is set
+
+        Raises
+        ------
+        OSError
+            Request failed
+        """
+        start = time.ticks_ms()
+        response = urequests.get(self.uri, timeout = self.timeout)
+        ticks = time.ticks_ms()
+        try:
+            if response.status_code != 200:
+                raise OSError('HTTP ' + str(response.status_code))
+            json = response.json()
+        finally:
+            response.close()
+
+        the_date, the_time = json["datetime"].split("T") # e.g. 2024-03-31T02:00:01.123456+01:00
+        year, month, mday = [int(x) for x in the_date.split("-")]
+        offset = 0
+        if self.utc and the_time[-6] in "+-":
+            offset = int(the_time[-5:-3]) * 3600 + int(the_time[-2:]) * 60
+            if the_time[-6] == "-":
+                offset = -offset
+        the_time, frac = (the_time[:8], the_time[9:12]) if the_time[8] == "." else (the_time[:8], "0")
+        hours, minutes, seconds = [int(x) for x in the_time.split(":")]
+
+        # The time was read somewhere during the request, guess half way through
+        ms = int(frac) + time.ticks_diff(ticks, start) // 2
+        secs = time.mktime((year, month, mday, hours, minutes, seconds, 0, 0)) - offset + ms // 1000
+        return secs, ms % 1000, ticks
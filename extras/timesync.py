@@ -0,0 +1,179 @@
+"""
+Time Synchronisation
+
+Sets the real time clock from a time source (see `timesource.py`) over WiFi. The sync on
+boot waits until it succeeds, later syncs run in a thread on the second core (core 1), so
+the main loop on core 0 never waits for WiFi or the network: it asks for a sync with
+`request()` and sets the RTC with `apply()` once the time has been fetched. The two cores
+only share the request/result, always with the lock held.
+"""
+
+import time, _thread
+
+try:
+    from timesource import datetime_now
+except ImportError:
+    from libs.timesource import datetime_now
+
+
+def day_secs(hhmmss: str) -> int:
+    """
+    Convert a time of day (HH:MM:SS) into seconds since midnight
+    """
+    hours, minutes, seconds = [int(x) for x in hhmmss.split(":")]
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def crossed(prev_secs: int, now_secs: int, target_secs: int) -> bool:
+    """
+    Check if a time of day was reached between two ticks (even if a second was skipped)
+
+    Parameters
+    ----------
+    prev_secs : int
+        Time of previous tick (seconds since midnight)
+    now_secs : int
+        Time of this tick (seconds since midnight)
+    target_secs : int
+        Time to check for (seconds since midnight)
+    """
+    if prev_secs <= now_secs:
+        return prev_secs < target_secs <= now_secs
+    return target_secs > prev_secs or target_secs <= now_secs # passed midnight
+
+
+class TimeSync:
+    """
+    Fetch the time over WiFi, on boot and in the background
+
+    Parameters
+    ----------
+    wlan : WLAN
+        WiFi interface (`network.WLAN(network.STA_IF)`)
+    time_source : SNTPSource|WorldTimeAPISource
+        Where to get the time from (see `timesource.py`)
+    ssid : str
+        WiFi network name
+    password : str
+        WiFi password
+    wifi_timeout_ms : int, default 15000
+        Give up connecting to WiFi after this many milliseconds
+    retries : int, default 3
+        Attempts at each background sync
+    """
+
+    def __init__(self, wlan, time_source, ssid: str, password: str, wifi_timeout_ms: int = 15000, retries: int = 3):
+        self.wlan = wlan
+        self.time_source = time_source
+        self.ssid = ssid
+        self.password = password
+        self.wifi_timeout_ms = wifi_timeout_ms
+        self.retries = retries
+        self.lock = _thread.allocate_lock()
+        self.running = False # core 1 keeps running while True
+        self._requested = False # core 0 -> core 1: fetch the time
+        self._result = None # core 1 -> core 0: timestamp to set the RTC from
+
+    def connect_wifi(self) -> bool:
+        """
+        Connect to WiFi network
+
+        Returns
+        -------
+        bool
+            True if connected, False if it timed out
+        """
+        print("Connecting to WiFi", end="")
+        self.wlan.active(True)
+        self.wlan.connect(self.ssid, self.password)
+        start = time.ticks_ms()
+        while not self.wlan.isconnected():
+            if time.ticks_diff(time.ticks_ms(), start) > self.wifi_timeout_ms:
+                print(" Timed out!")
+                self.wlan.disconnect()
+                return False
+            print(".", end="")
+            time.sleep(0.1)
+        print(" Connected!")
+        return True
+
+    def fetch(self, retries: int = -1):
+        """
+        Use WiFi to get the current time from the time source
+
+        Parameters
+        ----------
+        retries : int
+            Number of attempts before giving up, -1 (default) = keep trying (used on first connection)
+
+        Returns
+        -------
+        tuple|None
+            Timestamp (see `timesource.py`), or None if it couldn't be fetched
+        """
+        attempt = 0
+        while retries < 0 or attempt < retries:
+            attempt += 1
+
+            # Make WiFi connection
+            if not self.connect_wifi():
+                continue
+
+            try:
+                return self.time_source.fetch()
+            except Exception as e:
+                print("Time sync failed:", e)
+            finally:
+                self.wlan.disconnect()
+
+        return None
+
+    def sync_rtc(self, rtc):
+        """
+        Set the RTC from the time source, waiting until it succeeds (used on boot)
+        """
+        rtc.datetime(datetime_now(self.fetch()))
+
+    def start(self):
+        """ Start the background sync thread on core 1 """
+        self.running = True
+        _thread.start_new_thread(self._worker, ())
+
+    def stop(self):
+        """ Stop the background sync thread (once any sync in progress is done) """
+        self.running = False
+
+    def _worker(self):
+        """ Wait for sync requests and fetch the time (runs on core 1) """
+        while self.running:
+            with self.lock:
+                requested = self._requested
+                self._requested = False
+            if requested:
+                result = self.fetch(self.retries)
+                if result is not None:
+                    with self.lock:
+                        self._result = result
+            time.sleep(0.1)
+
+    def request(self):
+        """ Ask core 1 to fetch the time (returns straight away) """
+        with self.lock:
+            self._requested = True
+
+    def apply(self, rtc) -> bool:
+        """
+        Set the RTC from the time fetched by core 1, if there is one waiting
+
+        Returns
+        -------
+        bool
+            True if the RTC was set
+        """
+        with self.lock:
+            result = self._result
+            self._result = None
+        if result is None:
+            return False
+        rtc.datetime(datetime_now(result)) # allowing for the time since it was fetched
+        return True
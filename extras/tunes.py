@@ -0,0 +1,190 @@
+"""
+Non-blocking Tune Sequencer
+
+Plays buzzer "tunes" in the background from a timer interrupt, so the main loop can keep
+reading buttons and updating the display while the buzzer plays. Tunes are compiled into
+arrays once, up front, so nothing is allocated while they play.
+"""
+
+from array import array
+from machine import Timer, disable_irq, enable_irq
+import time
+
+TICK_MS = 10 # timer resolution, note durations are rounded up to a multiple of this
+
+
+def compile_tune(notes, duration: int = 100) -> tuple:
+    """
+    Compile a tune into arrays of frequencies and durations
+
+    Parameters
+    ----------
+    notes: list|tuple
+        Either frequencies (Hz) each played for `duration` ms, e.g. `(131, 165, 196)`,
+        or [frequency, duration] pairs, e.g. `([783, 200], [0, 50])` - 0 Hz is a rest
+    duration: int, default 100
+        Duration (ms) of notes given without one
+
+    Returns
+    -------
+    tuple
+        (frequencies, durations) as `array('H')`
+    """
+    freqs = array('H')
+    durations = array('H')
+    for note in notes:
+        if isinstance(note, (list, tuple)):
+            freqs.append(int(note[0]))
+            durations.append(int(note[1]))
+        else:
+            freqs.append(int(note))
+            durations.append(duration)
+    return freqs, durations
+
+
+class TuneSequencer:
+    """
+    Play tunes on a PWM buzzer in the background
+
+    Parameters
+    ----------
+    buzzer: PWM
+        PWM output the buzzer is connected to
+    duty: int, default 3000
+        PWM duty cycle while a note plays - higher number = louder (max 65535)
+    tunes: dict, optional
+        Named tunes to compile up front (see `compile_tune` for the format)
+    duration: int, default 100
+        Duration (ms) of notes given without one
+    queue_size: int, default 4
+        Maximum number of tunes waiting to play
+    timer_id: int, default -1
+        Timer to use (-1 = virtual timer)
+    """
+
+    def __init__(self, buzzer, duty: int = 3000, tunes: dict = None, duration: int = 100, queue_size: int = 4, timer_id: int = -1):
+        self.buzzer = buzzer
+        self.duty = duty
+        self.duration = duration
+        self.tunes = {}
+        if tunes:
+            for name, notes in tunes.items():
+                self.add(name, notes, duration)
+
+        self._queue = [None] * queue_size # ring buffer of compiled tunes waiting to play
+        self._q_head = 0
+        self._q_len = 0
+        self._freqs = None # tune playing now
+        self._durations = None
+        self._note = 0 # index of note playing now
+        self._remaining = 0 # ms left of note playing now
+        self._timer = Timer(timer_id)
+        self._running = False
+        self._tick_cb = self._tick # bind once, creating bound methods allocates
+
+    def add(self, name: str, notes, duration: int = None):
+        """ Compile and store a named tune """
+        self.tunes[name] = compile_tune(notes, self.duration if duration is None else duration)
+
+    @property
+    def playing(self) -> bool:
+        """ True while a tune is playing (or waiting to) """
+        return self._freqs is not None or self._q_len > 0
+
+    def play(self, tune, queue: bool = False) -> bool:
+        """
+        Start playing a tune
+
+        Parameters
+        ----------
+        tune: str|tuple
+            Name of a tune added earlier, or a compiled tune from `compile_tune`
+        queue: bool, default False
+            Play after the tunes already playing/queued (default stops them and plays now)
+
+        Returns
+        -------
+        bool
+            False if the queue is full and the tune was dropped
+        """
+        if isinstance(tune, str):
+            tune = self.tunes[tune]
+
+        if not queue:
+            self.cancel()
+        if self._q_len == len(self._queue):
+            return False
+
+        state = disable_irq()
+        self._queue[(self._q_head + self._q_len) % len(self._queue)] = tune
+        self._q_len += 1
+        idle = self._freqs is None
+        if idle:
+            self._next_tune()
+        enable_irq(state)
+
+        if idle and not self._running:
+            self._running = True
+            self._timer.init(mode = Timer.PERIODIC, period = TICK_MS, callback = self._tick_cb)
+        return True
+
+    def tone(self, hz: int, duration: int, queue: bool = False) -> bool:
+        """ Play a single note (0 Hz = rest) for duration ms """
+        return self.play(compile_tune(((hz, duration),)), queue)
+
+    def cancel(self):
+        """ Stop playing and clear the queue """
+        self._timer.deinit()
+        self._running = False
+        self._freqs = None
+        self._durations = None
+        self._q_len = 0
+        for i in range(len(self._queue)):
+            self._queue[i] = None
+        self.buzzer.duty_u16(0)
+
+    def wait(self):
+        """ Block until everything queued has played """
+        while self.playing:
+            time.sleep_ms(TICK_MS)
+
+    # Interrupt context (must not allocate) ####################################
+
+    def _next_tune(self):
+        """ Start next tune in the queue (or go quiet if there isn't one) """
+        if self._q_len == 0:
+            self._freqs = None
+            self._durations = None
+            self.buzzer.duty_u16(0)
+            return
+        tune = self._queue[self._q_head]
+        self._queue[self._q_head] = None
+        self._q_head = (self._q_head + 1) % len(self._queue)
+        self._q_len -= 1
+        self._freqs = tune[0]
+        self._durations = tune[1]
+        self._note = 0
+        self._start_note()
+
+    def _start_note(self):
+        hz = self._freqs[self._note]
+        if hz > 0:
+            self.buzzer.freq(hz)
+            self.buzzer.duty_u16(self.duty)
+        else:
+            self.buzzer.duty_u16(0) # rest
+        self._remaining = self._durations[self._note]
+
+    def _tick(self, timer):
+        if self._freqs is None:
+            self._timer.deinit()
+            self._running = False
+            return
+        self._remaining -= TICK_MS
+        if self._remaining > 0:
+            return
+        self._note += 1
+        if self._note < len(self._freqs):
+            self._start_note()
+        else:
+            self._next_tune()
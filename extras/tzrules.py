@@ -0,0 +1,140 @@
+"""
+Timezone Rules
+
+Works out the local time from UTC on the board, using the daylight saving rules for a
+timezone, so the real time clock can be kept in UTC and the network is only needed to
+correct drift. The dates the clocks change are worked out once, into a small table of
+UTC transition times covering a few years (extended when the clock runs past the end),
+and looking up the offset is then just a comparison with the current period's start and
+end.
+
+Rules are "the last (or nth) Sunday of a month, at a time of day in UTC", which covers
+Europe (e.g. the UK: BST from 01:00 UTC on the last Sunday in March until 01:00 UTC on
+the last Sunday in October).
+"""
+
+import time
+
+DAY_SECS = 86400
+SUNDAY = 6 # time.gmtime() weekday, 0 = Monday
+LAST = -1 # rule week, last Sunday of the month
+
+# EU rules (UK & Ireland, and EU countries): change at 01:00 UTC on the last Sunday of
+# March (daylight saving starts) and October (ends)
+EU_RULES = ((3, LAST, 3600), (10, LAST, 3600))
+
+# Timezone name: (standard UTC offset (seconds), daylight saving offset added (seconds), rules)
+ZONES = {
+    'UTC': (0, 0, ()),
+    'Europe/London': (0, 3600, EU_RULES),
+    'Europe/Dublin': (0, 3600, EU_RULES),
+    'Europe/Lisbon': (0, 3600, EU_RULES),
+    'Europe/Paris': (3600, 3600, EU_RULES),
+    'Europe/Berlin': (3600, 3600, EU_RULES),
+    'Europe/Madrid': (3600, 3600, EU_RULES),
+    'Europe/Rome': (3600, 3600, EU_RULES),
+    'Europe/Amsterdam': (3600, 3600, EU_RULES),
+    'Europe/Athens': (7200, 3600, EU_RULES),
+    'Europe/Helsinki': (7200, 3600, EU_RULES),
+}
+
+
+def day_start(year: int, month: int, mday: int) -> int:
+    """ Seconds since the epoch at 00:00 UTC on a date (day may be past the end of the month) """
+    if month > 12:
+        year, month = year + 1, month - 12
+    return time.mktime((year, month, 1, 0, 0, 0, 0, 0)) + (mday - 1) * DAY_SECS
+
+
+def sunday(year: int, month: int, week: int) -> int:
+    """
+    Seconds since the epoch at 00:00 UTC on the nth (week 1 - 4) or last (week -1) Sunday of a month
+    """
+    if week == LAST:
+        last_day = day_start(year, month + 1, 1) - DAY_SECS
+        weekday = time.gmtime(last_day)[6]
+        return last_day - ((weekday - SUNDAY) % 7) * DAY_SECS
+    first_day = day_start(year, month, 1)
+    weekday = time.gmtime(first_day)[6]
+    return first_day + ((SUNDAY - weekday) % 7 + (week - 1) * 7) * DAY_SECS
+
+
+class TimeZone:
+    """
+    Local time from UTC, with daylight saving
+
+    Parameters
+    ----------
+    name: str, default 'Europe/London'
+        Timezone in `ZONES`
+    year: int, optional
+        First year of the transition table (default: current year, from the RTC)
+    years: int, default 2
+        Number of years in the transition table
+
+    Raises
+    ------
+    ValueError
+        Unknown timezone
+    """
+
+    def __init__(self, name: str = 'Europe/London', year: int = None, years: int = 2):
+        if name not in ZONES:
+            raise ValueError('unknown timezone: ' + name)
+        self.name = name
+        self.std_offset, self.dst_offset, self.rules = ZONES[name]
+        self.years = years
+        self.table = [] # (UTC seconds, offset from then on), in time order
+        self.table_start = 0 # UTC seconds covered by the table
+        self.table_end = 0
+        self._start = 0 # current period (UTC seconds), offset() is valid from _start to _end
+        self._end = -1
+        self._offset = self.std_offset
+        self.build(time.gmtime()[0] if year is None else year)
+
+    def build(self, year: int):
+        """ Work out the transition table, for whole years from the start of a year """
+        self.table = []
+        if self.rules:
+            start, end = self.rules
+            for y in range(year, year + self.years):
+                self.table.append((sunday(y, start[0], start[1]) + start[2], self.std_offset + self.dst_offset))
+                self.table.append((sunday(y, end[0], end[1]) + end[2], self.std_offset))
+            self.table.sort()
+        self.table_start = day_start(year, 1, 1)
+        self.table_end = day_start(year + self.years, 1, 1)
+        self._end = -1 # look up the period again
+
+    def offset(self, utc_secs: int) -> int:
+        """ Offset from UTC (seconds) at a time (UTC seconds since the epoch) """
+        if self._start <= utc_secs < self._end:
+            return self._offset
+
+        if not self.table_start <= utc_secs < self.table_end:
+            self.build(time.gmtime(utc_secs)[0]) # outside the table, move it on
+
+        # Period containing the time: from the last transition before it, until the next one
+        start = self.table_start
+        end = self.table_end
+        offset = self.table[-1][1] if self.table else self.std_offset # carried over from the year before
+        for change, change_offset in self.table:
+            if change > utc_secs:
+                end = change
+                break
+            start = change
+            offset = change_offset
+        self._start, self._end, self._offset = start, end, offset
+        return offset
+
+    def is_dst(self, utc_secs: int) -> bool:
+        """ Daylight saving in force at a time (UTC seconds since the epoch) """
+        return self.offset(utc_secs) != self.std_offset
+
+    def next_change(self, utc_secs: int) -> int:
+        """ UTC seconds since the epoch of the next change of offset (or end of the table) """
+        self.offset(utc_secs)
+        return self._end
+
+    def localtime(self, utc_secs: int) -> tuple:
+        """ Local time, in `time.gmtime()` format, at a time (UTC seconds since the epoch) """
+        return time.gmtime(utc_secs + self.offset(utc_secs))
@@ -1,8 +1,15 @@
+import machine
 from machine import Pin, PWM, I2C
 from libs.ssd1306 import SSD1306_I2C
 import libs.courier20 as courier20 # custom font
 from libs.writer_minimal import Writer # custom font display
-import time, sys
+from libs.tunes import TuneSequencer # background buzzer tunes
+from libs.shadowdisplay import ShadowDisplay # only send display changes
+from libs.bitmapcache import Canvas, LRUCache # pre-rendered text
+from libs.buttons import Buttons # debounced buttons
+import time, sys, micropython
+
+micropython.alloc_emergency_exception_buf(100) # report errors raised in (hard) IRQ handlers
 
 BTNLED_GPIO = [
     {'btn_pin': 18, 'led_pin': 10, 'btn': None, 'led': None, 'buzzer': 'r', 'label': 'RED',},
@@ -11,6 +18,8 @@ BTNLED_GPIO = [
     {'btn_pin': 21, 'led_pin': 13, 'btn': None, 'led': None, 'buzzer': 'y', 'label': 'YELLOW',},
 ]
 
+BTN_DEBOUNCE_MS = 20 # ignore button contact bounce for this long after a press/release
+
 BUZZER_PIN = 15
 BUZZER_DUTY = 3000 # PWM duty cycle - higher number = louder (max 65535)
 
@@ -25,22 +34,92 @@ BUZZER_FREQ = {
 OLED_PINS = {'SDA': 0, 'SCL': 1} # I2C Pins
 SCREEN = {'width': 128, 'height': 64} # Screen width and height (px)
 FONT = {'width': 14, 'height': 20} # Font width and height (px)
+LABEL_CACHE_SIZE = 4 # number of other (not button label) strings kept rendered
+
+# How the first button press is detected:
+# 'irq' - each button interrupt records a ticks_us() timestamp, earliest press wins
+# 'poll' - buttons are scanned in list order every loop (lower index wins a tie)
+ARBITRATION = 'irq'
 
 # Index of pressed button corresponds to index of matching LED and buzzer tune
 pressed = 0
 
+# Interrupt arbitration state (preallocated, IRQ handlers must not allocate memory)
+press_us = [0] * len(BTNLED_GPIO) # ticks_us() timestamp of each button press
+press_seen = bytearray(len(BTNLED_GPIO)) # 1 = button pressed since last reset
+first = -1 # index of first button pressed
+second = -1 # index of second button pressed
+margin_us = -1 # microseconds between first and second press
+
+# Interrupt arbitration
+
+def btn_change(idx: int, pressed: int, t: int):
+    """
+    Button change handler, called by the (debounced) button interrupt
+
+    Runs as a hard IRQ, so the timestamp is taken as soon as the button is pressed, and
+    the handler only updates preallocated state.
+    """
+    global first, second, margin_us
+    if not pressed or press_seen[idx]:
+        return # release, or already pressed this round
+    press_us[idx] = t
+    press_seen[idx] = 1
+    if first < 0:
+        first = idx
+    elif second < 0:
+        if time.ticks_diff(t, press_us[first]) < 0:
+            first, second = idx, first # timestamp earlier than the current winner
+        else:
+            second = idx
+        margin_us = time.ticks_diff(press_us[second], press_us[first])
+
+def arbitration_reset():
+    """Clear interrupt arbitration, ready for the next question"""
+    global first, second, margin_us
+    state = machine.disable_irq()
+    for btn in range(len(BTNLED_GPIO)):
+        press_seen[btn] = 0
+    first = -1
+    second = -1
+    margin_us = -1
+    machine.enable_irq(state)
+
+def reaction_margin_us() -> int:
+    """Microseconds between first and second place (-1 if nobody else pressed yet)"""
+    return margin_us
+
 # Setup Pin objects
 
-for btnled in BTNLED_GPIO:
-    btnled['btn'] = Pin(btnled['btn_pin'], Pin.IN, Pin.PULL_DOWN)
+buttons = Buttons([btnled['btn_pin'] for btnled in BTNLED_GPIO], Pin.PULL_DOWN, 1, BTN_DEBOUNCE_MS,
+                  callback = btn_change if ARBITRATION == 'irq' else None)
+
+for btn, btnled in enumerate(BTNLED_GPIO):
+    btnled['btn'] = buttons.pins[btn]
     btnled['led'] = Pin(btnled['led_pin'], Pin.OUT)
 
 buzzer = PWM(Pin(BUZZER_PIN))
+tunes = TuneSequencer(buzzer, BUZZER_DUTY, BUZZER_FREQ, 100) # 100 ms per note
 
 i2c = I2C(0, sda = Pin(OLED_PINS['SDA']), scl = Pin(OLED_PINS['SCL']), freq = 400000)
 time.sleep(1) # Allow I2C to kick in
-display = SSD1306_I2C(SCREEN['width'], SCREEN['height'], i2c)
-font_writer = Writer(display, courier20, False)
+display = ShadowDisplay(SSD1306_I2C(SCREEN['width'], SCREEN['height'], i2c))
+
+# Label bitmaps
+
+def render_label(txt: str):
+    """Render text in the large font into its own canvas (slow, only done once per string)"""
+    width = 0
+    for char in txt:
+        width += courier20.get_ch(char)[2]
+    canvas = Canvas(max(width, 1), FONT['height'])
+    writer = Writer(canvas, courier20, False)
+    writer.set_textpos(0, 0)
+    writer.printstring(txt)
+    return canvas
+
+labels = LRUCache(render_label, LABEL_CACHE_SIZE)
+labels.preload(btnled['label'] for btnled in BTNLED_GPIO) # button labels are always ready
 
 # Functions
 
@@ -48,24 +127,34 @@ def poll_btns():
     """
     Poll each button to see if it was pressed as soon as the first button press is detected
     store it's index and return True, otherwise return False until next scan
+
+    In 'irq' mode no buttons are read, the interrupt handlers have already decided which
+    button was pressed first.
     """
     global pressed
-    for btn in range(len(BTNLED_GPIO)):
-        if (BTNLED_GPIO[btn]['btn'].value() == 1):
-            pressed = btn # Update index of pressed button
-            return True # A button is pressed, return immediately
-    return False # No button pressed
+    if ARBITRATION == 'irq':
+        if first < 0:
+            return False # No button pressed
+        pressed = first
+        return True
+
+    btn = buttons.any_pressed()
+    if btn < 0:
+        return False # No button pressed
+    pressed = btn # Update index of pressed button
+    return True
+
+def btn_released(pressed: int) -> bool:
+    """Check if button for specified index has been released"""
+    return not buttons.pressed(pressed)
 
 def buzzer_on(pressed: int):
-    """Play the buzzer tune for specified button index"""
-    buzzer_id = BTNLED_GPIO[pressed]['buzzer']
-    for hz in BUZZER_FREQ[buzzer_id]:
-        buzzer.freq(hz)
-        buzzer.duty_u16(BUZZER_DUTY)
-        time.sleep_ms(100)
+    """Play the buzzer tune for specified button index (in the background, repeats while held)"""
+    if not tunes.playing:
+        tunes.play(BTNLED_GPIO[pressed]['buzzer'])
 
 def buzzer_off():
-    buzzer.duty_u16(0)
+    tunes.cancel()
 
 def led_on(pressed: int = -1):
     """Turn on LED for specified button index, or turn on all LEDs"""
@@ -85,12 +174,15 @@ def led_off(pressed: int = -1):
 
 def display_text(pressed: int):
     """Display label for specified button index"""
-    txt = BTNLED_GPIO[pressed]['label']
-    x = int((SCREEN['width'] - (FONT['width'] * len(txt))) / 2)
-    y = int((SCREEN['height'] - FONT['height']) / 2)
+    display_label(BTNLED_GPIO[pressed]['label'])
+
+def display_label(txt: str):
+    """Display text in the large font, centred on screen"""
+    label = labels.get(txt)
+    x = (SCREEN['width'] - label.width) // 2
+    y = (SCREEN['height'] - label.height) // 2
     display.fill(0)
-    font_writer.set_textpos(x, y)
-    font_writer.printstring(txt)
+    display.blit(label, x, y)
     display.show()
 
 def display_clear():
@@ -99,18 +191,42 @@ def display_clear():
     display.show()
 
 # Run program
+
+# States - hardware (LEDs, display, buzzer) is only touched when moving between states
+STATE_IDLE = 0 # waiting for a button press
+STATE_LOCKED = 1 # a button was pressed first, show it until the button is released
+STATE_RESET = 2 # clear LEDs/display/buzzer, ready for the next question
+
+LOOP_MS = 10 # loop interval (ms)
+
+state = STATE_RESET # start from a clean slate
 try:
     while True:
-        if (poll_btns()):
-            led_on(pressed)
-            display_text(pressed)
-            buzzer_on(pressed)
-        else:
+        buttons.poll() # catch changes that settled while debouncing
+
+        if state == STATE_IDLE:
+            if (poll_btns()):
+                led_on(pressed)
+                display_text(pressed)
+                buzzer_on(pressed)
+                if ARBITRATION == 'irq':
+                    print(BTNLED_GPIO[pressed]['label'], "first", "(no other press)" if second < 0 else "by " + str(reaction_margin_us()) + " us")
+                state = STATE_LOCKED
+
+        elif state == STATE_LOCKED:
+            if btn_released(pressed):
+                state = STATE_RESET
+            else:
+                buzzer_on(pressed) # repeat tune while held (does nothing while it is still playing)
+
+        elif state == STATE_RESET:
             buzzer_off()
             display_clear()
             led_off()
+            arbitration_reset()
+            state = STATE_IDLE
 
-        time.sleep_ms(100)
+        time.sleep_ms(LOOP_MS)
 except KeyboardInterrupt:
     buzzer_off()
     display_clear()
@@ -0,0 +1,136 @@
+"""
+Stand-in `framebuf` module
+
+Pure Python version of the MicroPython frame buffer for the 1-bit formats (MONO_VLSB,
+MONO_HLSB, MONO_HMSB), which is all the SSD1306 display and font writer need. Buffers are
+laid out exactly as on the device. `text()` draws a placeholder pattern per character
+rather than the real 8x8 font.
+"""
+
+from hw import stats
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+MVLSB = MONO_VLSB
+
+
+class FrameBuffer:
+
+    def __init__(self, buffer, width: int, height: int, format: int, stride: int = None):
+        if format not in (MONO_VLSB, MONO_HLSB, MONO_HMSB):
+            raise ValueError('invalid format')
+        self._buf = buffer
+        self._w = width
+        self._h = height
+        self._fmt = format
+        self._stride = width if stride is None else stride
+
+    def _get(self, x: int, y: int) -> int:
+        if self._fmt == MONO_VLSB:
+            return (self._buf[(y >> 3) * self._stride + x] >> (y & 7)) & 1
+        i = (x + y * ((self._stride + 7) & ~7)) >> 3
+        bit = 7 - (x & 7) if self._fmt == MONO_HLSB else x & 7
+        return (self._buf[i] >> bit) & 1
+
+    def _set(self, x: int, y: int, c: int):
+        if self._fmt == MONO_VLSB:
+            i = (y >> 3) * self._stride + x
+            bit = y & 7
+        else:
+            i = (x + y * ((self._stride + 7) & ~7)) >> 3
+            bit = 7 - (x & 7) if self._fmt == MONO_HLSB else x & 7
+        if c:
+            self._buf[i] |= 1 << bit
+        else:
+            self._buf[i] &= ~(1 << bit) & 0xff
+
+    def fill(self, c: int):
+        stats.count('framebuf.fill')
+        if self._fmt == MONO_VLSB and self._stride == self._w:
+            v = 0xff if c else 0
+            for i in range(len(self._buf)):
+                self._buf[i] = v
+        else:
+            self.fill_rect(0, 0, self._w, self._h, c)
+
+    def pixel(self, x: int, y: int, c: int = None):
+        if not (0 <= x < self._w and 0 <= y < self._h):
+            return
+        if c is None:
+            return self._get(x, y)
+        self._set(x, y, c)
+
+    def fill_rect(self, x: int, y: int, w: int, h: int, c: int):
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self._w, x + w), min(self._h, y + h)
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                self._set(xx, yy, c)
+
+    def hline(self, x: int, y: int, w: int, c: int):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x: int, y: int, h: int, c: int):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x: int, y: int, w: int, h: int, c: int, f: bool = False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def line(self, x1: int, y1: int, x2: int, y2: int, c: int):
+        dx, dy = abs(x2 - x1), -abs(y2 - y1)
+        sx, sy = (1 if x1 < x2 else -1), (1 if y1 < y2 else -1)
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def text(self, s: str, x: int, y: int, c: int = 1):
+        stats.count('framebuf.text')
+        for ch in s:
+            code = ord(ch)
+            if code != 32:
+                for row in range(7):
+                    bits = ((code * (row + 3) * 37) >> 2) & 0x7f | 0x41 # placeholder glyph
+                    for col in range(7):
+                        if bits & (1 << col):
+                            self.pixel(x + col, y + row, c)
+            x += 8
+
+    def scroll(self, xstep: int, ystep: int):
+        pixels = [[self._get(x, y) for x in range(self._w)] for y in range(self._h)]
+        for y in range(self._h):
+            for x in range(self._w):
+                sx, sy = x - xstep, y - ystep
+                if 0 <= sx < self._w and 0 <= sy < self._h:
+                    self._set(x, y, pixels[sy][sx])
+
+    def blit(self, fbuf, x: int, y: int, key: int = -1, palette=None):
+        stats.count('framebuf.blit')
+        for sy in range(fbuf._h):
+            dy = y + sy
+            if not 0 <= dy < self._h:
+                continue
+            for sx in range(fbuf._w):
+                dx = x + sx
+                if not 0 <= dx < self._w:
+                    continue
+                c = fbuf._get(sx, sy)
+                if palette is not None:
+                    c = palette._get(c, 0)
+                if c != key:
+                    self._set(dx, dy, c)
@@ -0,0 +1,83 @@
+"""
+Local HTTP stand-in for the worldtimeapi.org time API
+
+Serves `/api/timezone/<zone>` and `/api/ip` on localhost with the host's current time, in
+the same JSON format as worldtimeapi.org. Set `fail_next` to make the next n requests
+fail with HTTP 503.
+"""
+
+import json, threading, time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+fail_next = 0 # number of requests to fail
+requests = [] # paths requested
+
+_server = None
+
+
+def world_time(zone: str) -> dict:
+    """ Get current time in worldtimeapi.org format """
+    try:
+        tz = ZoneInfo(zone) if ZoneInfo and zone else None
+    except Exception:
+        tz = None
+    now = datetime.now(tz) if tz else datetime.now().astimezone()
+    offset = now.utcoffset()
+    dst = now.dst()
+    raw = int((offset - dst).total_seconds()) if dst is not None else int(offset.total_seconds())
+    return {
+        'abbreviation': now.tzname(),
+        'datetime': now.isoformat(timespec='microseconds'),
+        'day_of_week': int(now.strftime('%w')), # 0 = Sunday
+        'day_of_year': now.timetuple().tm_yday,
+        'dst': bool(dst),
+        'dst_offset': int(dst.total_seconds()) if dst else 0,
+        'raw_offset': raw,
+        'timezone': zone or 'Etc/UTC',
+        'unixtime': int(now.timestamp()),
+        'utc_datetime': now.astimezone(timezone.utc).isoformat(timespec='microseconds'),
+        'utc_offset': now.strftime('%z')[:3] + ':' + now.strftime('%z')[3:],
+        'week_number': int(now.strftime('%V')),
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        global fail_next
+        requests.append(self.path)
+        if fail_next > 0:
+            fail_next -= 1
+            self.send_error(503)
+            return
+        if self.path.startswith('/api/timezone/'):
+            body = world_time(self.path[len('/api/timezone/'):])
+        elif self.path.startswith('/api/ip'):
+            body = world_time(None)
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def address() -> tuple:
+    """ Start the server (once) and get its (host, port) """
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server.server_address
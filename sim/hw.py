@@ -0,0 +1,325 @@
+"""
+Simulated Hardware Core
+
+Virtual clock, scheduled events (button presses, timers) and instrumentation shared by
+the stand-in `machine`, `neopixel`, `network` and `urequests` modules.
+
+Time is "virtual": it moves on with real (host) time, but sleeps and bus transfers are
+skipped over instantly, so a program runs as fast as the host can execute its code while
+still seeing realistic `ticks_ms`/`ticks_us` values. Set `clock.realtime = True` to really
+sleep instead (needed when threads or asyncio are involved).
+"""
+
+import calendar, heapq, threading, time
+
+_perf_counter = time.perf_counter
+_real_sleep = time.sleep
+
+TICKS_PERIOD = 1 << 30 # MicroPython ticks wrap around at 2^30
+TICKS_HALFPERIOD = TICKS_PERIOD >> 1
+
+
+class Stats:
+    """ Hardware call counters and per-call timings """
+
+    def __init__(self):
+        self.counters = {}
+        self.timings = {} # name -> [calls, total seconds, max seconds]
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name: str, seconds: float):
+        t = self.timings.get(name)
+        if t is None:
+            self.timings[name] = [1, seconds, seconds]
+        else:
+            t[0] += 1
+            t[1] += seconds
+            if seconds > t[2]:
+                t[2] = seconds
+
+    def reset(self):
+        self.counters.clear()
+        self.timings.clear()
+
+    def as_dict(self) -> dict:
+        return {
+            'counters': dict(self.counters),
+            'timings': {
+                name: {'calls': t[0], 'total_us': round(t[1] * 1e6, 1), 'mean_us': round(t[1] / t[0] * 1e6, 2), 'max_us': round(t[2] * 1e6, 1)}
+                for name, t in self.timings.items()
+            },
+        }
+
+    def report(self) -> str:
+        lines = ['{:<32}{:>12}'.format('counter', 'value')]
+        for name in sorted(self.counters):
+            lines.append('{:<32}{:>12}'.format(name, self.counters[name]))
+        lines.append('')
+        lines.append('{:<32}{:>10}{:>12}{:>12}'.format('call', 'calls', 'mean us', 'max us'))
+        for name in sorted(self.timings):
+            t = self.timings[name]
+            lines.append('{:<32}{:>10}{:>12.2f}{:>12.1f}'.format(name, t[0], t[1] / t[0] * 1e6, t[2] * 1e6))
+        return '\n'.join(lines)
+
+
+stats = Stats()
+
+pwm_log = [] # (ms since start, pin id, frequency or 0 when silent, duty) for every PWM change
+
+
+def timed(name: str):
+    """ Decorator: count calls and record how long each call takes (host time) """
+    def decorate(f):
+        def wrapper(*args, **kwargs):
+            start = _perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                stats.record(name, _perf_counter() - start)
+        wrapper.__name__ = f.__name__
+        wrapper.__doc__ = f.__doc__
+        return wrapper
+    return decorate
+
+
+class Clock:
+    """ Virtual clock with a queue of scheduled events """
+
+    def __init__(self):
+        self.realtime = False
+        self.deadline = None # seconds, raise KeyboardInterrupt in main thread once passed
+        self._start = _perf_counter()
+        self._skipped = 0.0 # seconds of sleep/bus time skipped over
+        self._events = [] # heap of (time, seq, callback)
+        self._seq = 0
+        self._lock = threading.RLock()
+        self._in_event = False
+
+    def now(self) -> float:
+        """ Seconds since the simulation started """
+        return _perf_counter() - self._start + self._skipped
+
+    def ticks_us(self) -> int:
+        self.poll()
+        return int(self.now() * 1000000) % TICKS_PERIOD
+
+    def ticks_ms(self) -> int:
+        self.poll()
+        return int(self.now() * 1000) % TICKS_PERIOD
+
+    def schedule(self, at: float, callback):
+        """ Run callback once the clock reaches `at` seconds """
+        with self._lock:
+            self._seq += 1
+            heapq.heappush(self._events, (at, self._seq, callback))
+
+    def cancel(self, callback):
+        """ Remove all scheduled runs of callback """
+        with self._lock:
+            self._events = [e for e in self._events if e[2] is not callback]
+            heapq.heapify(self._events)
+
+    def next_event(self):
+        with self._lock:
+            return self._events[0][0] if self._events else None
+
+    def poll(self):
+        """ Run any events that are due (like an interrupt firing) """
+        if self._in_event:
+            return # no nested "interrupts"
+        now = self.now()
+        while True:
+            with self._lock:
+                if not self._events or self._events[0][0] > now:
+                    break
+                _, _, callback = heapq.heappop(self._events)
+            self._in_event = True
+            try:
+                callback()
+            finally:
+                self._in_event = False
+        self._check_deadline()
+
+    def _check_deadline(self):
+        if self.deadline is not None and self.now() >= self.deadline and threading.current_thread() is threading.main_thread():
+            if not self._in_event:
+                self.deadline = None # only once, so the program can clean up
+                raise KeyboardInterrupt
+
+    def advance(self, seconds: float):
+        """ Let time pass (skipped instantly, unless running in real time) """
+        if seconds <= 0:
+            return
+        if self.realtime:
+            _real_sleep(seconds)
+        else:
+            with self._lock:
+                self._skipped += seconds
+
+    def sleep(self, seconds: float):
+        """ Sleep, running any events that fall due in the meantime """
+        target = self.now() + seconds
+        while True:
+            self.poll()
+            nxt = self.next_event()
+            now = self.now()
+            if nxt is None or nxt > target:
+                break
+            self.advance(nxt - now)
+            if self.deadline is not None and self.now() >= self.deadline:
+                break
+        self.advance(target - self.now())
+        self.poll()
+
+    def busy(self, seconds: float):
+        """ Time taken by a bus transfer (I2C, NeoPixel data etc) """
+        self.advance(seconds)
+
+
+clock = Clock()
+
+
+def ticks_diff(ticks1: int, ticks2: int) -> int:
+    return ((ticks1 - ticks2 + TICKS_HALFPERIOD) % TICKS_PERIOD) - TICKS_HALFPERIOD
+
+
+def ticks_add(ticks: int, delta: int) -> int:
+    return (ticks + delta) % TICKS_PERIOD
+
+
+def install_time():
+    """ Add the MicroPython specific functions to the `time` module and virtualise sleep """
+    time.sleep = clock.sleep
+    time.sleep_ms = lambda ms: clock.sleep(ms / 1000)
+    time.sleep_us = lambda us: clock.sleep(us / 1000000)
+    time.ticks_ms = clock.ticks_ms
+    time.ticks_us = clock.ticks_us
+    time.ticks_cpu = clock.ticks_us
+    time.ticks_diff = ticks_diff
+    time.ticks_add = ticks_add
+    time.mktime = lambda t: calendar.timegm(tuple(t[:6]) + (0, 0, 0)) # 8-tuple, no timezone
+
+
+# Scripted inputs ##############################################################
+
+def set_input(pin_id: int, value: int, at_ms: float = None):
+    """
+    Drive an input pin high/low, now or at a given time (ms since start)
+
+    Fires the pin's IRQ handler if the edge matches its trigger.
+    """
+    from machine import Pin # imported here, machine imports this module
+
+    def apply():
+        Pin.drive(pin_id, value)
+
+    if at_ms is None:
+        apply()
+    else:
+        clock.schedule(at_ms / 1000, apply)
+
+
+def press(pin_id: int, at_ms: float, hold_ms: float = 100, active: int = 1):
+    """ Schedule a button press (active high by default, to match PULL_DOWN buttons) """
+    set_input(pin_id, active, at_ms)
+    set_input(pin_id, 1 - active, at_ms + hold_ms)
+
+
+# I2C devices ##################################################################
+
+I2C_DEVICES = {} # address -> device with write(data: bytes) and read(n) methods
+
+
+class SSD1306Panel:
+    """
+    Model of an SSD1306 OLED controller (horizontal addressing mode)
+
+    Decodes the command/data stream sent over I2C, so the simulated screen shows what was
+    actually transferred, not what the program meant to draw.
+    """
+
+    def __init__(self, width: int = 128, height: int = 64):
+        self.width = width
+        self.height = height
+        self.pages = height // 8
+        self.gram = bytearray(width * self.pages)
+        self.col = 0
+        self.page = 0
+        self.col_range = [0, width - 1]
+        self.page_range = [0, self.pages - 1]
+        self._pending = [] # command + arguments waiting for more argument bytes
+        self.display_on = False
+
+    _ARGS = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8d: 1, 0xa8: 1, 0xd3: 1, 0xd5: 1, 0xd9: 1, 0xda: 1, 0xdb: 1}
+
+    def write(self, data: bytes):
+        if not data:
+            return
+        control, payload = data[0], data[1:]
+        if control == 0x40:
+            self._write_data(payload)
+        else:
+            for b in payload:
+                self._command(b)
+
+    def read(self, n: int) -> bytes:
+        return bytes(n)
+
+    def _command(self, b: int):
+        if self._pending:
+            self._pending.append(b)
+        elif b in self._ARGS:
+            self._pending = [b]
+        else:
+            if b == 0xaf:
+                self.display_on = True
+            elif b == 0xae:
+                self.display_on = False
+            return
+        cmd = self._pending[0]
+        if len(self._pending) - 1 < self._ARGS[cmd]:
+            return
+        args = self._pending[1:]
+        self._pending = []
+        if cmd == 0x21:
+            self.col_range = [args[0], args[1]]
+            self.col = args[0]
+        elif cmd == 0x22:
+            self.page_range = [args[0], args[1]]
+            self.page = args[0]
+
+    def _write_data(self, payload: bytes):
+        stats.count('ssd1306.data_bytes', len(payload))
+        for b in payload:
+            if 0 <= self.col < self.width and 0 <= self.page < self.pages:
+                self.gram[self.page * self.width + self.col] = b
+            self.col += 1
+            if self.col > self.col_range[1]:
+                self.col = self.col_range[0]
+                self.page += 1
+                if self.page > self.page_range[1]:
+                    self.page = self.page_range[0]
+
+    def pixel(self, x: int, y: int) -> int:
+        return (self.gram[(y >> 3) * self.width + x] >> (y & 7)) & 1
+
+    def ascii(self) -> str:
+        """ Render screen as text, two pixel rows per line """
+        chars = {(0, 0): ' ', (1, 0): "'", (0, 1): '.', (1, 1): ':'}
+        lines = []
+        for y in range(0, self.height, 2):
+            lines.append(''.join(chars[(self.pixel(x, y), self.pixel(x, y + 1))] for x in range(self.width)).rstrip())
+        return '\n'.join(lines)
+
+
+def reset():
+    """ Reset clock, events, stats and devices (e.g. between benchmark runs) """
+    clock.__init__()
+    stats.reset()
+    pwm_log.clear()
+    I2C_DEVICES.clear()
+    from machine import Pin, RTC
+    Pin.reset_all()
+    RTC._offset = None
@@ -0,0 +1 @@
+# Stand-ins for the libraries copied into the Pico's `libs` folder
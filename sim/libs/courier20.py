@@ -0,0 +1,66 @@
+"""
+Stand-in for the font-to-py `courier20` font
+
+Same interface and glyph size (14x20, horizontally mapped) as the real font, with a
+placeholder pattern for each glyph.
+"""
+
+_HEIGHT = 20
+_WIDTH = 14
+_STRIDE = (_WIDTH + 7) // 8
+
+
+def height():
+    return _HEIGHT
+
+
+def baseline():
+    return 15
+
+
+def max_width():
+    return _WIDTH
+
+
+def hmap():
+    return True
+
+
+def reverse():
+    return False
+
+
+def monospaced():
+    return True
+
+
+def min_ch():
+    return 32
+
+
+def max_ch():
+    return 126
+
+
+def _glyph(code: int) -> bytes:
+    buf = bytearray(_STRIDE * _HEIGHT)
+    if code == 32:
+        return bytes(buf)
+    for row in range(2, _HEIGHT - 3):
+        bits = ((code * (row + 5) * 2654435761) >> 7) & 0xfff | 0x801 # placeholder pattern
+        bits <<= 1 # 12 bits centred in 14 pixel cell
+        buf[row * _STRIDE] = (bits >> 8) & 0xff
+        buf[row * _STRIDE + 1] = bits & 0xfc
+    return bytes(buf)
+
+
+_glyphs = {}
+
+
+def get_ch(ch: str):
+    code = ord(ch)
+    if code < min_ch() or code > max_ch():
+        code = 63 # '?'
+    if code not in _glyphs:
+        _glyphs[code] = _glyph(code)
+    return memoryview(_glyphs[code]), _HEIGHT, _WIDTH
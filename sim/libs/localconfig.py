@@ -0,0 +1,3 @@
+# Dummy WiFi credentials (the real file is not committed to Git)
+WIFI_SSID = 'simulated'
+WIFI_PW = 'simulated'
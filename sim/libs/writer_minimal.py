@@ -0,0 +1,60 @@
+"""
+Stand-in for the font-to-py `writer_minimal` Writer
+
+Renders each character by wrapping its glyph in a FrameBuffer and blitting it to the
+device, like the real (minimal) writer.
+"""
+
+import framebuf
+from hw import timed
+
+
+class Writer():
+    text_row = 0 # attributes common to all Writer instances
+    text_col = 0
+    row_clip = False # clip or scroll when screen full
+    col_clip = False # clip or new line when row is full
+
+    @classmethod
+    def set_textpos(cls, row: int = None, col: int = None):
+        if row is not None:
+            cls.text_row = row
+        if col is not None:
+            cls.text_col = col
+        return cls.text_row, cls.text_col
+
+    def __init__(self, device, font, verbose: bool = True):
+        self.device = device
+        self.font = font
+        self.screenwidth = device.width
+        self.screenheight = device.height
+        self.map = framebuf.MONO_HMSB if not font.hmap() else framebuf.MONO_HLSB
+        if verbose:
+            print('Writer: font height', font.height(), 'max width', font.max_width())
+
+    def _newline(self):
+        Writer.text_row += self.font.height()
+        Writer.text_col = 0
+
+    @timed('Writer.printstring')
+    def printstring(self, string: str):
+        for char in string:
+            self._printchar(char)
+
+    def _printchar(self, char: str):
+        if char == '\n':
+            self._newline()
+            return
+        glyph, char_height, char_width = self.font.get_ch(char)
+        if Writer.text_row + char_height > self.screenheight:
+            if Writer.row_clip:
+                return
+            Writer.text_row = 0 # (the real writer scrolls, wrapping is close enough here)
+        if Writer.text_col + char_width > self.screenwidth:
+            if Writer.col_clip:
+                return
+            self._newline()
+        buf = bytearray(glyph)
+        fbc = framebuf.FrameBuffer(buf, char_width, char_height, self.map)
+        self.device.blit(fbc, Writer.text_col, Writer.text_row)
+        Writer.text_col += char_width
@@ -0,0 +1,349 @@
+"""
+Stand-in `machine` module (RP2040 flavour)
+
+Pin, PWM, I2C, RTC and Timer backed by the virtual clock in `hw`, with every hardware
+call counted and timed.
+"""
+
+import calendar, time as _time
+import hw
+from hw import clock, stats, timed
+
+
+def freq(hz: int = None) -> int:
+    return 125000000
+
+
+def unique_id() -> bytes:
+    return b'\xe6\x61\x38\x53\x2b\x4c\x5d\x2a'
+
+
+def reset():
+    raise SystemExit('machine.reset()')
+
+
+def idle():
+    """ Wait for an interrupt (the next scheduled event, or 1 ms) """
+    stats.count('machine.idle')
+    nxt = clock.next_event()
+    now = clock.now()
+    clock.sleep(0.001 if nxt is None else min(0.001, max(0, nxt - now)))
+
+
+def lightsleep(ms: int = None):
+    stats.count('machine.lightsleep')
+    nxt = clock.next_event()
+    if ms is None:
+        ms = 1000 if nxt is None else max(0, (nxt - clock.now()) * 1000)
+    clock.sleep(ms / 1000)
+
+
+def disable_irq() -> int:
+    return 0
+
+
+def enable_irq(state: int = 0):
+    pass
+
+
+class _Mem:
+    """
+    Memory access (`machine.mem8/16/32`), only the SIO GPIO registers do anything
+
+    Writes to GPIO_OUT (and its SET/CLR/XOR aliases) change the level of the pins set up
+    as outputs, each write counted once as `sio.writes`. GPIO_IN reads all pin levels.
+    Other addresses just remember what was written.
+    """
+
+    SIO_BASE = 0xd0000000
+    GPIO_IN = SIO_BASE + 0x004
+    GPIO_OUT = SIO_BASE + 0x010
+    GPIO_OUT_SET = SIO_BASE + 0x014
+    GPIO_OUT_CLR = SIO_BASE + 0x018
+    GPIO_OUT_XOR = SIO_BASE + 0x01c
+
+    def __init__(self, bits: int):
+        self._mask = (1 << bits) - 1
+        self._memory = {}
+
+    def __getitem__(self, addr: int) -> int:
+        if addr in (_Mem.GPIO_IN, _Mem.GPIO_OUT):
+            stats.count('sio.reads')
+            clock.poll()
+            value = 0
+            for id, st in Pin._pins.items():
+                if isinstance(id, int) and id < 30 and st['level'] and (addr == _Mem.GPIO_IN or st['mode'] == Pin.OUT):
+                    value |= 1 << id
+            return value & self._mask
+        return self._memory.get(addr, 0) & self._mask
+
+    def __setitem__(self, addr: int, value: int):
+        value &= self._mask
+        if not _Mem.GPIO_OUT <= addr <= _Mem.GPIO_OUT_XOR:
+            self._memory[addr] = value
+            return
+        stats.count('sio.writes')
+        for id, st in Pin._pins.items():
+            if not isinstance(id, int) or id >= 30 or st['mode'] != Pin.OUT:
+                continue
+            bit = (value >> id) & 1
+            if addr == _Mem.GPIO_OUT:
+                st['level'] = bit
+            elif addr == _Mem.GPIO_OUT_SET and bit:
+                st['level'] = 1
+            elif addr == _Mem.GPIO_OUT_CLR and bit:
+                st['level'] = 0
+            elif addr == _Mem.GPIO_OUT_XOR and bit:
+                st['level'] ^= 1
+
+
+mem8 = _Mem(8)
+mem16 = _Mem(16)
+mem32 = _Mem(32)
+
+
+class Pin:
+    """ GPIO pin, all Pin objects with the same id share the same state """
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    ALT = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    _pins = {} # id -> state dictionary
+
+    def __init__(self, id, mode: int = -1, pull: int = -1, value: int = None):
+        self.id = id
+        self._state = Pin._pins.get(id)
+        if self._state is None:
+            self._state = {'mode': Pin.IN, 'pull': None, 'level': 0, 'driven': None, 'handler': None, 'trigger': 0, 'hard': False, 'obj': self}
+            Pin._pins[id] = self._state
+        self.init(mode, pull, value)
+
+    @timed('Pin.init')
+    def init(self, mode: int = -1, pull: int = -1, value: int = None):
+        st = self._state
+        if mode != -1:
+            st['mode'] = mode
+        if pull != -1:
+            st['pull'] = pull
+        if value is not None:
+            st['level'] = 1 if value else 0
+        if st['mode'] == Pin.IN and st['driven'] is None:
+            st['level'] = 1 if st['pull'] == Pin.PULL_UP else 0
+
+    @timed('Pin.value')
+    def value(self, v: int = None):
+        st = self._state
+        if v is None:
+            stats.count('gpio.reads')
+            clock.poll()
+            return st['level']
+        stats.count('gpio.writes')
+        st['level'] = 1 if v else 0
+
+    def __call__(self, v: int = None):
+        return self.value(v)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def high(self):
+        self.value(1)
+
+    def low(self):
+        self.value(0)
+
+    def toggle(self):
+        self.value(1 - self._state['level'])
+
+    def irq(self, handler=None, trigger: int = IRQ_FALLING | IRQ_RISING, hard: bool = False):
+        stats.count('gpio.irq_setup')
+        st = self._state
+        st['handler'] = handler
+        st['trigger'] = trigger
+        st['hard'] = hard
+        st['obj'] = self
+
+    def __repr__(self):
+        st = self._state
+        mode = {Pin.IN: 'IN', Pin.OUT: 'OUT', Pin.OPEN_DRAIN: 'OPEN_DRAIN', Pin.ALT: 'ALT'}.get(st['mode'], 'IN')
+        pull = {Pin.PULL_UP: ', pull=PULL_UP', Pin.PULL_DOWN: ', pull=PULL_DOWN'}.get(st['pull'], '')
+        return 'Pin(GPIO{}, mode={}{})'.format(self.id, mode, pull)
+
+    # Simulation only ##########################################################
+
+    @classmethod
+    def drive(cls, id, value: int):
+        """ Drive pin from outside (e.g. a button), firing its IRQ handler on a matching edge """
+        st = cls._pins.get(id)
+        if st is None:
+            st = Pin(id)._state
+        old = st['level']
+        st['driven'] = value
+        st['level'] = 1 if value else 0
+        if old == st['level'] or st['handler'] is None:
+            return
+        edge = Pin.IRQ_RISING if st['level'] else Pin.IRQ_FALLING
+        if st['trigger'] & edge:
+            stats.count('gpio.irqs')
+            start = hw._perf_counter()
+            st['handler'](st['obj'])
+            stats.record('Pin.irq_handler', hw._perf_counter() - start)
+
+    @classmethod
+    def level(cls, id) -> int:
+        st = cls._pins.get(id)
+        return st['level'] if st else 0
+
+    @classmethod
+    def reset_all(cls):
+        cls._pins.clear()
+
+
+class PWM:
+    """ PWM output (e.g. a buzzer), changes are kept in `hw.pwm_log` """
+
+    def __init__(self, pin: Pin, freq: int = 1000, duty_u16: int = 0):
+        self.pin = pin
+        self._freq = freq
+        self._duty = duty_u16
+
+    @timed('PWM.freq')
+    def freq(self, value: int = None):
+        if value is None:
+            return self._freq
+        stats.count('pwm.changes')
+        self._freq = int(value)
+        self._log()
+
+    @timed('PWM.duty_u16')
+    def duty_u16(self, value: int = None):
+        if value is None:
+            return self._duty
+        stats.count('pwm.changes')
+        self._duty = int(value)
+        self._log()
+
+    def deinit(self):
+        self._duty = 0
+        self._log()
+
+    def _log(self):
+        hw.pwm_log.append((round(clock.now() * 1000, 1), self.pin.id, self._freq if self._duty else 0, self._duty))
+
+
+class I2C:
+    """ I2C bus, writes go to the simulated devices in `hw.I2C_DEVICES` """
+
+    def __init__(self, id: int, scl: Pin = None, sda: Pin = None, freq: int = 400000):
+        self.id = id
+        self.freq = freq
+
+    def _transfer(self, addr: int, nbytes: int):
+        stats.count('i2c.transactions')
+        stats.count('i2c.bytes', nbytes)
+        clock.busy((nbytes + 1) * 9 / self.freq) # address + data bytes, 9 clocks each
+
+    def scan(self) -> list:
+        return sorted(hw.I2C_DEVICES)
+
+    @timed('I2C.writeto')
+    def writeto(self, addr: int, buf, stop: bool = True) -> int:
+        data = bytes(buf)
+        self._transfer(addr, len(data))
+        device = hw.I2C_DEVICES.get(addr)
+        if device is None:
+            raise OSError(5) # EIO, no device acknowledged
+        device.write(data)
+        return len(data)
+
+    @timed('I2C.writevto')
+    def writevto(self, addr: int, vector, stop: bool = True) -> int:
+        data = b''.join(bytes(b) for b in vector)
+        self._transfer(addr, len(data))
+        device = hw.I2C_DEVICES.get(addr)
+        if device is None:
+            raise OSError(5)
+        device.write(data)
+        return len(data)
+
+    @timed('I2C.readfrom')
+    def readfrom(self, addr: int, nbytes: int, stop: bool = True) -> bytes:
+        self._transfer(addr, nbytes)
+        device = hw.I2C_DEVICES.get(addr)
+        if device is None:
+            raise OSError(5)
+        return device.read(nbytes)
+
+
+class RTC:
+    """ Real time clock, starts at the host's local time and runs on the virtual clock """
+
+    _offset = None # seconds between RTC time (as epoch) and virtual clock
+
+    def __init__(self):
+        if RTC._offset is None:
+            RTC._offset = calendar.timegm(_time.localtime()) - clock.now()
+
+    @timed('RTC.datetime')
+    def datetime(self, dt: tuple = None):
+        if dt is None:
+            stats.count('rtc.reads')
+            now = RTC._offset + clock.now()
+            t = _time.gmtime(int(now))
+            subsec = int((now % 1) * 1000000)
+            return (t.tm_year, t.tm_mon, t.tm_mday, t.tm_wday, t.tm_hour, t.tm_min, t.tm_sec, subsec)
+        stats.count('rtc.writes')
+        year, month, mday, _, hours, minutes, seconds = dt[:7]
+        epoch = calendar.timegm((year, month, mday, hours, minutes, seconds, 0, 0, 0))
+        RTC._offset = epoch - clock.now()
+
+
+class Timer:
+    """ Hardware timer, callbacks run from the virtual clock """
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id: int = -1, mode: int = PERIODIC, period: int = -1, freq: float = -1, callback=None, hard: bool = True):
+        self._callback = None
+        self._fire = None
+        if callback is not None:
+            self.init(mode=mode, period=period, freq=freq, callback=callback, hard=hard)
+
+    def init(self, mode: int = PERIODIC, period: int = -1, freq: float = -1, callback=None, hard: bool = True):
+        self.deinit()
+        if freq > 0:
+            period = 1000 / freq
+        self._mode = mode
+        self._period = period / 1000
+        self._callback = callback
+        self._next = clock.now() + self._period
+        stats.count('timer.init')
+
+        def fire():
+            if self._fire is not fire:
+                return # timer was re-initialised or stopped
+            if self._mode == Timer.PERIODIC:
+                self._next += self._period
+                clock.schedule(self._next, fire)
+            else:
+                self._fire = None
+            stats.count('timer.callbacks')
+            start = hw._perf_counter()
+            self._callback(self)
+            stats.record('Timer.callback', hw._perf_counter() - start)
+
+        self._fire = fire
+        clock.schedule(self._next, fire)
+
+    def deinit(self):
+        if self._fire is not None:
+            clock.cancel(self._fire)
+            self._fire = None
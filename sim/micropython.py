@@ -0,0 +1,32 @@
+"""
+Stand-in `micropython` module
+
+Code emitter decorators do nothing, `schedule` runs the callback straight away.
+"""
+
+from hw import stats
+
+
+def const(value):
+    return value
+
+
+def native(f):
+    return f
+
+
+def viper(f):
+    return f
+
+
+def schedule(func, arg):
+    stats.count('micropython.schedule')
+    func(arg)
+
+
+def alloc_emergency_exception_buf(size: int):
+    pass
+
+
+def mem_info(verbose: int = 0):
+    pass
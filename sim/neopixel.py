@@ -0,0 +1,46 @@
+"""
+Stand-in `neopixel` module
+
+Same buffer layout as the MicroPython driver (GRB byte order), with `write()` counted
+and taking the time the real data transfer would (30 us per LED at 800 kHz).
+"""
+
+from hw import clock, stats, timed
+
+
+class NeoPixel:
+    ORDER = (1, 0, 2, 3) # GRB(W)
+
+    def __init__(self, pin, n: int, bpp: int = 3, timing: int = 1):
+        self.pin = pin
+        self.n = n
+        self.bpp = bpp
+        self.buf = bytearray(n * bpp)
+        self.shown = bytes(n * bpp) # what the LEDs are actually showing (after write)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __setitem__(self, i: int, v: tuple):
+        offset = i * self.bpp
+        for j in range(self.bpp):
+            self.buf[offset + self.ORDER[j]] = v[j]
+
+    def __getitem__(self, i: int) -> tuple:
+        offset = i * self.bpp
+        return tuple(self.buf[offset + self.ORDER[j]] for j in range(self.bpp))
+
+    def fill(self, v: tuple):
+        for i in range(self.n):
+            self[i] = v
+
+    @timed('NeoPixel.write')
+    def write(self):
+        stats.count('neopixel.writes')
+        stats.count('neopixel.bytes', len(self.buf))
+        clock.busy(len(self.buf) * 8 * 1.25e-6 + 50e-6) # 1.25 us per bit + 50 us latch
+        self.shown = bytes(self.buf)
+
+    def lit(self) -> str:
+        """ LEDs as a string of 1/0 (lit/unlit), simulation only """
+        return ''.join('1' if any(self.shown[i * self.bpp:(i + 1) * self.bpp]) else '0' for i in range(self.n))
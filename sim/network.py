@@ -0,0 +1,49 @@
+"""
+Stand-in `network` module
+
+WLAN interface that "connects" a short (virtual) time after `connect()` is called.
+Set `WLAN.connect_delay` to None to simulate a network that never comes up.
+"""
+
+from hw import clock, stats
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_GOT_IP = 3
+
+
+class WLAN:
+    connect_delay = 0.5 # seconds until connected, None = never
+
+    def __init__(self, interface: int = STA_IF):
+        self.interface = interface
+        self._active = False
+        self._connected_at = None
+
+    def active(self, is_active: bool = None):
+        if is_active is None:
+            return self._active
+        self._active = bool(is_active)
+
+    def connect(self, ssid: str = None, key: str = None):
+        stats.count('wlan.connects')
+        if WLAN.connect_delay is not None:
+            self._connected_at = clock.now() + WLAN.connect_delay
+
+    def disconnect(self):
+        stats.count('wlan.disconnects')
+        self._connected_at = None
+
+    def isconnected(self) -> bool:
+        return self._connected_at is not None and clock.now() >= self._connected_at
+
+    def status(self, param: str = None) -> int:
+        if self.isconnected():
+            return STAT_GOT_IP
+        return STAT_CONNECTING if self._connected_at is not None else STAT_IDLE
+
+    def ifconfig(self, config: tuple = None) -> tuple:
+        return ('192.168.0.42', '255.255.255.0', '192.168.0.1', '192.168.0.1')
@@ -0,0 +1,91 @@
+"""
+Local UDP stand-in for an NTP server
+
+Answers 48 byte SNTP queries on localhost with the host's current time (UTC), moving with
+the simulated clock, so delays show up in the timestamps just as the program sees them
+(with or without `--realtime`). `install()` points `socket.getaddrinfo()` for the NTP port
+at it, so a program asking `pool.ntp.org` gets this server instead.
+
+- `latency`: seconds the query and the reply each take to "arrive" (the round trip is twice this)
+- `hold`: seconds between receiving a query and replying (the client should allow for it)
+- `offset`: seconds added to the time served (e.g. to check the RTC gets corrected)
+- `drop_next`: number of queries to ignore (the client times out)
+"""
+
+import socket, struct, threading, time
+from hw import clock
+
+NTP_PORT = 123
+NTP_DELTA = 2208988800 # 1900 -> 1970
+
+latency = 0.0
+hold = 0.0
+offset = 0.0
+drop_next = 0
+queries = 0 # queries received
+
+_sock = None
+_getaddrinfo = socket.getaddrinfo
+_epoch = time.time() - clock.now() # host time when the simulation started
+
+
+def wall_time() -> float:
+    """ Host time (Unix seconds), moving with the simulated clock """
+    return _epoch + clock.now()
+
+
+def ntp_time(t: float) -> tuple:
+    """ Unix time to NTP (seconds, 32 bit fraction) """
+    t += NTP_DELTA
+    secs = int(t)
+    return secs, int((t - secs) * 0x100000000) & 0xffffffff
+
+
+def reply(query: bytes, received: float, sent: float) -> bytes:
+    """ Server reply to a client query """
+    rx = ntp_time(received)
+    tx = ntp_time(sent)
+    version = (query[0] >> 3) & 0x07 if query else 4
+    return struct.pack('!BBbb2I4s8s8s8s',
+                       (version << 3) | 4, # LI = 0, mode = 4 (server)
+                       1, 6, -20, # stratum 1, poll, precision
+                       0, 0, # root delay/dispersion
+                       b'LOCL',
+                       struct.pack('!2I', *tx), # reference timestamp
+                       query[40:48].ljust(8, b'\0'), # originate = client's transmit
+                       struct.pack('!2I', *rx)) + struct.pack('!2I', *tx)
+
+
+def _serve():
+    global drop_next, queries
+    while True:
+        query, client = _sock.recvfrom(512)
+        queries += 1
+        if drop_next > 0:
+            drop_next -= 1
+            continue
+        clock.advance(latency) # (virtual time passes without firing pin/timer events on this thread)
+        received = wall_time() + offset
+        clock.advance(hold)
+        sent = wall_time() + offset
+        clock.advance(latency)
+        _sock.sendto(reply(query, received, sent), client)
+
+
+def address() -> tuple:
+    """ Start the server (once) and get its (host, port) """
+    global _sock
+    if _sock is None:
+        _sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        _sock.bind(('127.0.0.1', 0))
+        threading.Thread(target=_serve, daemon=True).start()
+    return _sock.getsockname()
+
+
+def install():
+    """ Send NTP queries (to any host) to the local server """
+    def getaddrinfo(host, port, *args, **kwargs):
+        if port == NTP_PORT:
+            host, port = address()
+        return _getaddrinfo(host, port, *args, **kwargs)
+    socket.getaddrinfo = getaddrinfo
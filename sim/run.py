@@ -0,0 +1,157 @@
+"""
+Run a Pico project on a PC against simulated hardware
+
+Usage:
+
+    python sim/run.py quizbuzzer/quizbuzzer.py --seconds 5 --press 18@1000 --press 20@3000:500
+    python sim/run.py simon/simon.py --press 6@2000 --screen --json stats.json
+
+Options:
+
+    --seconds N           stop after N seconds of (virtual) time, default 10
+    --press PIN@MS[:HOLD] press button on PIN at MS milliseconds for HOLD ms (default 100)
+    --input PIN@MS=LEVEL  drive input PIN to LEVEL (0/1) at MS milliseconds
+    --active-low          buttons pull the pin low when pressed (default high)
+    --realtime            really sleep instead of skipping sleeps (for threads/asyncio)
+    --screen              print the display contents at the end
+    --quiet               hide the program's own output
+    --json FILE           save counters, timings, buzzer log and screen as JSON
+    --fs DIR              folder used as the Pico's file system (default a new temporary folder)
+
+The program is stopped with a KeyboardInterrupt (like pressing Ctrl+C in Thonny), so its
+own clean up code runs. Counters and per-call timings are then printed.
+"""
+
+import io, json, os, runpy, sys, tempfile
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SIM_DIR)
+
+if SIM_DIR not in sys.path:
+    sys.path.insert(0, SIM_DIR)
+
+import hw, ntpstub
+
+
+def parse_args(argv: list) -> dict:
+    args = {'script': None, 'seconds': 10.0, 'presses': [], 'inputs': [], 'active': 1,
+            'realtime': False, 'screen': False, 'quiet': False, 'json': None, 'fs': None}
+    argv = list(argv)
+    while argv:
+        arg = argv.pop(0)
+        if arg in ('-h', '--help'):
+            print(__doc__)
+            sys.exit(0)
+        elif arg == '--seconds':
+            args['seconds'] = float(argv.pop(0))
+        elif arg == '--press':
+            pin, _, when = argv.pop(0).partition('@')
+            at, _, hold = when.partition(':')
+            args['presses'].append((int(pin), float(at), float(hold or 100)))
+        elif arg == '--input':
+            pin, _, when = argv.pop(0).partition('@')
+            at, _, level = when.partition('=')
+            args['inputs'].append((int(pin), float(at), int(level)))
+        elif arg == '--active-low':
+            args['active'] = 0
+        elif arg == '--realtime':
+            args['realtime'] = True
+        elif arg == '--screen':
+            args['screen'] = True
+        elif arg == '--quiet':
+            args['quiet'] = True
+        elif arg == '--json':
+            args['json'] = argv.pop(0)
+        elif arg == '--fs':
+            args['fs'] = argv.pop(0)
+        elif args['script'] is None:
+            args['script'] = arg
+        else:
+            raise SystemExit('unexpected argument: ' + arg)
+    if args['script'] is None:
+        raise SystemExit(__doc__)
+    return args
+
+
+def run(script: str, seconds: float = 10.0, presses: list = (), inputs: list = (), active: int = 1,
+        realtime: bool = False, quiet: bool = False, fs: str = None) -> dict:
+    """
+    Run a project script until `seconds` of virtual time have passed
+
+    Returns
+    -------
+    dict
+        Counters, timings, buzzer (PWM) log and final screen contents
+    """
+    hw.install_time()
+    ntpstub.install()
+    hw.clock.realtime = realtime
+    hw.clock.deadline = seconds
+
+    # Modules from extras are copied into the Pico's libs folder, make them importable the same way
+    import libs
+    extras = os.path.join(ROOT_DIR, 'extras')
+    if extras not in libs.__path__:
+        libs.__path__.append(extras)
+
+    script = os.path.abspath(script)
+    script_dir = os.path.dirname(script)
+    if script_dir not in sys.path:
+        sys.path.insert(1, script_dir)
+
+    # Files the program saves go in their own folder, like the Pico's flash
+    if fs is None:
+        fs = tempfile.mkdtemp(prefix='pico-fs-')
+    os.makedirs(fs, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(fs)
+
+    for pin, at, hold in presses:
+        hw.press(pin, at, hold, active)
+    for pin, at, level in inputs:
+        hw.set_input(pin, level, at)
+
+    stdout = sys.stdout
+    if quiet:
+        sys.stdout = io.StringIO()
+    exit_reason = 'deadline'
+    try:
+        runpy.run_path(script, run_name='__main__')
+        exit_reason = 'returned'
+    except SystemExit:
+        pass
+    except KeyboardInterrupt:
+        exit_reason = 'interrupted'
+    finally:
+        sys.stdout = stdout
+        os.chdir(cwd)
+
+    result = hw.stats.as_dict()
+    result['virtual_seconds'] = round(hw.clock.now(), 3)
+    result['exit'] = exit_reason
+    result['fs'] = fs
+    result['pwm_log'] = list(hw.pwm_log)
+    result['screens'] = {hex(addr): dev.ascii() for addr, dev in hw.I2C_DEVICES.items() if hasattr(dev, 'ascii')}
+    return result
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    result = run(args['script'], args['seconds'], args['presses'], args['inputs'], args['active'],
+                 args['realtime'], args['quiet'], args['fs'])
+
+    out = sys.stderr
+    print('\n=== {} ({} s virtual) ==='.format(os.path.basename(args['script']), result['virtual_seconds']), file=out)
+    print(hw.stats.report(), file=out)
+    if args['screen']:
+        for addr, screen in result['screens'].items():
+            print('\n--- display {} ---'.format(addr), file=out)
+            print(screen, file=out)
+
+    if args['json']:
+        with open(args['json'], 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Tests for `extras/bitmapcache.py`
+
+    python -m pytest sim
+"""
+
+import os, sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from bitmapcache import Canvas, LRUCache, canvas_size
+
+
+class Loader:
+    """ Makes a bytearray of `key` bytes, counting how often each key is loaded """
+
+    def __init__(self):
+        self.loads = []
+
+    def __call__(self, key: int):
+        self.loads.append(key)
+        return bytearray(key)
+
+
+def test_least_recently_used_evicted_first():
+    load = Loader()
+    cache = LRUCache(load, max_items = 3, size = len)
+    for key in (1, 2, 3):
+        cache.get(key)
+    cache.get(1) # 2 is now the least recently used
+    cache.get(4)
+    assert 2 not in cache and all(key in cache for key in (1, 3, 4))
+    cache.get(2)
+    assert load.loads == [1, 2, 3, 4, 2]
+    assert (cache.hits, cache.misses) == (1, 5)
+
+
+def test_max_bytes():
+    cache = LRUCache(Loader(), max_items = 10, max_bytes = 100, size = len)
+    for key in (40, 30, 20):
+        cache.get(key)
+    assert cache.bytes == 90
+    cache.get(30)
+    cache.get(25) # over by 15, drops 40 (least recently used) only
+    assert cache.bytes == 75
+    assert 40 not in cache and all(key in cache for key in (30, 20, 25))
+    cache.get(200) # bigger than the limit on its own, returned but not kept
+    assert 200 not in cache and cache.bytes <= 100
+
+
+def test_pinned_values_never_evicted():
+    load = Loader()
+    cache = LRUCache(load, max_items = 2, max_bytes = 50, size = len)
+    cache.get(30)
+    cache.pin(30) # moves the cached value across, without loading it again
+    cache.preload([60, 70])
+    assert cache.bytes == 0 # pinned values don't count towards the limits
+    for key in (10, 20, 5, 15):
+        cache.get(key)
+    cache.clear()
+    assert all(key in cache for key in (30, 60, 70)) and len(cache) == 3
+    cache.get(60)
+    assert load.loads == [30, 60, 70, 10, 20, 5, 15]
+
+
+def test_only_pinned_kept_when_max_items_is_zero():
+    """ As used for simon's pre-rendered screens """
+    load = Loader()
+    cache = LRUCache(load, 0, size = len)
+    cache.preload([8])
+    assert cache.get(8) is cache.get(8)
+    cache.get(9)
+    cache.get(9)
+    assert load.loads == [8, 9, 9] and len(cache) == 1
+
+
+def test_canvas_size():
+    canvas = Canvas(20, 10) # two 8 pixel pages
+    assert canvas_size(canvas) == 40
+    canvas.pixel(19, 9, 1)
+    assert canvas.buffer[39] == 0x02
@@ -0,0 +1,59 @@
+"""
+Tests for `extras/buttons.py` on the simulated hardware
+
+    python -m pytest sim
+"""
+
+import os, sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import hw
+hw.install_time()
+
+from machine import Pin
+from buttons import Buttons
+from events import EventQueue, EV_PRESS, EV_RELEASE
+
+TICKS_US_WRAP_S = (1 << 30) / 1000000 # ticks_us() wraps around after ~1074 seconds
+
+
+def press(pin: int, hold_s: float = 0.1):
+    Pin.drive(pin, 1)
+    hw.clock.advance(hold_s)
+    Pin.drive(pin, 0)
+
+
+def test_press_after_long_idle():
+    """ Presses are still accepted once the time since the last change passes 2^29 us (and 2^30 us) """
+    events = EventQueue()
+    Buttons([2], events = events)
+    for idle_s in (1, 200, TICKS_US_WRAP_S / 2 + 10, TICKS_US_WRAP_S / 2 + 500, TICKS_US_WRAP_S + 10):
+        hw.clock.advance(idle_s)
+        press(2)
+        assert events.get()[:2] == (EV_PRESS, 0)
+        assert events.get()[:2] == (EV_RELEASE, 0)
+        assert events.get() is None
+
+
+def test_bounce_ignored_then_settled_by_poll():
+    """ Edges within the debounce time are ignored, poll() picks up the level they settled at """
+    events = EventQueue()
+    buttons = Buttons([4], debounce_ms = 20, events = events)
+    hw.clock.advance(TICKS_US_WRAP_S / 2 + 100) # well past a wrap of the signed difference
+    Pin.drive(4, 1)
+    hw.clock.advance(0.002)
+    Pin.drive(4, 0) # bounce
+    hw.clock.advance(0.002)
+    Pin.drive(4, 1)
+    assert events.get()[:2] == (EV_PRESS, 0)
+    assert events.get() is None
+    Pin.drive(4, 0) # released while still settling, no further edge
+    assert buttons.pressed(0)
+    hw.clock.advance(0.05)
+    buttons.poll()
+    assert not buttons.pressed(0)
+    assert events.get()[:2] == (EV_RELEASE, 0)
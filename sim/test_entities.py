@@ -0,0 +1,68 @@
+"""
+Tests for `extras/entities.py`
+
+    python -m pytest sim
+"""
+
+import os, sys
+from array import array
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from entities import EntityStore
+from movement import move
+
+
+def test_add_reuses_removed_indexes_until_full():
+    store = EntityStore(3)
+    assert [store.add(0, 0, 1, 1) for _ in range(4)] == [0, 1, 2, -1]
+    store.remove(1)
+    store.remove(1) # already removed, does nothing
+    assert store.count == 2
+    assert store.add(5, 5, 1, 1) == 1
+    store.remove(2)
+    assert store._top == 2 # loops stop at the highest entity in use
+    store.clear()
+    assert (store.count, store._top) == (0, 0)
+
+
+def test_move_all_matches_move():
+    store = EntityStore(4)
+    for direction in (0, 45, 200, 300):
+        store.add(50, 30, 2, 2, direction, 3)
+    store.remove(2)
+    store.move_all()
+    store.move_all()
+    for i, direction in enumerate((0, 45, 200, 300)):
+        x, y = move(*move(50, 30, direction, 3), direction, 3)
+        if i == 2:
+            assert (store.x[i], store.y[i]) == (50, 30) # removed, not moved
+        else:
+            assert (store.x[i], store.y[i]) == (x, y)
+
+
+def test_collide_and_collide_mask_agree():
+    store = EntityStore(8)
+    for x in range(0, 80, 10):
+        store.add(x, 0, 4, 4)
+    store.remove(3)
+    out = array('h', bytes(2 * store.capacity))
+    n = store.collide(12, 2, 20, 1, out) # touches entities at x = 10, 20, 30 (30 removed)
+    assert list(out[:n]) == [1, 2]
+    assert store.collide_mask(12, 2, 20, 1) == 0b110
+    assert store.collide_obj({'x': 13, 'y': 3, 'w': 1, 'h': 1}, out) == 1 and out[0] == 1
+    assert store.collide(14, 0, 6, 4, out) == 0 # the gap between two entities
+
+
+def test_remove_outside():
+    store = EntityStore(4)
+    store.add(-4, 0, 4, 4) # just off the left edge
+    store.add(-3, 0, 4, 4) # one pixel still on screen
+    store.add(60, 20, 4, 4)
+    store.add(128, 0, 4, 4) # just off the right edge
+    assert store.remove_outside(0, 0, 128, 64) == 2
+    assert list(store.active) == [0, 1, 1, 0]
+    assert (store.count, store._top) == (2, 3)
@@ -0,0 +1,87 @@
+"""
+Tests for `extras/masks.py`
+
+    python -m pytest sim
+"""
+
+import os, sys, random
+import pytest
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from masks import Mask, mask_collision, MONO_HLSB, MONO_HMSB, MONO_VLSB
+
+# Ring shaped sprite, 10x6 (two bytes per row, so bits cross a byte boundary)
+RING = [
+    '..######..',
+    '.##....##.',
+    '##......##',
+    '##......##',
+    '.##....##.',
+    '..######..',
+]
+
+
+def encode(pixels: list, fmt: int) -> bytearray:
+    """ Bitmap of a picture (list of strings, '#' = set) in a framebuf format """
+    h = len(pixels)
+    w = len(pixels[0])
+    if fmt == MONO_VLSB:
+        buf = bytearray(((h + 7) >> 3) * w)
+        for y, line in enumerate(pixels):
+            for x, ch in enumerate(line):
+                if ch == '#':
+                    buf[(y >> 3) * w + x] |= 1 << (y & 7)
+        return buf
+    stride = (w + 7) >> 3
+    buf = bytearray(stride * h)
+    for y, line in enumerate(pixels):
+        for x, ch in enumerate(line):
+            if ch == '#':
+                buf[y * stride + (x >> 3)] |= 0x80 >> (x & 7) if fmt == MONO_HLSB else 1 << (x & 7)
+    return buf
+
+
+def pixels_overlap(a: dict, a_pixels: list, b: dict, b_pixels: list) -> bool:
+    """ Check every pair of set pixels """
+    a_set = {(a['x'] + x, a['y'] + y) for y, line in enumerate(a_pixels) for x, ch in enumerate(line) if ch == '#'}
+    return any((b['x'] + x, b['y'] + y) in a_set for y, line in enumerate(b_pixels) for x, ch in enumerate(line) if ch == '#')
+
+
+def test_formats_give_same_rows():
+    masks = [Mask(encode(RING, fmt), 10, 6, fmt) for fmt in (MONO_HLSB, MONO_HMSB, MONO_VLSB)]
+    assert masks[0].rows == masks[1].rows == masks[2].rows
+    assert masks[0].rows[0] == 0b0011111100
+    assert masks[0].rows[2] == 0b1100000011
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        Mask(bytes(12), 10, 6, 99)
+
+
+def test_inside_ring_hole_is_no_collision():
+    ring = {'x': 20, 'y': 20, 'w': 10, 'h': 6}
+    dot = {'x': 24, 'y': 22, 'w': 2, 'h': 2}
+    ring_mask = Mask(encode(RING, MONO_HLSB), 10, 6)
+    dot_mask = Mask.from_rect(2, 2)
+    assert not mask_collision(ring, ring_mask, dot, dot_mask) # boxes overlap, pixels don't
+    assert not mask_collision(dot, dot_mask, ring, ring_mask)
+    dot['x'] = 21
+    assert mask_collision(ring, ring_mask, dot, dot_mask)
+    assert mask_collision(dot, dot_mask, ring, ring_mask)
+
+
+def test_matches_checking_every_pixel():
+    rng = random.Random(3)
+    ring = {'x': 30, 'y': 30, 'w': 10, 'h': 6}
+    masks = [Mask(encode(RING, fmt), 10, 6, fmt) for fmt in (MONO_HLSB, MONO_HMSB, MONO_VLSB)]
+    for _ in range(300):
+        other = {'x': 30 + rng.randrange(-11, 12), 'y': 30 + rng.randrange(-7, 8), 'w': 10, 'h': 6}
+        expected = pixels_overlap(ring, RING, other, RING)
+        for mask in masks:
+            assert mask_collision(ring, mask, other, mask) == expected
+            assert mask_collision(other, mask, ring, mask) == expected
@@ -0,0 +1,71 @@
+"""
+Tests for `extras/scorelog.py`
+
+    python -m pytest sim
+"""
+
+import os, sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from scorelog import ScoreLog
+
+
+def test_scores_survive_reload(tmp_path):
+    path = str(tmp_path / 'scores.log')
+    log = ScoreLog(path)
+    assert log.record_game(1, 5)
+    assert not log.record_game(1, 3)
+    assert log.record_game(2, 7)
+    log = ScoreLog(path)
+    assert (log.games, log.bests) == (3, [0, 5, 7, 0])
+    assert log.records == 3 # carries on appending to the same log
+
+
+def test_torn_write_recovers_last_whole_record(tmp_path):
+    """ A record only half written when the power went uses the one before, and the log is compacted """
+    path = str(tmp_path / 'scores.log')
+    log = ScoreLog(path)
+    log.record_game(0, 4)
+    log.record_game(0, 6)
+    with open(path, 'ab') as f:
+        f.write(log._pack()[:5]) # power lost part way through the next append
+    log = ScoreLog(path)
+    assert (log.games, log.bests[0]) == (2, 6)
+    assert log.records == 0 # compacted on the next save
+    log.record_game(3, 1)
+    assert os.stat(path)[6] == log.record_size
+    assert ScoreLog(path).bests == [6, 0, 0, 1]
+
+
+def test_newest_sequence_number_wins(tmp_path):
+    """ A stale record after newer ones (or a corrupt one) is skipped, across the sequence number roll over """
+    path = str(tmp_path / 'scores.log')
+    log = ScoreLog(path)
+    log.seq = 0xfffe
+    records = []
+    for score in (1, 2, 3): # sequence numbers 0xffff, 0, 1
+        log.bests[0] = score
+        log.seq = (log.seq + 1) & 0xffff
+        records.append(log._pack())
+    stale = records[0]
+    corrupt = bytes([records[2][0] ^ 0xff]) + records[2][1:]
+    with open(path, 'wb') as f:
+        f.write(records[0] + records[1] + records[2] + stale + corrupt)
+    log = ScoreLog(path)
+    assert (log.seq, log.bests[0]) == (1, 3)
+    assert log.records == 0
+
+
+def test_compacts_when_full(tmp_path):
+    path = str(tmp_path / 'scores.log')
+    log = ScoreLog(path, levels = 2, max_records = 4)
+    for score in range(10):
+        log.record_game(score % 2, score)
+    assert log.records == 2 # compacted after the 4th record, then one more appended
+    assert os.stat(path)[6] == 2 * log.record_size
+    log = ScoreLog(path, levels = 2, max_records = 4)
+    assert (log.games, log.bests) == (10, [8, 9])
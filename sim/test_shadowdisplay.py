@@ -0,0 +1,58 @@
+"""
+Tests for `extras/shadowdisplay.py` on the simulated SSD1306 panel
+
+    python -m pytest sim
+"""
+
+import os, sys, random
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import hw
+hw.install_time()
+
+from machine import I2C, Pin
+from libs.ssd1306 import SSD1306_I2C
+from shadowdisplay import ShadowDisplay, CMD_BYTES
+
+
+def make_display() -> ShadowDisplay:
+    hw.reset()
+    return ShadowDisplay(SSD1306_I2C(128, 64, I2C(0, scl = Pin(17), sda = Pin(16))))
+
+
+def test_screen_matches_buffer_after_random_drawing():
+    """ Whatever is drawn, after show() the panel's memory holds exactly the frame buffer """
+    display = make_display()
+    rng = random.Random(4)
+    for frame in range(40):
+        for _ in range(rng.randrange(0, 6)):
+            x, y = rng.randrange(-10, 128), rng.randrange(-10, 64)
+            display.fill_rect(x, y, rng.randrange(1, 30), rng.randrange(1, 30), rng.randrange(2))
+        if frame % 10 == 9:
+            display.fill(rng.randrange(2)) # big change, sent as a whole frame
+        display.show()
+        assert display.panel.gram == display.buffer
+        assert display.shadow == display.buffer
+
+
+def test_only_changed_columns_are_sent():
+    display = make_display()
+    display.show() # first frame is always sent whole
+    sent = display.bytes_sent
+    data = hw.stats.as_dict()['counters'].get('ssd1306.data_bytes', 0)
+
+    display.show() # nothing changed
+    assert display.bytes_sent == sent
+
+    display.pixel(10, 3, 1) # page 0
+    display.pixel(20, 60, 1) # page 7
+    display.pixel(25, 60, 1)
+    display.show()
+    assert display.bytes_sent - sent == 2 * CMD_BYTES + 1 + 6 # columns 10 and 20-25
+    assert hw.stats.as_dict()['counters']['ssd1306.data_bytes'] - data == 7
+    assert display.panel.gram == display.buffer
+
@@ -0,0 +1,78 @@
+"""
+Tests for `extras/spatialhash.py`
+
+    python -m pytest sim
+"""
+
+import os, sys, random
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from collisions import box_collision
+from rect import Rect
+from spatialhash import SpatialHash
+
+
+def box(x: int, y: int, w: int, h: int) -> dict:
+    return {'x': x, 'y': y, 'w': w, 'h': h}
+
+
+def test_object_across_cells_found_once():
+    """ An object filed under several cells (and a query covering them all) gives one result """
+    index = SpatialHash(8)
+    wide = box(4, 4, 20, 20) # covers 3x3 cells
+    index.insert(wide)
+    assert index.query(box(0, 0, 32, 32)) == [wide]
+    assert index.query(box(6, 6, 1, 1)) == [wide]
+    assert index.query(box(24, 24, 4, 4)) == []
+
+
+def test_query_skips_the_box_itself_and_appends_to_out():
+    index = SpatialHash(8)
+    player = box(10, 10, 4, 4)
+    other = Rect(12, 12, 4, 4)
+    index.insert(player)
+    index.insert(other)
+    out = ['keep']
+    assert index.query(player, out) is out
+    assert out == ['keep', other]
+    assert index.any(player)
+    assert not index.any(box(40, 40, 2, 2))
+
+
+def test_update_and_remove():
+    index = SpatialHash(8)
+    obj = box(0, 0, 4, 4)
+    index.insert(obj)
+    obj['x'] = 50
+    index.update(obj)
+    assert index.query(box(0, 0, 8, 8)) == []
+    assert index.query(box(50, 0, 2, 2)) == [obj]
+    index.insert(obj) # already in the index, same as update
+    assert len(index) == 1
+    index.remove(obj)
+    index.remove(obj) # not present, does nothing
+    assert obj not in index
+    assert index._cells == {} # no empty cells left behind
+
+
+def test_matches_checking_every_object():
+    rng = random.Random(1)
+    objs = [box(rng.randrange(-16, 128), rng.randrange(-16, 64), rng.randrange(1, 24), rng.randrange(1, 24)) for _ in range(60)]
+    index = SpatialHash(16)
+    for obj in objs:
+        index.insert(obj)
+    for _ in range(20): # move some around
+        obj = rng.choice(objs)
+        obj['x'] += rng.randrange(-20, 21)
+        obj['y'] += rng.randrange(-20, 21)
+        index.update(obj)
+    for _ in range(100):
+        area = box(rng.randrange(-16, 128), rng.randrange(-16, 64), rng.randrange(1, 40), rng.randrange(1, 40))
+        expected = [obj for obj in objs if box_collision(area, obj)]
+        found = index.query(area)
+        assert sorted(map(id, found)) == sorted(map(id, expected))
+        assert index.any(area) == bool(expected)
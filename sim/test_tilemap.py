@@ -0,0 +1,79 @@
+"""
+Tests for `extras/tilemap.py`
+
+    python -m pytest sim
+"""
+
+import os, sys, random
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from tilemap import TileMap
+
+MAZE = [
+    '####################',
+    '#........#.........#',
+    '#..##....#....#....#',
+    '#........#....#....#',
+    '#.............#....#',
+    '####################',
+]
+
+
+def slow_blocked(tm: TileMap, x: int, y: int, w: int, h: int) -> bool:
+    """ Check every tile under the box, one at a time """
+    for py in range(y, y + h):
+        for px in range(x, x + w):
+            if px < 0 or py < 0 or tm.is_solid(px // tm.tile_w, py // tm.tile_h):
+                return True
+    return False
+
+
+def test_box_blocked_matches_checking_each_tile():
+    """ Including boxes spanning more than one byte of the bitmap, and off the map """
+    tm = TileMap.from_strings(MAZE, 4, 4) # 20 columns = 3 bytes per row
+    rng = random.Random(2)
+    for _ in range(2000):
+        x, y = rng.randrange(-6, 84), rng.randrange(-6, 28)
+        w, h = rng.randrange(1, 40), rng.randrange(1, 8)
+        assert tm.box_blocked(x, y, w, h) == slow_blocked(tm, x, y, w, h), (x, y, w, h)
+
+
+def test_set_solid_and_outside_map():
+    tm = TileMap(10, 3)
+    tm.set_solid(9, 2)
+    assert tm.is_solid(9, 2)
+    tm.set_solid(9, 2, False)
+    assert not tm.is_solid(9, 2)
+    assert tm.is_solid(-1, 0) and tm.is_solid(10, 0) and tm.is_solid(0, 3)
+    assert not tm.box_blocked(0, 0, 80, 24)
+    assert tm.box_blocked(0, 0, 81, 24)
+
+
+def test_move_stops_against_wall():
+    tm = TileMap.from_strings(MAZE) # 8x8 tiles, wall at column 9 (x = 72 to 79)
+    obj = {'x': 60, 'y': 10, 'w': 6, 'h': 6}
+    assert not tm.move(obj, 90, 4)
+    assert tm.move(obj, 90, 4) # would reach x = 68, overlapping the wall
+    assert (obj['x'], obj['y']) == (66, 10) # up against it
+    assert tm.move(obj, 90, 4)
+    assert obj['x'] == 66
+
+
+def test_move_slides_along_wall():
+    tm = TileMap.from_strings(MAZE)
+    obj = {'x': 8, 'y': 34, 'w': 6, 'h': 6} # resting on the floor (y = 40)
+    assert tm.move(obj, 135, 5) # down and right
+    assert obj['y'] == 34 # against the floor
+    assert obj['x'] > 8 # still moved across
+
+
+def test_move_without_clip_rejects_blocked_axis():
+    tm = TileMap.from_strings(MAZE)
+    obj = {'x': 60, 'y': 10, 'w': 6, 'h': 6}
+    tm.move(obj, 90, 4)
+    assert tm.move(obj, 90, 4, clip = False)
+    assert obj['x'] == 64
@@ -0,0 +1,35 @@
+"""
+Tests for `extras/timesource.py` against the local NTP stand-in server
+
+    python -m pytest sim
+"""
+
+import os, sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import hw
+hw.install_time()
+
+import ntpstub
+ntpstub.install()
+
+from timesource import SNTPSource, current_time
+
+
+def test_sntp_corrects_for_round_trip_not_server_hold():
+    """ Network latency is allowed for, time the server held the query isn't counted as latency """
+    source = SNTPSource('pool.ntp.org', timeout = 2)
+    ntpstub.latency = 0.1
+    ntpstub.hold = 0.5
+    try:
+        stamp = source.fetch()
+    finally:
+        ntpstub.latency = 0.0
+        ntpstub.hold = 0.0
+    secs, ms = current_time(stamp)
+    assert abs(source.rtt_us - 200000) < 5000
+    assert abs(secs + ms / 1000 - ntpstub.wall_time()) < 0.005
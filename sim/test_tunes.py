@@ -0,0 +1,81 @@
+"""
+Tests for `extras/tunes.py` on the simulated hardware
+
+    python -m pytest sim
+"""
+
+import os, sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import hw
+hw.install_time()
+
+from machine import Pin, PWM
+from tunes import TuneSequencer, compile_tune, TICK_MS
+
+BUZZER_PIN = 22
+
+
+def run_ms(ms: int):
+    """ Let time pass a tick at a time, firing the timer as it falls due """
+    for _ in range(ms // TICK_MS):
+        hw.clock.advance(TICK_MS / 1000)
+        hw.clock.poll()
+
+
+def heard() -> list:
+    """ (ms since the sequencer started, frequency or 0) for every change of the buzzer """
+    start = hw.pwm_log[0][0]
+    changes = []
+    for t, pin, hz, duty in hw.pwm_log:
+        if pin == BUZZER_PIN and (not changes or changes[-1][1] != hz): # (frequency and duty are set separately)
+            changes.append((round(t - start), hz))
+    return changes
+
+
+def sequencer(**kwargs) -> TuneSequencer:
+    hw.reset()
+    return TuneSequencer(PWM(Pin(BUZZER_PIN)), **kwargs)
+
+
+def test_compile_tune():
+    freqs, durations = compile_tune((131, [0, 50], (196.5, 30)), 100)
+    assert list(freqs) == [131, 0, 196]
+    assert list(durations) == [100, 50, 30]
+
+
+def test_notes_play_in_the_background():
+    seq = sequencer(tunes = {'beep': ([1000, 50], [0, 20], [2000, 30])})
+    assert seq.play('beep')
+    assert seq.playing
+    run_ms(200)
+    assert not seq.playing
+    changes = heard()
+    assert [hz for t, hz in changes if hz] == [1000, 2000]
+    assert changes[-1][1] == 0 # quiet once finished
+    starts = {hz: t for t, hz in changes if hz}
+    assert starts[2000] - starts[1000] == 70 # 50 ms note, 20 ms rest
+
+
+def test_queue_and_cancel():
+    seq = sequencer(queue_size = 2)
+    assert seq.tone(440, 30)
+    assert seq.tone(880, 30, queue = True)
+    assert seq.tone(990, 30, queue = True)
+    assert not seq.tone(1200, 30, queue = True) # queue full
+    run_ms(200)
+    assert [hz for t, hz in heard() if hz] == [440, 880, 990]
+
+    seq.tone(440, 1000)
+    run_ms(50)
+    seq.tone(660, 30) # not queued, stops the long note straight away
+    run_ms(100)
+    assert [hz for t, hz in heard() if hz][-2:] == [440, 660]
+    assert not seq.playing
+    seq.tone(440, 1000)
+    seq.cancel()
+    assert not seq.playing and seq.buzzer.duty_u16() == 0
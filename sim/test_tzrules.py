@@ -0,0 +1,70 @@
+"""
+Tests for `extras/tzrules.py`
+
+    python -m pytest sim
+"""
+
+import os, sys
+import calendar
+import pytest
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SIM_DIR, os.path.join(os.path.dirname(SIM_DIR), 'extras')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import hw
+hw.install_time() # time.mktime() of an 8-tuple is UTC, as on the board
+
+from tzrules import TimeZone, sunday, LAST
+
+
+def utc(*datetime) -> int:
+    return calendar.timegm(datetime + (0,) * (6 - len(datetime)))
+
+
+def test_sundays():
+    assert sunday(2024, 3, LAST) == utc(2024, 3, 31)
+    assert sunday(2024, 10, LAST) == utc(2024, 10, 27)
+    assert sunday(2024, 12, LAST) == utc(2024, 12, 29) # rolls into the next year to find the end of the month
+    assert sunday(2024, 3, 2) == utc(2024, 3, 10)
+    assert sunday(2024, 9, 1) == utc(2024, 9, 1) # the 1st is a Sunday
+
+
+def test_uk_transitions():
+    tz = TimeZone('Europe/London', 2024)
+    bst_starts = utc(2024, 3, 31, 1)
+    bst_ends = utc(2024, 10, 27, 1)
+    assert tz.offset(bst_starts - 1) == 0 and not tz.is_dst(bst_starts - 1)
+    assert tz.offset(bst_starts) == 3600 and tz.is_dst(bst_starts)
+    assert tz.localtime(bst_starts - 1)[3:6] == (0, 59, 59)
+    assert tz.localtime(bst_starts)[3:6] == (2, 0, 0) # clocks go forward an hour
+    assert tz.next_change(bst_starts) == bst_ends
+    assert tz.localtime(bst_ends - 1)[3:6] == (1, 59, 59)
+    assert tz.localtime(bst_ends)[3:6] == (1, 0, 0) # and back again
+    assert tz.offset(utc(2024, 12, 31, 23, 59, 59)) == 0
+    assert tz.offset(utc(2025, 1, 1)) == 0 # carried over from the year before
+
+
+def test_central_european_offsets():
+    tz = TimeZone('Europe/Paris', 2025)
+    assert tz.offset(utc(2025, 2, 1)) == 3600
+    assert tz.offset(utc(2025, 7, 1)) == 7200
+    assert tz.localtime(utc(2025, 3, 30, 1))[2:4] == (30, 3) # 01:00 UTC, 02:00 CET -> 03:00 CEST
+
+
+def test_table_moves_on_past_its_end():
+    tz = TimeZone('Europe/London', 2024, years = 1)
+    assert tz.next_change(utc(2024, 11, 1)) == utc(2025, 1, 1) # end of the table
+    assert tz.offset(utc(2026, 6, 1)) == 3600
+    assert tz.table_start == utc(2026, 1, 1)
+    assert tz.next_change(utc(2026, 6, 1)) == utc(2026, 10, 25, 1)
+    assert tz.offset(utc(2023, 6, 1)) == 3600 # and back
+    assert tz.next_change(utc(2023, 1, 1)) == utc(2023, 3, 26, 1)
+
+
+def test_utc_and_unknown_zone():
+    tz = TimeZone('UTC', 2024)
+    assert tz.offset(utc(2024, 7, 1)) == 0 and not tz.is_dst(utc(2024, 7, 1))
+    with pytest.raises(ValueError):
+        TimeZone('Mars/Olympus_Mons')
@@ -0,0 +1,80 @@
+"""
+Stand-in `uasyncio` module
+
+CPython's `asyncio`, plus the MicroPython extras (`ThreadSafeFlag`, `sleep_ms`,
+`wait_for_ms`). On the Pico, interrupts fire whenever a pin changes or a timer is due,
+even while every task is waiting. Here they only fire when the clock is looked at, so
+`run()` adds a task that sleeps until the next scheduled event (button press, timer...)
+and fires it. Needs `--realtime`.
+"""
+
+import asyncio
+from asyncio import *
+from hw import clock
+
+MAX_IDLE = 0.05 # seconds, look at the clock at least this often (events may be scheduled while asleep)
+
+
+class ThreadSafeFlag:
+    """ Flag that can be set from an interrupt handler or another thread, and waited on by one task """
+
+    def __init__(self):
+        self._flag = False
+        self._waiter = None # (loop, future) of the task waiting
+
+    def set(self):
+        self._flag = True
+        waiter = self._waiter
+        if waiter is not None:
+            waiter[0].call_soon_threadsafe(_wake, waiter[1])
+
+    def clear(self):
+        self._flag = False
+
+    async def wait(self):
+        """ Wait for the flag to be set, and clear it """
+        while not self._flag:
+            loop = asyncio.get_running_loop()
+            self._waiter = (loop, loop.create_future())
+            try:
+                if not self._flag: # set from another thread meanwhile
+                    await self._waiter[1]
+            finally:
+                self._waiter = None
+        self._flag = False
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def sleep_ms(ms: int):
+    return asyncio.sleep(ms / 1000)
+
+
+def wait_for_ms(aw, timeout_ms: int):
+    return asyncio.wait_for(aw, timeout_ms / 1000)
+
+
+async def _interrupts():
+    """ Fire scheduled pin/timer events as they fall due """
+    while True:
+        clock.poll()
+        delay = MAX_IDLE
+        nxt = clock.next_event()
+        if nxt is not None:
+            delay = min(delay, max(0, nxt - clock.now()))
+        if clock.deadline is not None:
+            delay = min(delay, max(0, clock.deadline - clock.now()))
+        await asyncio.sleep(delay)
+
+
+def run(main):
+    async def with_interrupts():
+        task = asyncio.create_task(_interrupts())
+        try:
+            return await main
+        finally:
+            task.cancel()
+    return asyncio.run(with_interrupts())
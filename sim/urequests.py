@@ -0,0 +1,66 @@
+"""
+Stand-in `urequests` module
+
+Requests are sent for real over HTTP, but (unless `redirect` is turned off) to the local
+stand-in server in `httpstub` instead of the host in the URL.
+"""
+
+import http.client, json as _json
+import httpstub
+from hw import clock, stats, timed
+
+redirect = True # send every request to the local stand-in server
+latency = 0.05 # extra (virtual) seconds per request, as if going over WiFi
+
+
+class Response:
+
+    def __init__(self, status_code: int, reason: str, content: bytes):
+        self.status_code = status_code
+        self.reason = reason
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+    def json(self):
+        return _json.loads(self.content)
+
+    def close(self):
+        pass
+
+
+@timed('urequests.request')
+def request(method: str, url: str, data=None, json=None, headers: dict = None, timeout: float = None) -> Response:
+    stats.count('http.requests')
+    proto, _, hostport, path = url.split('/', 3)
+    if redirect:
+        host, port = httpstub.address()
+    else:
+        host, _, port = hostport.partition(':')
+        port = int(port) if port else 80
+    if json is not None:
+        data = _json.dumps(json)
+        headers = dict(headers or {}, **{'Content-Type': 'application/json'})
+    conn = http.client.HTTPConnection(host, port, timeout=timeout or 10)
+    try:
+        conn.request(method, '/' + path, body=data, headers=headers or {})
+        resp = conn.getresponse()
+        content = resp.read()
+    except OSError:
+        stats.count('http.errors')
+        raise
+    finally:
+        conn.close()
+    clock.busy(latency)
+    stats.count('http.bytes', len(content))
+    return Response(resp.status, resp.reason, content)
+
+
+def get(url: str, **kw) -> Response:
+    return request('GET', url, **kw)
+
+
+def post(url: str, **kw) -> Response:
+    return request('POST', url, **kw)
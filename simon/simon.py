@@ -9,28 +9,39 @@ A game  of Simon
 
 from machine import Pin, PWM, I2C
 from libs.ssd1306 import SSD1306_I2C
+from libs.tunes import TuneSequencer # background buzzer tunes
+from libs.shadowdisplay import ShadowDisplay # only send display changes
+from libs.bitmapcache import Canvas, LRUCache # cached text layouts/screens
+from libs.events import EventQueue, EV_PRESS, EV_RELEASE # button events from interrupts
+from libs.buttons import Buttons # debounced buttons
+from libs.scorelog import ScoreLog # saved high scores
 import random, time, sys
 
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
 BTNLED_GPIO = [
     # Red / A3
-    {'btn_pin': 6, 'led_pin': 7, 'btn': None, 'led': None, 'tone': 220.00, 'btn_on': False},
+    {'btn_pin': 6, 'led_pin': 7, 'btn': None, 'led': None, 'tone': 220.00},
 
     # Green / E3
-    {'btn_pin': 8, 'led_pin': 9, 'btn': None, 'led': None, 'tone': 164.81, 'btn_on': False},
+    {'btn_pin': 8, 'led_pin': 9, 'btn': None, 'led': None, 'tone': 164.81},
 
     # Blue / E4
-    {'btn_pin': 10, 'led_pin': 11, 'btn': None, 'led': None, 'tone': 329.63, 'btn_on': False},
+    {'btn_pin': 10, 'led_pin': 11, 'btn': None, 'led': None, 'tone': 329.63},
 
     # Yellow / C#4
-    {'btn_pin': 12, 'led_pin': 13, 'btn': None, 'led': None, 'tone': 277.18, 'btn_on': False},
+    {'btn_pin': 12, 'led_pin': 13, 'btn': None, 'led': None, 'tone': 277.18},
 ]
 
-# Dictionary of button pins and their index
-BTN_PINS = {}
-for i, p in enumerate(BTNLED_GPIO):
-    _btn_pin = p['btn_pin']
-    BTN_PINS[_btn_pin] = i
 
+BTN_DEBOUNCE_MS = 20 # ignore button contact bounce for this long after a press/release
+ABORT_HOLD_MS = 2000 # hold a button down this long to abort a game
+
+LEVELS = [8, 14, 20, 31] # length of sequence for each level, one per button (0 = endless, play until a mistake)
+SCORES_FILE = 'scores.log' # best scores per level (see extras/scorelog.py)
 
 BUZZER_PIN = 22
 BUZZER_DUTY = 3000 # PWM duty cycle - higher number = louder (max 65535)
@@ -50,6 +61,25 @@ FONT['line_height'] = FONT['height'] + (FONT['padding'] * 2) # line height
 SCRN_COLS = int(SCREEN['width'] / FONT['width'])
 SCRN_ROWS = int(SCREEN['working_h'] / FONT['line_height'])
 
+SEQUENCE_SEED = None # set to an integer to get the same sequence every game (e.g. for testing)
+SEQUENCE_MAX_REPEATS = 2 # maximum times the same colour can come up in a row
+
+LAYOUT_CACHE = {'items': 16, 'bytes': 2048} # text layouts kept (least recently used are dropped)
+
+# Frequently shown messages, (msg, hcentre, vcentre) as passed to display_text(), kept
+# pre-rendered (1 KB each) so they can be shown without drawing any text
+PRERENDERED_SCREENS = [
+    ("PICO SIMON GAME\nCHOOSE LEVEL:-\n1: Red\n2: Green\n3: Blue\n4: Yellow", False, False),
+    ('Your turn', True, True),
+    ('Correct!', True, True),
+    ('Incorrect!', True, True),
+    ('... 1 ...', True, True),
+    ('... 2 ...', True, True),
+    ('... 3 ...', True, True),
+    ('... 4 ...', True, True),
+    ('... 5 ...', True, True),
+]
+
 # Functions
 
 def led_on(pressed: int = -1):
@@ -70,42 +100,36 @@ def led_off(pressed: int = -1):
             BTNLED_GPIO[led]['led'].value(0)
 
 
-def buzzer_on(hz: int):
-    """ Turn on buzzer at specified frequency (Hz) """
-    buzzer.freq(hz)
-    buzzer.duty_u16(BUZZER_DUTY)
+def buzzer_on(hz: int, duration: int):
+    """ Play buzzer at specified frequency (Hz) for duration (ms), in the background """
+    tunes.tone(hz, duration)
 
 
 def buzzer_off():
-    """ Turn off buzzer """
-    buzzer.duty_u16(0)
+    """ Turn off buzzer (and stop any tune playing) """
+    tunes.cancel()
 
 
 def play_buzzer_tune(tune: str):
-    """ Play a tune for certain game events """
-    for hz, duration in BUZZER_TUNES[tune]:
-        if (hz > 0):
-            buzzer.freq(hz)
-            buzzer.duty_u16(BUZZER_DUTY)
-        else:
-            buzzer_off()
-        time.sleep_ms(duration)
-    buzzer_off()
+    """ Play a tune for certain game events, in the background """
+    tunes.play(tune)
 
 
-def display_text(msg: str, hcentre = False, vcentre = False):
+def layout_text(key: tuple) -> tuple:
     """
-    Display text message, optionally centred on screen horizontally and vertically
+    Work out where each line of a text message goes on screen (word wrap and centring)
 
     Parameters:
     -----------
-    msg: str
-        Text message to display (can contain newlines to force multiline)
-    hcentre: bool
-        Align centre horizontally
-    vcentre: bool
-        Align centre vertically
+    key: tuple
+        (msg, hcentre, vcentre) - see `display_text()`
+
+    Returns:
+    --------
+    tuple
+        (text, x, y) for each line
     """
+    msg, hcentre, vcentre = key
     if "\n" in msg:
         lines = msg.split('\n')
     else:
@@ -130,7 +154,6 @@ def display_text(msg: str, hcentre = False, vcentre = False):
             if row == SCRN_ROWS:
                 break
 
-    display.fill(0)
     num_lines = len(lines)
 
     if (vcentre):
@@ -138,13 +161,53 @@ def display_text(msg: str, hcentre = False, vcentre = False):
     else:
         y = SCREEN['v_padding']
 
+    layout = []
     for line in range(num_lines):
         if (hcentre):
             x = int((SCREEN['width'] - (FONT['width'] * len(lines[line]))) / 2)
         else:
             x = 0
-        display.text(lines[line].upper(), x, y + 1)
+        layout.append((lines[line].upper(), x, y + 1))
         y = y + FONT['line_height']
+    return tuple(layout)
+
+
+def layout_size(layout: tuple) -> int:
+    """ Rough size (bytes) of a text layout, for the layout cache memory budget """
+    size = 16
+    for line in layout:
+        size += 32 + len(line[0])
+    return size
+
+
+def render_screen(key: tuple):
+    """ Render a text message into a full screen canvas """
+    canvas = Canvas(SCREEN['width'], SCREEN['height'])
+    for text, x, y in layouts.get(key):
+        canvas.text(text, x, y)
+    return canvas
+
+
+def display_text(msg: str, hcentre = False, vcentre = False):
+    """
+    Display text message, optionally centred on screen horizontally and vertically
+
+    Parameters:
+    -----------
+    msg: str
+        Text message to display (can contain newlines to force multiline)
+    hcentre: bool
+        Align centre horizontally
+    vcentre: bool
+        Align centre vertically
+    """
+    key = (msg, hcentre, vcentre)
+    if key in screens:
+        display.buffer[:] = screens.get(key).buffer # pre-rendered, swap in the whole screen
+    else:
+        display.fill(0)
+        for text, x, y in layouts.get(key):
+            display.text(text, x, y)
     display.show()
 
 
@@ -154,192 +217,402 @@ def display_clear():
     display.show()
 
 
-def poll_btns():
-    """ Poll button inputs to see if and which one was pressed """
-    global BTNLED_GPIO
-    btn_pressed = -1 # no button pressed
-    for btn in range(len(BTNLED_GPIO)):
-        if BTNLED_GPIO[btn]['btn'].value() == 1 and not BTNLED_GPIO[btn]['btn_on']:
-            BTNLED_GPIO[btn]['btn_on'] = True
-            return btn
+def sleep_ms(ms: int):
+    """ Awaitable sleep in milliseconds (works with uasyncio and asyncio) """
+    return asyncio.sleep(ms / 1000)
+
+
+# Game tasks - cooperative tasks for input, display, sound and sequence playback,
+# communicating through events, so nothing blocks while the game waits
+
+class GameAbort(Exception):
+    """ The player aborted the game (by holding a button down) """
+    pass
+
 
-    return btn_pressed
+presses = [] # indexes of buttons pressed, not yet taken by the game
+held = {} # button index: [ticks_ms() pressed, answer on release], for buttons held down during a game
+abort_armed = False # holding a button down aborts the game
+aborted = False # game aborted, waiting for the game to notice
+display_request = None # (msg, hcentre, vcentre) waiting to be shown
+sound_request = None # tune name or (hz, duration) waiting to be played
+flash_task = None # LED flash playing now
 
 
-def btn_handler(pin):
-    """ Interrupt handler to remove 'btn_on' bool condition from button on release """
-    global BTNLED_GPIO
-    btn_pin = int(str(pin)[8:10].replace(',', '')) # get pressed button pin number
-    btn_pressed = BTN_PINS[btn_pin] # Index of pin
-    BTNLED_GPIO[btn_pressed]['btn_on'] = False
+async def wait_flag(flag, timeout_ms: int = -1):
+    """ Wait for a `ThreadSafeFlag` to be set, or until timeout_ms milliseconds have passed (-1 = forever) """
+    if timeout_ms < 0:
+        await flag.wait()
+        return
+    try:
+        await asyncio.wait_for(flag.wait(), timeout_ms / 1000)
+    except asyncio.TimeoutError:
+        pass
 
 
-def sequence_action(idx: int, speed: int):
-    """ Run LED/Buzzer sequence """
+async def input_task():
+    """
+    Take button events from the interrupt queue and pass presses on to the game
+
+    During a game a press only counts once the button is released, so holding a button
+    down to abort the game isn't taken as an answer first.
+    """
+    global aborted
+    settling = False # a button just changed, check it again once it has settled
+    while True:
+        # Sleep until a button interrupt, only waking early to finish debouncing or time a hold
+        timeout_ms = -1
+        now = time.ticks_ms()
+        for since, _ in held.values():
+            remaining = max(0, ABORT_HOLD_MS - time.ticks_diff(now, since))
+            if timeout_ms < 0 or remaining < timeout_ms:
+                timeout_ms = remaining
+        if settling and (timeout_ms < 0 or timeout_ms > BTN_DEBOUNCE_MS):
+            timeout_ms = BTN_DEBOUNCE_MS
+        await wait_flag(btn_flag, timeout_ms)
+
+        buttons.poll() # pick up releases/presses that settled while debouncing
+        settling = False
+        event = btn_events.get()
+        while event is not None:
+            settling = True
+            idx = event[1]
+            if event[0] == EV_PRESS:
+                if abort_armed:
+                    held[idx] = [time.ticks_ms(), True] # answer or abort, depending how long it's held
+                else:
+                    presses.append(idx)
+                    press_event.set()
+            elif idx in held:
+                if held.pop(idx)[1]:
+                    presses.append(idx) # released before it became an abort
+                    press_event.set()
+            event = btn_events.get()
+
+        now = time.ticks_ms()
+        for idx in [idx for idx, hold in held.items() if time.ticks_diff(now, hold[0]) >= ABORT_HOLD_MS]:
+            del held[idx] # a hold, not an answer
+            if abort_armed and not aborted:
+                aborted = True
+                press_event.set() # wake the game up
+
+
+async def display_task():
+    """ Show the latest text message requested (messages replaced before being shown are skipped) """
+    global display_request
+    while True:
+        await display_event.wait()
+        display_event.clear()
+        request = display_request
+        display_request = None
+        if request is not None:
+            display_text(request[0], request[1], request[2])
+
+
+async def sound_task():
+    """ Play the latest tune/tone requested (in the background, see `TuneSequencer`) """
+    global sound_request
+    while True:
+        await sound_event.wait()
+        sound_event.clear()
+        request = sound_request
+        sound_request = None
+        if isinstance(request, str):
+            play_buzzer_tune(request)
+        elif request is not None:
+            buzzer_on(request[0], request[1])
+
+
+def show(msg: str, hcentre = False, vcentre = False):
+    """ Ask the display task to show a text message (see `display_text()`) """
+    global display_request
+    display_request = (msg, hcentre, vcentre)
+    display_event.set()
+
+
+def sound(request):
+    """ Ask the sound task to play a tune (by name) or a (hz, duration) tone """
+    global sound_request
+    sound_request = request
+    sound_event.set()
+
+
+async def flash(idx: int, speed: int):
+    """ Flash LED and play buzzer tone of a colour """
     led_on(idx)
-    buzzer_on(int(BTNLED_GPIO[idx]['tone']))
-    time.sleep_ms(speed)
-    buzzer_off()
+    sound((int(BTNLED_GPIO[idx]['tone']), speed))
+    await sleep_ms(speed)
     led_off(idx)
-    time.sleep_ms(speed)
+    await sleep_ms(speed)
+
 
+def start_flash(idx: int, speed: int):
+    """ Flash a colour in the background, cutting short any flash still playing """
+    global flash_task
+    if flash_task is not None:
+        flash_task.cancel()
+        led_off()
+    flash_task = asyncio.create_task(flash(idx, speed))
 
-def get_random_sequence(seq_len: int) -> list:
+
+async def playback(sequence: list, count: int, speed: int):
+    """ Play the first `count` colours of the sequence (waking the game when it's done) """
+    try:
+        for s in range(count):
+            await flash(sequence[s], speed)
+    finally:
+        press_event.set()
+
+
+async def next_press(timeout_ms: int = -1) -> int:
     """
-    Generate a random sequence of colours by index
+    Wait for the next button press
 
     Parameters:
     -----------
+    timeout_ms: int
+        Give up after this many milliseconds, default -1 (wait forever)
 
-    seq_len: int
-        Length of sequence to generate
+    Returns:
+    --------
+    int
+        Index of button pressed, or -1 if it timed out
     """
+    while not presses:
+        if aborted:
+            raise GameAbort()
+        press_event.clear()
+        if timeout_ms < 0:
+            await press_event.wait()
+        else:
+            try:
+                await asyncio.wait_for(press_event.wait(), timeout_ms / 1000)
+            except asyncio.TimeoutError:
+                return -1
+    if aborted:
+        raise GameAbort()
+    return presses.pop(0)
+
+
+def clear_presses():
+    """ Forget button presses not yet taken by the game """
+    btn_events.clear()
+    del presses[:]
+    for hold in held.values():
+        hold[1] = False # still timed for an abort, but no longer an answer
+
+
+def xorshift32(seed: int):
+    """ Small random number generator, gives the same numbers for a seed on any board (or PC) """
+    state = (seed & 0xffffffff) or 1 # state must not be zero
+    while True:
+        state ^= (state << 13) & 0xffffffff
+        state ^= state >> 17
+        state ^= (state << 5) & 0xffffffff
+        yield state
 
-    rpts = {} # track repeats
-    last_item = -1 # track last selected item
-    sq = [] # selected sequence
 
-    for _ in range(seq_len):
-        # If item has been selected 2x in a row, loop until new item is selected
-        while True:
-            item = random.randrange(0, num_colours) # 0 - 3 inclusive
+def random_sequence(num_items: int, max_repeats: int = 2, seed: int = None):
+    """
+    Endless random sequence of colours by index (a generator, call `next()` for each item)
 
-            if item == last_item:
-                if (rpts[item] < 2):
-                    rpts[item] += 1 # increment repeat counter
-                    break # break loop
-            else:
-                rpts[item] = 1 # set/reset repeat counter
-                break # break loop
+    Each item takes a single random draw: once an item has been repeated `max_repeats`
+    times in a row, it is left out of the draw for the next one.
 
-        last_item = item
-        sq.append(item)
+    Parameters:
+    -----------
+
+    num_items: int
+        Number of colours to choose from
+    max_repeats: int
+        Maximum times the same colour can come up in a row
+    seed: int
+        Seed for a reproducible sequence, default None (different every game)
+    """
+    rng = None if seed is None else xorshift32(seed)
+    last_item = -1 # last selected item
+    rpts = 0 # times last item has come up in a row
+
+    while True:
+        choices = num_items - 1 if rpts >= max_repeats else num_items
+        item = random.randrange(choices) if rng is None else next(rng) % choices
+        if choices < num_items and item >= last_item:
+            item += 1 # skip over the repeated item
 
-    return sq
+        rpts = rpts + 1 if item == last_item else 1
+        last_item = item
+        yield item
 
 
 # Setup Pin objects
-for btnled in BTNLED_GPIO:
-    btnled['btn'] = Pin(btnled['btn_pin'], Pin.IN, Pin.PULL_DOWN)
-    btnled['btn'].irq(trigger = Pin.IRQ_FALLING, handler = btn_handler) # on button press 1 -> 0
+btn_flag = asyncio.ThreadSafeFlag() # set by the button interrupts, wakes the input task
+btn_events = EventQueue(16, btn_flag) # button presses/releases, in the order they happened
+buttons = Buttons([btnled['btn_pin'] for btnled in BTNLED_GPIO], Pin.PULL_DOWN, 1, BTN_DEBOUNCE_MS, btn_events)
+
+for i, btnled in enumerate(BTNLED_GPIO):
+    btnled['btn'] = buttons.pins[i]
     btnled['led'] = Pin(btnled['led_pin'], Pin.OUT)
 
 buzzer = PWM(Pin(BUZZER_PIN))
+tunes = TuneSequencer(buzzer, BUZZER_DUTY, BUZZER_TUNES)
 
 i2c = I2C(0, sda = Pin(OLED_PINS['SDA']), scl = Pin(OLED_PINS['SCL']), freq = 400000)
 time.sleep(1) # Allow I2C to kick in
-display = SSD1306_I2C(SCREEN['width'], SCREEN['height'], i2c)
+display = ShadowDisplay(SSD1306_I2C(SCREEN['width'], SCREEN['height'], i2c))
 
-##### Start game interface
+layouts = LRUCache(layout_text, LAYOUT_CACHE['items'], LAYOUT_CACHE['bytes'], layout_size)
+screens = LRUCache(render_screen, 0) # only pinned (pre-rendered) screens are kept
+screens.preload(PRERENDERED_SCREENS)
 
-try:
-    while True:
-        ##### Setup game vars
-
-        play_game = False # flag game start
-        pressed = -1 # index of pressed button
-        num_colours = len(BTNLED_GPIO) # number of colours (leds/buttons)
-        levels = [8, 14, 20, 31] # difficulty levels = length of sequence
-        current_level = 0 # current player level (zero-indexed!)
-        current_round = 0 # Current round in level
-        speed_increases = [5, 9, 13] # item in sequence at which speed increases
-        speed_decrement = 100 # milliseconds deducted at speed increase
-        speed_start = 500 # start at 500 milliseconds between items
-        speed_current = speed_start
-        sequence = [] # store randomly selected sequence
-
-        # Prep game hardware
-        buzzer_off()
-        led_off()
-        display_clear()
+scores = ScoreLog(SCORES_FILE, len(BTNLED_GPIO)) # one level per button
 
-        ##### Welcome screen
-        display_text("PICO SIMON GAME\nCHOOSE LEVEL:-\n1: Red\n2: Green\n3: Blue\n4: Yellow", False)
+##### Game
 
-        # Wait for player input
-        while play_game == False:
-            which_btn = poll_btns()
-            if which_btn > -1:
-                current_level = which_btn
-                play_game = True
-                break
+async def play_game():
+    """ Play one game, from the welcome screen to game over """
+    global abort_armed
 
-        ##### Game play
+    ##### Setup game vars
 
-        sequence_len = levels[current_level]
+    num_colours = len(BTNLED_GPIO) # number of colours (leds/buttons)
+    speed_increases = [5, 9, 13] # item in sequence at which speed increases
+    speed_decrement = 100 # milliseconds deducted at speed increase
+    speed_start = 500 # start at 500 milliseconds between items
+    speed_current = speed_start
+    sequence = [] # store randomly selected sequence
 
-        display_text("LEVEL " + str(current_level + 1) + "\n(" + str(sequence_len) + " ROUNDS)", True, True)
-        time.sleep(1)
-        for _ in reversed(range(5)):
-            display_text('... ' + str(_ + 1) + ' ...', True, True)
-            time.sleep(1)
+    # Prep game hardware
+    buzzer_off()
+    led_off()
 
+    ##### Welcome screen
+    show("PICO SIMON GAME\nCHOOSE LEVEL:-\n1: Red\n2: Green\n3: Blue\n4: Yellow", False)
 
-        # Select full random sequence
-        sequence = get_random_sequence(sequence_len)
+    # Wait for player input
+    clear_presses() # ignore presses from the last game
+    current_level = await next_press()
+    abort_armed = True
 
-        score = 0 # keep score
+    ##### Game play
 
-        # Loop each level
-        for game_round in range(sequence_len):
-            current_round = game_round + 1 # account for zero indexing
+    sequence_len = LEVELS[current_level]
 
-            if (current_round in speed_increases):
-                speed_current -= speed_decrement # increase speed (decrease sleep delay)
+    best_txt = "\nBEST: " + str(scores.best(current_level)) if scores.best(current_level) else ""
+    show("LEVEL " + str(current_level + 1) + "\n(" + (str(sequence_len) + " ROUNDS" if sequence_len else "ENDLESS") + ")" + best_txt, True, True)
+    if await next_press(1000) < 0:
+        for _ in reversed(range(5)):
+            show('... ' + str(_ + 1) + ' ...', True, True)
+            if await next_press(1000) > -1:
+                break # any button skips the countdown
+    clear_presses()
+
+    # Random sequence, one more item is added each round
+    colours = random_sequence(num_colours, SEQUENCE_MAX_REPEATS, SEQUENCE_SEED)
+
+    score = 0 # keep score
+    player_err = False # flag when player makes an error
+
+    # Loop each level
+    current_round = 0
+    while sequence_len == 0 or current_round < sequence_len:
+        current_round += 1
+        sequence.append(next(colours))
+
+        if (current_round in speed_increases):
+            speed_current -= speed_decrement # increase speed (decrease sleep delay)
+
+        show('Round ' + str(current_round), True, True)
+        await next_press(1000) # (pressing a button here just skips the pause)
+        clear_presses()
+
+        # Play current sequence, a button press cuts it short and starts the player's turn
+        player = asyncio.create_task(playback(sequence, current_round, speed_current))
+        while not player.done() and not presses and not aborted:
+            press_event.clear()
+            await press_event.wait() # a press, an abort or the end of playback
+        if not player.done():
+            player.cancel()
+            led_off()
+            buzzer_off()
 
-            display_text('Round ' + str(current_round), True, True)
+        # Player input
+        req_btn_presses = current_round # required no. button presses (= current round)
+        btn_presses = 0 # current count of button presses
+        player_err = False # flag when player makes an error
 
-            time.sleep(1)
+        show('Your turn', True, True)
 
-            # Play current sequence
-            for s in range(current_round):
-                sequence_action(sequence[s], speed_current) # flash led and player buzzer tone
+        # Loop until reaching required button presses or player makes an error
+        while (btn_presses < req_btn_presses):
+            pressed = await next_press() # Get index of the pressed button
+            start_flash(pressed, speed_current) # flash/buzz! (while still taking presses)
+            if (pressed != sequence[btn_presses]):
+                player_err = True # incorrect button pressed
+                break # break out of button press loop
+            btn_presses += 1 # increment button press counter
 
-            # Player input
-            req_btn_presses = current_round # required no. button presses (= current round)
-            btn_presses = 0 # current count of button presses
-            player_err = False # flag when player makes an error
+        await sleep_ms(speed_current) # let the last flash finish
 
-            display_text('Your turn', True, True)
+        # Player input over, if there was an error, immediately end the current game
+        if player_err:
+            show('Incorrect!', True, True)
+            break # stop looping rounds and go to game over
+
+        # No errors, then go to next round (if there is one)
+        score += 1 # increment score
+        show('Correct!', True, True)
+        sound('correct')
+        await sleep_ms(1000)
+
+    ##### GAME OVER
+
+    abort_armed = False
+    score_txt = str(score) + ("/" + str(sequence_len) if sequence_len else "")
+    new_best = scores.record_game(current_level, score) # quick, only appends a small record
+    if new_best:
+        score_txt += "\nNEW BEST SCORE!"
+
+    # Play/show either loser/winner tune/text
+    if player_err and not sequence_len:
+        show("You got " + score_txt + "\nGame over!", True, True) # endless games only end with a mistake
+        sound('winner' if new_best else 'loser')
+    elif player_err:
+        show("You got " + score_txt + "\nBetter luck\nnext time!?", True, True)
+        sound('loser')
+    else:
+        show("You got " + score_txt + "\nWell done!", True, True)
+        sound('winner')
 
-            # Loop until reaching required button presses or player makes an error
-            while (btn_presses < req_btn_presses):
-                pressed = poll_btns() # Get index of the pressed button
-                if pressed > -1:
-                    sequence_action(pressed, speed_current) # flash/buzz!
-                    if (pressed != sequence[btn_presses]):
-                        player_err = True # incorrect button pressed
-                        break # break out of button press loop
-                    btn_presses += 1 # increment button press counter
-                    pressed = -1 # reset pressed button
+    await sleep_ms(2000) # pause two secs, then loop back to start
 
-            # Player input over, if there was an error, immediately end the current game
-            if player_err:
-                display_text('Incorrect!', True, True)
-                break # stop looping rounds and go to game over
 
-            # No errors, then go to next round (if there is one)
-            score += 1 # increment score
-            display_text('Correct!', True, True)
-            play_buzzer_tune('correct')
-            time.sleep(1)
+async def main():
+    global press_event, display_event, sound_event, abort_armed, aborted
+    press_event = asyncio.Event() # button pressed (or game aborted, or playback finished)
+    display_event = asyncio.Event() # display_request waiting
+    sound_event = asyncio.Event() # sound_request waiting
+    asyncio.create_task(input_task())
+    asyncio.create_task(display_task())
+    asyncio.create_task(sound_task())
 
-        ##### GAME OVER
+    while True:
+        try:
+            await play_game()
+        except GameAbort:
+            abort_armed = False
+            aborted = False
+            buzzer_off()
+            led_off()
+            show('Game aborted', True, True)
+            await sleep_ms(1000)
 
-        score_txt = str(score) + "/" + str(sequence_len)
 
-        # Play/show either loser/winner tune/text
-        if player_err:
-            display_text("You got " + score_txt + "\nBetter luck\nnext time!?", True, True)
-            play_buzzer_tune('loser')
-        else:
-            display_text("You got " + score_txt + "\nWell done!", True, True)
-            play_buzzer_tune('winner')
-        
-        time.sleep(2) # pause two secs, then loop back to start
+##### Start game interface
 
+try:
+    asyncio.run(main())
 except KeyboardInterrupt:
     buzzer_off()
     led_off()
     display_clear()
-    sys.exit(0)
\ No newline at end of file
+    sys.exit(0)